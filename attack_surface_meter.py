@@ -2,12 +2,14 @@ import argparse
 import os
 import sys
 
+from attacksurfacemeter import utilities
 from attacksurfacemeter.call_graph import CallGraph
 from attacksurfacemeter.granularity import Granularity
 from attacksurfacemeter.loaders.cflow_loader import CflowLoader
 from attacksurfacemeter.loaders.gprof_loader import GprofLoader
 from attacksurfacemeter.loaders.multigprof_loader import MultigprofLoader
 from attacksurfacemeter.loaders.javacg_loader import JavaCGLoader
+from attacksurfacemeter.metric_cache import MetricCache
 from attacksurfacemeter.formatters.txt_formatter import TxtFormatter
 from attacksurfacemeter.formatters.xml_formatter import XmlFormatter
 from attacksurfacemeter.formatters.html_formatter import HtmlFormatter
@@ -21,80 +23,160 @@ FORMATTERS = {
 def main():
     args = parse_args()
 
+    call_graph = load_call_graph(args, args.cflow, args.gprof, args.javacg)
+    if args.cache:
+        call_graph.cache = MetricCache(path=args.cache)
+
+    baseline = None
+    if args.baseline_cflow or args.baseline_gprof or args.baseline_javacg:
+        baseline = load_call_graph(
+            args, args.baseline_cflow, args.baseline_gprof,
+            args.baseline_javacg
+        )
+
+    if baseline is not None:
+        formatter = FORMATTERS['txt'](call_graph)
+        if args.output:
+            with open(args.output, 'w') as file_:
+                file_.write(formatter.write_diff(baseline))
+        else:
+            sys.stdout.write(formatter.write_diff(baseline))
+    elif args.output:
+        (name, extension) = os.path.splitext(args.output)
+        output_format = extension.replace('.', '')
+        if output_format not in FORMATTERS:
+            output_format = 'txt'
+        formatter = FORMATTERS[output_format](call_graph)
+        with open(args.output, 'w') as file_:
+            if args.verbose:
+                file_.write(formatter.write_output())
+            else:
+                file_.write(formatter.write_summary())
+    else:
+        formatter = FORMATTERS['txt'](call_graph)
+        if args.verbose:
+            sys.stdout.write(formatter.write_output())
+        else:
+            sys.stdout.write(formatter.write_summary())
+
+    if args.showerrors and call_graph.load_errors:
+        sys.stdout.write('Parse Errors\n')
+        sys.stdout.write('============\n')
+        for error in call_graph.load_errors:
+            sys.stdout.write(error)
+
+    call_graph.cache.close()
+
+
+def load_call_graph(args, cflow, gprof, javacg):
+    '''Load the call graph specified on the command line.
+
+    Parameters
+    ----------
+    args : object
+        An object containing the command line arguments as attributes.
+    cflow : str
+        Absolute path of the cflow call graph or of the source code, if any.
+    gprof : str
+        Absolute path of the gprof call graph or of a directory of gprof call
+        graphs, if any.
+    javacg : str
+        Absolute path of the java-callgraph call graph, if any.
+
+    Returns
+    -------
+    call_graph : CallGraph
+        An instance of CallGraph representing the call graph loaded.
+    '''
     call_graph = None
-    if args.javacg:
+    if javacg:
+        # The java-callgraph call graph is loaded serially unless the
+        # number of processes is explicitly specified.
         loader = JavaCGLoader(
-            args.javacg, args.apppackages
+            javacg, args.apppackages, processes=args.processes or 1
         )
         call_graph = CallGraph.from_loader(loader)
     else:
+        defenses = None
+        if args.defenses:
+            defenses = utilities.load_calls(args.defenses)
+        vulnerabilities = None
+        if args.vulnerabilities:
+            vulnerabilities = utilities.load_calls(args.vulnerabilities)
+
         cflow_loader = None
         gprof_loader = None
-        if args.cflow:
-            if not os.path.exists(args.cflow):
-                raise Exception('{} not found.'.format(args.cflow))
+        if cflow:
+            if not os.path.exists(cflow):
+                raise Exception('{} not found.'.format(cflow))
             else:
-                cflow_loader = CflowLoader(args.cflow, reverse=args.reverse)
+                cflow_loader = CflowLoader(
+                    cflow, reverse=args.reverse, defenses=defenses,
+                    vulnerabilities=vulnerabilities
+                )
 
-        if args.gprof:
-            if not os.path.exists(args.gprof):
-                raise Exception('{} not found.'.format(args.gprof))
+        if gprof:
+            if not os.path.exists(gprof):
+                raise Exception('{} not found.'.format(gprof))
             else:
-                if os.path.isdir(args.gprof):
+                if os.path.isdir(gprof):
                     sources = [
-                        os.path.join(args.gprof, filename)
-                        for filename in os.listdir(args.gprof)
-                        if os.path.isfile(os.path.join(args.gprof, filename))
+                        os.path.join(gprof, filename)
+                        for filename in os.listdir(gprof)
+                        if os.path.isfile(os.path.join(gprof, filename))
                     ]
                     gprof_loader = MultigprofLoader(
-                        sources, processes=args.processes
+                        sources, defenses=defenses,
+                        vulnerabilities=vulnerabilities,
+                        processes=args.processes or 2
                     )
                 else:
                     gprof_loader = GprofLoader(
-                        args.gprof
+                        gprof, defenses=defenses,
+                        vulnerabilities=vulnerabilities
                     )
 
         if cflow_loader and gprof_loader:
             call_graph = CallGraph.from_merge(
-                CallGraph.from_loader(
-                    cflow_loader, granularity=args.granularity
-                ),
+                load_cflow_call_graph(args, cflow_loader),
                 CallGraph.from_loader(
                     gprof_loader, granularity=args.granularity
                 )
             )
         elif cflow_loader:
-            call_graph = CallGraph.from_loader(
-                    cflow_loader, granularity=args.granularity
-                )
+            call_graph = load_cflow_call_graph(args, cflow_loader)
         elif gprof_loader:
             call_graph = CallGraph.from_loader(
                     gprof_loader, granularity=args.granularity
                 )
 
-    if args.output:
-        (name, extension) = os.path.splitext(args.output)
-        output_format = extension.replace('.', '')
-        if output_format not in FORMATTERS:
-            output_format = 'txt'
-        formatter = FORMATTERS[output_format](call_graph)
-        with open(args.output, 'w') as file_:
-            if args.verbose:
-                file_.write(formatter.write_output())
-            else:
-                file_.write(formatter.write_summary())
-    else:
-        formatter = FORMATTERS['txt'](call_graph)
-        if args.verbose:
-            sys.stdout.write(formatter.write_output())
-        else:
-            sys.stdout.write(formatter.write_summary())
+    return call_graph
 
-    if args.showerrors and call_graph.load_errors:
-        sys.stdout.write('Parse Errors\n')
-        sys.stdout.write('============\n')
-        for error in call_graph.load_errors:
-            sys.stdout.write(error)
+
+def load_cflow_call_graph(args, loader):
+    '''Load the cflow call graph specified on the command line.
+
+    Parameters
+    ----------
+    args : object
+        An object containing the command line arguments as attributes.
+    loader : CflowLoader
+        The loader of the cflow call graph.
+
+    Returns
+    -------
+    call_graph : CallGraph
+        An instance of CallGraph representing the call graph loaded or, if
+        --forward was specified, the forward call graph derived from it (see
+        CflowLoader.load_call_graphs).
+    '''
+    if not args.forward:
+        return CallGraph.from_loader(loader, granularity=args.granularity)
+
+    (graph, _) = loader.load_call_graphs(args.granularity)
+    return CallGraph(
+        loader.source, graph, loader.errors, granularity=args.granularity
+    )
 
 
 def parse_args():
@@ -134,6 +216,14 @@ def parse_args():
         '--reverse', action='store_true',
         help='cflow call graph was generated with the -r option.'
     )
+    parser.add_argument(
+        '--forward', action='store_true',
+        help=(
+            'Analyze only the functions reachable from main, i.e. the call '
+            'graph that cflow generates without the -r option, derived from '
+            'the cflow -r call graph. Requires --reverse.'
+        )
+    )
     parser.add_argument(
         '-g', dest='gprof',
         help=(
@@ -143,10 +233,11 @@ def parse_args():
         )
     )
     parser.add_argument(
-        '-p', dest='processes', type=int, default=2,
+        '-p', dest='processes', type=int,
         help=(
-            'Number of processes to spawn when loaded multiple gprof call '
-            'graph files. Default is 2.'
+            'Number of processes to spawn when loading multiple gprof call '
+            'graph files (default is 2) or a java-callgraph call graph file '
+            '(by default, the file is loaded serially).'
         )
     )
     parser.add_argument(
@@ -166,6 +257,47 @@ def parse_args():
             'defined.'
         )
     )
+    parser.add_argument(
+        '--defenses', metavar='FILE',
+        help=(
+            'Absolute path of a CSV or JSON file listing the functions that '
+            'are designed defenses in the software system. Not supported '
+            'with -j.'
+        )
+    )
+    parser.add_argument(
+        '--vulnerabilities', metavar='FILE',
+        help=(
+            'Absolute path of a CSV or JSON file listing the functions that '
+            'are known to be vulnerable in the software system. Not '
+            'supported with -j.'
+        )
+    )
+    parser.add_argument(
+        '--baseline-cflow', dest='baseline_cflow', metavar='CFLOW',
+        help=(
+            'Same as -c but for the baseline, e.g. the previous release, of '
+            'the software system. When a baseline is specified, a plain text '
+            'report of the changes to the attack surface from the baseline is '
+            'output.'
+        )
+    )
+    parser.add_argument(
+        '--baseline-gprof', dest='baseline_gprof', metavar='GPROF',
+        help='Same as -g but for the baseline of the software system.'
+    )
+    parser.add_argument(
+        '--baseline-javacg', dest='baseline_javacg', metavar='JAVACG',
+        help='Same as -j but for the baseline of the software system.'
+    )
+    parser.add_argument(
+        '--cache', metavar='FILE',
+        help=(
+            'Absolute path of a file in which the metrics collected are '
+            'stored, so that they need not be collected again when the '
+            'call graph is unchanged.'
+        )
+    )
     parser.add_argument(
         '--output',
         help=(
@@ -188,7 +320,17 @@ def parse_args():
         help='Display errors encountered when parsing call graph (if any).'
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.forward and not args.reverse:
+        parser.error('--forward requires --reverse.')
+    if ((args.javacg or args.baseline_javacg) and
+            (args.defenses or args.vulnerabilities)):
+        parser.error(
+            '--defenses and --vulnerabilities cannot be used with a '
+            'java-callgraph call graph.'
+        )
+
+    return args
 
 
 if __name__ == '__main__':
@@ -1,13 +1,16 @@
 __author__ = 'kevin'
 
 # import statistics as stat
-import networkx as nx
 import os
+import sys
 
+from attacksurfacemeter import attributes, utilities
 from attacksurfacemeter.call import Call
 from attacksurfacemeter.call_graph import CallGraph
+from attacksurfacemeter.edge_black_list import EdgeBlackList
 from attacksurfacemeter.environments import Environments
 from attacksurfacemeter.loaders.javacg_loader import JavaCGLoader
+from attacksurfacemeter.loaders.package_trie import PackageTrie
 
 
 class AndroidCallGraph(CallGraph):
@@ -23,8 +26,9 @@ class AndroidCallGraph(CallGraph):
 
     _android_override_input_methods = []
     _android_override_output_methods = []
-    _android_black_list_packages = []
-    _android_black_list_edges = []
+    _android_black_list_packages = None
+    _black_listed_packages = dict()
+    _android_black_list_edges = None
 
     def __init__(self, source, graph, generation_errors=None):
         """
@@ -40,8 +44,7 @@ class AndroidCallGraph(CallGraph):
             Returns:
                 A new instance of type CallGraph.
         """
-        self.source = source
-        self.call_graph = graph
+        super(AndroidCallGraph, self).__init__(source, graph, generation_errors)
         self.errors = generation_errors
 
         self._entry_points = set()
@@ -74,20 +77,90 @@ class AndroidCallGraph(CallGraph):
 
     @staticmethod
     def _get_android_edge_black_list():
-        if not AndroidCallGraph._android_black_list_edges:
-            file_name = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data", "android_edge_black_list_extended")
-            black_list_call_graph = AndroidCallGraph.from_loader(JavaCGLoader(file_name))
-            AndroidCallGraph._android_black_list_edges = black_list_call_graph.edges
+        """
+            Returns the black listed edges as an EdgeBlackList.
+
+            The black list is compiled from the call graph in data/android_edge_black_list the first time
+            it is needed and saved alongside it, so that later runs only map the compiled black list into
+            memory. The black list is recompiled whenever the call graph is newer than its compiled form.
+            The compiled black list replaces the previous one atomically (see EdgeBlackList.save), so
+            concurrent analyses never load a partially written black list.
+        """
+        if AndroidCallGraph._android_black_list_edges is None:
+            file_name = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data", "android_edge_black_list")
+            compiled_file_name = file_name + ".bin"
+
+            if os.path.exists(compiled_file_name) and (
+                    not os.path.exists(file_name) or
+                    os.path.getmtime(compiled_file_name) >= os.path.getmtime(file_name)):
+                black_list = EdgeBlackList.load(compiled_file_name)
+            elif os.path.exists(file_name):
+                black_list = EdgeBlackList.from_edges(JavaCGLoader(file_name).load_call_graph().edges())
+
+                try:
+                    black_list.save(compiled_file_name)
+                except OSError:
+                    # The black list is kept in memory if it cannot be saved, e.g. in a read-only install
+                    pass
+            else:
+                # Not saved, so that a call graph installed later is compiled rather than shadowed
+                black_list = EdgeBlackList()
+
+            AndroidCallGraph._android_black_list_edges = black_list
 
         return AndroidCallGraph._android_black_list_edges
 
     @staticmethod
     def _load_android_package_black_list():
-        if not AndroidCallGraph._android_black_list_packages:
-            AndroidCallGraph._android_black_list_packages = AndroidCallGraph._load_function_list("android_package_black_list")
+        if AndroidCallGraph._android_black_list_packages is None:
+            AndroidCallGraph._android_black_list_packages = PackageTrie(
+                p for p in AndroidCallGraph._load_function_list("android_package_black_list") if p
+            )
 
         return AndroidCallGraph._android_black_list_packages
 
+    @staticmethod
+    def _is_black_listed_package(package):
+        """
+            Returns True if package is one of the black listed packages. The result is cached per package,
+            keyed by the interned package name, since the calls of a call graph share a few packages.
+        """
+        package = sys.intern(package)
+
+        is_black_listed = AndroidCallGraph._black_listed_packages.get(package)
+        if is_black_listed is None:
+            is_black_listed = package in AndroidCallGraph._load_android_package_black_list()
+            AndroidCallGraph._black_listed_packages[package] = is_black_listed
+
+        return is_black_listed
+
+    @property
+    def entry_points(self):
+        """
+            Returns the list of entry points in the call graph, i.e. those found by
+            calculate_entry_and_exit_points rather than the nodes with the 'entry' attribute set.
+        """
+        return list(self._entry_points)
+
+    @property
+    def exit_points(self):
+        """
+            Returns the list of exit points in the call graph, i.e. those found by
+            calculate_entry_and_exit_points rather than the nodes with the 'exit' attribute set.
+        """
+        return list(self._exit_points)
+
+    def _get_points(self, attribute):
+        """
+            Returns the nodes that have a specific attribute set, except that the entry and exit points are
+            those of the entry_points and exit_points properties, so that the metrics are computed for them.
+        """
+        if attribute == 'entry':
+            return self._entry_points
+        if attribute == 'exit':
+            return self._exit_points
+        return super()._get_points(attribute)
+
     def calculate_entry_and_exit_points(self):
         self._calculate_entry_and_exit_points()
 
@@ -101,6 +174,9 @@ class AndroidCallGraph(CallGraph):
 
         self._exit_points = AndroidCallGraph._merge_dicts(self._exit_points, exit_points_to_add)
 
+        # The attack surface depends on the entry and exit points
+        self.invalidate()
+
     @staticmethod
     def _merge_dicts(x, y):
         """
@@ -112,19 +188,7 @@ class AndroidCallGraph(CallGraph):
 
     def calculate_attack_surface_nodes(self):
         # Sub-graphing only those nodes connected to the attack surface
-        attack_surface_nodes = set()
-
-        for en in self.entry_points:
-            attack_surface_nodes.add(en)
-            for des in self.get_descendants(en):
-                attack_surface_nodes.add(des)
-
-        for ex in self.exit_points:
-            attack_surface_nodes.add(ex)
-            for anc in self.get_ancestors(ex):
-                attack_surface_nodes.add(anc)
-
-        self.attack_surface_graph = nx.subgraph(self.call_graph, attack_surface_nodes)
+        self.attack_surface_graph = self.attack_surface_subgraph()
 
     def collapse_android_black_listed_edges(self):
         """
@@ -134,12 +198,8 @@ class AndroidCallGraph(CallGraph):
             collapsing. Also, this way we ignore any input/output method that appears in the black listed
             nodes so that they don't appear in the metrics.
         """
-        get_hash = lambda edge_to_hash: str(hash(edge_to_hash[0])) + str(hash(edge_to_hash[1]))
-
         black_listed_edges = AndroidCallGraph._get_android_edge_black_list()
 
-        black_listed_edges = {get_hash(e): True for e in black_listed_edges}
-
         nodes_to_remove = set()
         edges_to_remove = []
         edges_to_add = []
@@ -149,11 +209,7 @@ class AndroidCallGraph(CallGraph):
         for edge in self.call_graph.edges():
             caller, callee = edge
 
-            caller_id = hash(caller)
-            callee_id = hash(callee)
-            edge_id = get_hash(edge)
-
-            edge_is_in_black_list = edge_id in black_listed_edges
+            edge_is_in_black_list = edge in black_listed_edges
 
             if edge_is_in_black_list:
 
@@ -169,27 +225,27 @@ class AndroidCallGraph(CallGraph):
                 # list would be totally disconnected and substituted by their respective
                 # package node. We need to remove those.
 
-                if caller_id not in black_list_nodes:
-                    black_list_nodes[caller_id] = {
+                if caller not in black_list_nodes:
+                    black_list_nodes[caller] = {
                         'node': caller,
                         'all_edges_black_list': True
                     }
 
-                if callee_id not in black_list_nodes:
-                    black_list_nodes[callee_id] = {
+                if callee not in black_list_nodes:
+                    black_list_nodes[callee] = {
                         'node': callee,
                         'all_edges_black_list': True
                     }
 
-            if caller_id in black_list_nodes:
+            if caller in black_list_nodes:
                 if not edge_is_in_black_list:
-                    black_list_nodes[caller_id]['all_edges_black_list'] = False
+                    black_list_nodes[caller]['all_edges_black_list'] = False
 
-            if callee_id in black_list_nodes:
+            if callee in black_list_nodes:
                 if not edge_is_in_black_list:
-                    black_list_nodes[callee_id]['all_edges_black_list'] = False
+                    black_list_nodes[callee]['all_edges_black_list'] = False
 
-        for node_id, black_list_node in black_list_nodes.items():
+        for node, black_list_node in black_list_nodes.items():
             if black_list_node['all_edges_black_list']:
                 nodes_to_remove.add(black_list_node['node'])
 
@@ -197,6 +253,7 @@ class AndroidCallGraph(CallGraph):
         self.call_graph.remove_nodes_from(nodes_to_remove)
 
         self.call_graph.add_edges_from(edges_to_add)
+        self.invalidate()
 
         # Use this if planing to create a gml to open with gephi
         # for e in edges_to_add:
@@ -208,49 +265,43 @@ class AndroidCallGraph(CallGraph):
         #         self.call_graph.add_edge(*e, weight=edge_data["weight"] + 1)
 
     def collapse_android_black_listed_packages(self):
+        """
+            Collapses every call in a black listed package, other than input and output methods, into the
+            node of its package, the same kind of node as that created by collapse_android_black_listed_edges.
+            The graph is rewritten in a single batch (see utilities.relabel) and the weight of each edge
+            incident on a package node is the number of edges collapsed into it.
+        """
+        mapping = dict()
+        package_nodes = dict()
 
-        black_listed_packages = AndroidCallGraph._load_android_package_black_list()
-
-        nodes_to_remove = set()
-        edges_to_remove = []
-
-        edges_to_add = []
-
-        for edge in self.call_graph.edges():
-            caller, callee = edge
-
-            if not (caller.is_input_function() or caller.is_output_function() or
-                    callee.is_input_function() or callee.is_output_function()):
-
-                if caller.package_name in black_listed_packages and callee.package_name in black_listed_packages:
-
-                    edges_to_remove.append(edge)
-                    nodes_to_remove.add(caller)
-                    nodes_to_remove.add(callee)
-
-                    edges_to_add.append((caller.package_name, callee.package_name))
-
-                elif caller.package_name in black_listed_packages:
+        for node in self.call_graph.nodes_iter():
+            package = getattr(node, 'package_name', None)
 
-                    edges_to_remove.append(edge)
-                    nodes_to_remove.add(caller)
+            if package and AndroidCallGraph._is_black_listed_package(package) and \
+                    not (node.is_input() or node.is_output()):
+                if package not in package_nodes:
+                    package_nodes[package] = Call(package, "package_node", Environments.ANDROID)
 
-                    edges_to_add.append((caller.package_name, callee))
+                mapping[node] = package_nodes[package]
 
-                elif callee.package_name in black_listed_packages:
+        weights = dict()
 
-                    edges_to_remove.append(edge)
-                    nodes_to_remove.add(callee)
+        for node in mapping:
+            edges = [(mapping[node], mapping.get(s, s)) for s in self.call_graph.successors_iter(node)]
+            edges.extend(
+                (p, mapping[node]) for p in self.call_graph.predecessors_iter(node) if p not in mapping
+            )
 
-                    edges_to_add.append((caller, callee.package_name))
+            for edge in edges:
+                if edge not in weights:
+                    caller, callee = edge
+                    weights[edge] = self.call_graph.succ.get(caller, {}).get(callee, {}).get('weight', 0)
 
-        self.call_graph.remove_edges_from(edges_to_remove)
-        self.call_graph.remove_nodes_from(nodes_to_remove)
+                weights[edge] += 1
 
-        for e in edges_to_add:
-            edge_data = self.call_graph.get_edge_data(*e)
+        utilities.relabel(self.call_graph, mapping)
+        attributes.add_edges_from(
+            self.call_graph, ((caller, callee, {'weight': w}) for ((caller, callee), w) in weights.items())
+        )
 
-            if not edge_data:
-                self.call_graph.add_edge(*e, weight=1)
-            else:
-                self.call_graph.add_edge(*e, weight=edge_data["weight"] + 1)
\ No newline at end of file
+        self.invalidate()
@@ -0,0 +1,275 @@
+import weakref
+
+
+class Flags():
+    """Class to enumerate the bit flags that encode edge attributes"""
+    CALL = 1
+    RETURN = 2
+    CFLOW = 4
+    GPROF = 8
+
+    _names = {'call': CALL, 'return': RETURN, 'cflow': CFLOW, 'gprof': GPROF}
+
+
+class SharedAttributes(dict):
+
+    """An immutable dictionary of edge attributes shared by several edges.
+
+    networkx stores a dictionary of attributes for every edge, yet the edges
+    of a call graph carry only a handful of distinct combinations of
+    attributes. Interning those combinations as instances of
+    SharedAttributes allows edges with identical attributes to share a single
+    dictionary. The attributes that identify the kind of an edge are also
+    encoded in flags (see Flags), so that they can be tested using bitwise
+    operations.
+
+    Since an instance is shared, attempting to modify it raises TypeError.
+    The attributes of an edge added using add_edge can nevertheless be
+    modified through the graph, as in graph[caller][callee]['weight'] = 1 or
+    networkx.set_edge_attributes: looking the edge up that way gives it a
+    copy of its attributes of its own (see Adjacency). An instance is
+    discarded once no edge uses it.
+    """
+
+    __slots__ = ('flags', '__weakref__')
+
+    _instances = weakref.WeakValueDictionary()
+
+    def __init__(self, attrs):
+        """SharedAttributes constructor.
+
+        Instances should be obtained using SharedAttributes.intern.
+
+        Parameters
+        ----------
+        attrs : dict
+            The attributes of an edge.
+        """
+        super(SharedAttributes, self).__init__(attrs)
+        self.flags = 0
+        for key in self:
+            self.flags |= Flags._names.get(key, 0)
+
+    @classmethod
+    def intern(cls, attrs):
+        """Return the shared instance equal to a dictionary of attributes.
+
+        Parameters
+        ----------
+        attrs : dict
+            The attributes of an edge.
+
+        Returns
+        -------
+        attributes : SharedAttributes or dict
+            The instance of SharedAttributes equal to attrs, with values of
+            the same types, or, if one of the values in attrs is not
+            hashable, a copy of attrs.
+        """
+        if isinstance(attrs, SharedAttributes):
+            return attrs
+
+        try:
+            # The type of each value is part of the key so that, e.g.,
+            #   {'weight': 1} and {'weight': 1.0} are not interned together.
+            key = frozenset((k, type(v), v) for (k, v) in attrs.items())
+        except TypeError:
+            return dict(attrs)
+
+        attributes = cls._instances.get(key)
+        if attributes is None:
+            attributes = cls(attrs)
+            cls._instances[key] = attributes
+        return attributes
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Shared edge attributes cannot be modified.')
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = _immutable
+
+    def update(self, *args, **kwargs):
+        # networkx updates the attributes of an existing edge even when there
+        #   are no attributes to update it with.
+        if dict(*args, **kwargs):
+            self._immutable()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (SharedAttributes.intern, (dict(self),))
+
+
+class Adjacency(dict):
+
+    """The neighbors of a node, mapped to the attributes of the edges.
+
+    add_edge replaces the dictionaries of neighbors that networkx keeps for
+    the nodes of a graph (graph.succ[node] and graph.pred[node]) with
+    instances of Adjacency. Looking the attributes of an edge up in an
+    instance, as in graph[caller][callee], graph.edge[caller][callee] or
+    graph.succ[caller].get(callee), copies them on behalf of the edge if
+    they are shared (see SharedAttributes), so that they can be modified
+    without affecting other edges. Iterating over the attributes, as in
+    graph.edges_iter(data=True), does not copy them.
+    """
+
+    __slots__ = ('graph', 'node', 'reverse')
+
+    def __init__(self, graph, node, reverse, neighbors):
+        """Adjacency constructor.
+
+        Parameters
+        ----------
+        graph : networkx.DiGraph
+            The graph that node is in.
+        node : object
+            The node the neighbors of which are mapped.
+        reverse : bool
+            True if the neighbors are the predecessors of node, False if they
+            are its successors.
+        neighbors : dict
+            The neighbors of node, mapped to the attributes of the edges.
+        """
+        super(Adjacency, self).__init__(neighbors)
+        self.graph = graph
+        self.node = node
+        self.reverse = reverse
+
+    def __getitem__(self, neighbor):
+        attrs = dict.__getitem__(self, neighbor)
+        if isinstance(attrs, SharedAttributes):
+            attrs = dict(attrs)
+            (caller, callee) = (self.node, neighbor)
+            if self.reverse:
+                (caller, callee) = (neighbor, self.node)
+            dict.__setitem__(self.graph.succ[caller], callee, attrs)
+            dict.__setitem__(self.graph.pred[callee], caller, attrs)
+        return attrs
+
+    def get(self, neighbor, default=None):
+        if neighbor in self:
+            return self[neighbor]
+        return default
+
+
+def get_attrs(graph, caller, callee, default=None):
+    """Return the attributes of an edge as they are, even if shared.
+
+    Unlike graph[caller][callee] (see Adjacency), shared attributes are not
+    copied, so the attributes returned must not be modified.
+
+    Parameters
+    ----------
+    graph : networkx.DiGraph
+        The graph that the edge is in.
+    caller : Call
+        An instance of Call representing the source of the edge.
+    callee : Call
+        An instance of Call representing the destination of the edge.
+    default : object, optional
+        The value returned if there is no such edge.
+
+    Returns
+    -------
+    attrs : dict
+        The attributes of the edge or default.
+    """
+    return dict.get(graph.succ.get(caller, {}), callee, default)
+
+
+def get_flags(attrs):
+    """Return the bit flags encoding the kind of an edge.
+
+    Parameters
+    ----------
+    attrs : dict
+        The attributes of an edge.
+
+    Returns
+    -------
+    flags : int
+        A combination of the values enumerated in Flags.
+    """
+    if isinstance(attrs, SharedAttributes):
+        return attrs.flags
+
+    flags = 0
+    for key in attrs:
+        flags |= Flags._names.get(key, 0)
+    return flags
+
+
+def add_edge(graph, caller, callee, attrs):
+    """Add an edge with shared attributes to a graph.
+
+    If the edge exists, its attributes are combined with attrs, with the
+    values in attrs taking precedence.
+
+    Parameters
+    ----------
+    graph : networkx.DiGraph
+        The graph to add the edge to.
+    caller : Call
+        An instance of Call representing the source of the edge.
+    callee : Call
+        An instance of Call representing the destination of the edge.
+    attrs : dict
+        The attributes of the edge.
+
+    Returns
+    -------
+    None
+    """
+    if caller not in graph.succ:
+        graph.add_node(caller)
+    if callee not in graph.succ:
+        graph.add_node(callee)
+
+    successors = graph.succ[caller]
+    if type(successors) is not Adjacency:
+        successors = Adjacency(graph, caller, False, successors)
+        graph.succ[caller] = successors
+    predecessors = graph.pred[callee]
+    if type(predecessors) is not Adjacency:
+        predecessors = Adjacency(graph, callee, True, predecessors)
+        graph.pred[callee] = predecessors
+
+    _attrs = dict.get(successors, callee)
+    if _attrs is attrs:
+        return
+    if _attrs:
+        _attrs = dict(_attrs)
+        _attrs.update(attrs)
+        attrs = _attrs
+
+    attrs = SharedAttributes.intern(attrs)
+    dict.__setitem__(successors, callee, attrs)
+    dict.__setitem__(predecessors, caller, attrs)
+
+
+def add_edges_from(graph, edges):
+    """Add edges with shared attributes to a graph.
+
+    Parameters
+    ----------
+    graph : networkx.DiGraph
+        The graph to add the edges to.
+    edges : iterable
+        An iterable of two-tuples, (caller, callee), or three-tuples,
+        (caller, callee, attributes). See add_edge.
+
+    Returns
+    -------
+    None
+    """
+    empty = SharedAttributes.intern(dict())
+    for edge in edges:
+        if len(edge) == 3:
+            add_edge(graph, *edge)
+        else:
+            add_edge(graph, edge[0], edge[1], empty)
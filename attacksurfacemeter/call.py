@@ -188,6 +188,8 @@ class Call():
         is_equal : bool
             True if this instance is equal to other, False otherwise.
         """
+        if not isinstance(other, Call):
+            return NotImplemented
         return self.identity == other.identity
 
     def __ne__(self, other):
@@ -203,6 +205,8 @@ class Call():
         is_notequal : bool
             True if this instance is not equal to other, False otherwise.
         """
+        if not isinstance(other, Call):
+            return NotImplemented
         return self.identity != other.identity
 
     @staticmethod
@@ -1,13 +1,30 @@
+import collections
+import hashlib
+import itertools
 import json
-import os
+import multiprocessing
+import random
 import statistics as stat
 
 import networkx as nx
 
-from attacksurfacemeter import utilities
+from attacksurfacemeter import attributes, risky_walk, utilities
+from attacksurfacemeter.attributes import Flags
 from attacksurfacemeter.call import Call
 from attacksurfacemeter.environments import Environments
 from attacksurfacemeter.granularity import Granularity
+from attacksurfacemeter.metric_cache import MetricCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MISSING = object()
+
+# The attributes of a call that contribute to the weight of an edge. See
+#   assign_weights.
+_WEIGHTED_ATTRIBUTES = ('dangerous', 'defense', 'tested', 'vulnerable')
 
 
 class CallGraph():
@@ -19,13 +36,24 @@ class CallGraph():
     """
 
     def __init__(self, source, graph, load_errors=None, fragmentize=False,
-                 granularity=Granularity.FUNC):
+                 granularity=Granularity.FUNC, cache=None):
         """CallGraph constructor.
 
         The call graph is split into strongly connected component subgraphs
         (referred to as fragments). The largest fragment is used as the call
         graph of the system.
 
+        When graph is marked as having implicit return edges (see
+        BaseLoader), only the call edges are stored and the return edge that
+        mirrors each call edge is followed by traversing the call edge in
+        reverse. The metrics are identical to those of the equivalent call
+        graph with explicit return edges.
+
+        Metrics are cached (see MetricCache) until the call graph is modified.
+        The methods of CallGraph that modify the call graph invalidate the
+        cached metrics; code that modifies call_graph directly must call
+        invalidate.
+
         Parameters
         ----------
         source : str
@@ -45,6 +73,9 @@ class CallGraph():
         granularity : str
             The granularity at which the call graph was loaded. See
             attacksurfacemeter.granularity.Granularity for available choices.
+        cache : MetricCache, optional
+            The cache in which metrics are stored. When not specified, the
+            metrics are cached in memory only.
 
         Returns
         -------
@@ -57,31 +88,125 @@ class CallGraph():
         self.num_fragments = None
         self.monolithicity = None
         self.granularity = granularity
+        self.implicit_returns = graph.graph.get('implicit_returns', False)
+        self.cache = cache if cache is not None else MetricCache()
+        self.version = 0
 
-        self._init()
+        self._fingerprint = None
         self._sanitize()
 
         if fragmentize:
-            fragments = utilities.get_fragments(graph)
-            fragment = utilities.get_largest_fragment(fragments)
+            (fragment, self.num_fragments) = (
+                utilities.get_largest_component(graph)
+            )
 
-            self.num_fragments = len(fragments)
             self.monolithicity = len(fragment.nodes()) / len(graph.nodes())
             self.call_graph = fragment
 
-    def _init(self):
-        """Initialize private instance variables."""
-        self._entry_points = None
-        self._exit_points = None
+    def invalidate(self):
+        """Invalidate the metrics cached for the call graph.
+
+        The version of the call graph is incremented, so metrics cached for
+        previous versions are no longer used.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self.version += 1
+
+    @property
+    def fingerprint(self):
+        """Return a digest of the contents of the call graph.
+
+        Two call graphs with the same nodes, edges and attributes have the
+        same fingerprint, even when loaded by different processes. The
+        fingerprint is computed once per version of the call graph.
+
+        Parameters
+        ----------
+        None
 
-        self._degree = None
-        self._fan = None
+        Returns
+        -------
+        fingerprint : str
+            A hexadecimal digest.
+        """
+        if self._fingerprint is None or self._fingerprint[0] != self.version:
+            # The digests of the nodes and edges are summed rather than
+            # sorted, so the fingerprint is independent of the order in which
+            # they are stored. Attributes are shared by many edges (see
+            # attributes.intern), so each is rendered only once.
+            rendered = dict()
+            total = 0
+            items = itertools.chain(
+                ((n, attrs) for (n, attrs) in
+                 self.call_graph.nodes_iter(data=True)),
+                (((u, v), attrs) for (u, v, attrs) in
+                 self.call_graph.edges_iter(data=True))
+            )
+            for (key, attrs) in items:
+                if id(attrs) not in rendered:
+                    # attrs is kept so that its id is not reused
+                    rendered[id(attrs)] = (attrs, repr(sorted(attrs.items())))
+                digest = hashlib.sha1(
+                    (repr(key) + rendered[id(attrs)][1]).encode()
+                )
+                total += int.from_bytes(digest.digest(), 'big')
+
+            digest = hashlib.sha1(
+                repr((self.granularity, self.implicit_returns)).encode()
+            )
+            digest.update(str(total).encode())
+            self._fingerprint = (self.version, digest.hexdigest())
+        return self._fingerprint[1]
+
+    def _get_metric(self, name, params, compute, persistent=True):
+        """Return a metric from the cache, computing it if necessary.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric.
+        params : tuple
+            The parameters of the metric. Must be hashable.
+        compute : callable
+            A callable that computes the metric when it is not cached.
+        persistent : bool, optional
+            If true, the metric is also looked up in and written to the store
+            of the cache, if any.
+
+        Returns
+        -------
+        metric : object
+            The metric.
+        """
+        key = (name, params, self.version)
+        persistent_key = None
+        if persistent:
+            persistent_key = (lambda: (name, params, self.fingerprint))
+
+        value = self.cache.get(key, _MISSING, persistent_key)
+        if value is _MISSING:
+            value = compute()
+            self.cache.put(key, value, persistent_key)
+        return value
 
     def _sanitize(self):
-        """Sanitize the graph by removing empty nodes."""
-        for (node, _) in self.nodes:
-            if not str(node):
-                self.call_graph.remove_node(node)
+        """Sanitize the graph by removing empty nodes.
+
+        Calls are compared by identity, so there is at most one node with an
+        empty identity, which is looked up instead of searched for. The
+        loaders do not add such a node (see utilities.get_node_attrs) but a
+        graph constructed otherwise may have one.
+        """
+        empty = Call('', '', Environments.C, self.granularity)
+        if empty in self.call_graph:
+            self.call_graph.remove_node(empty)
 
     @classmethod
     def from_loader(cls, loader, fragmentize=False,
@@ -127,32 +252,429 @@ class CallGraph():
             An instance of CallGraph representing a call graph obtained by
             merging call graphs loaded by CflowLoader and GprofLoader.
         """
-        source = "cflow: {0} - gprof: {1}".format(
-            cflow_call_graph.source, gprof_call_graph.source
-        )
-        utilities.fix(cflow_call_graph, using=gprof_call_graph)
-
-        graph = nx.DiGraph()
-
         # WARNING: The merge order CANNOT change. The value of the 'tested'
         #   attribute of the graph nodes works on the assumption that nodes
         #   from cflow are merged in first. Similarly, the weights of edges in
         #   gprof are lower than those in cflow and the merged graph is
         #   expected to have the edge weights match those from gprof.
+        call_graph = cls.merge(
+            cflow_call_graph, gprof_call_graph, fragmentize=fragmentize
+        )
+        call_graph.source = "cflow: {0} - gprof: {1}".format(
+            cflow_call_graph.source, gprof_call_graph.source
+        )
+
+        return call_graph
+
+    @classmethod
+    def merge(cls, *call_graphs, fragmentize=False):
+        """Construct a CallGraph from the union of any number of call graphs.
+
+        A node without a function signature is reconciled with the node that
+        has the same function name and a function signature in any of the
+        call graphs, provided there is exactly one such node (see
+        utilities.fix). Nodes and edges are merged in the order of
+        call_graphs, with the attributes from later call graphs taking
+        precedence. The call graphs being merged are not modified.
+
+        Parameters
+        ----------
+        call_graphs : CallGraph
+            Instances of CallGraph, all loaded at the same granularity and
+            either all with or all without implicit return edges.
+        fragmentize : bool, optional
+            If true, the merged call graph is fragmentized such that the
+            largest subgraph becomes the new call graph.
 
-        # Load nodes including any attributes that may be associated with them
-        graph.add_nodes_from(cflow_call_graph.nodes)
-        graph.add_nodes_from(gprof_call_graph.nodes)
+        Returns
+        -------
+        call_graph : CallGraph
+            An instance of CallGraph representing the union of call_graphs.
+        """
+        if not call_graphs:
+            raise Exception('At least one call graph is required to merge.')
+        if len(set(g.implicit_returns for g in call_graphs)) > 1:
+            raise Exception(
+                'Call graphs with implicit and explicit return edges cannot '
+                'be merged.'
+            )
+        if len(set(g.granularity for g in call_graphs)) > 1:
+            raise Exception(
+                'Call graphs at different granularities cannot be merged.'
+            )
+
+        index = utilities.get_name_index(
+            n for g in call_graphs for n in g.call_graph
+            if n.function_signature
+        )
+        mapping = dict()
+        for g in call_graphs:
+            for n in g.call_graph:
+                if not n.function_signature:
+                    reference = index.get(n.function_name)
+                    if reference is not None:
+                        mapping[n] = reference
+
+        graph = nx.DiGraph()
+        graph.graph.update(call_graphs[0].call_graph.graph)
+        for g in call_graphs:
+            # Load nodes including any attributes that may be associated with
+            #   them
+            for (node, attrs) in g.call_graph.nodes_iter(data=True):
+                node = mapping.get(node, node)
+                if node in graph.node:
+                    graph.node[node].update(attrs)
+                else:
+                    graph.add_node(node, dict(attrs))
+
+            # Load edges including any attributes that may be associated with
+            #   them. Edge attributes are shared, not copied.
+            attributes.add_edges_from(
+                graph,
+                (
+                    (mapping.get(u, u), mapping.get(v, v), attrs)
+                    for (u, v, attrs) in g.call_graph.edges_iter(data=True)
+                )
+            )
 
-        # Load edges including any attributes that may be associated with them
-        graph.add_edges_from(cflow_call_graph.edges)
-        graph.add_edges_from(gprof_call_graph.edges)
+        source = ' - '.join(str(g.source) for g in call_graphs)
+        load_errors = list()
+        for g in call_graphs:
+            load_errors.extend(g.load_errors or list())
 
-        load_errors = (
-            cflow_call_graph.load_errors + gprof_call_graph.load_errors
+        return cls(
+            source, graph, load_errors, fragmentize,
+            call_graphs[0].granularity
         )
 
-        return cls(source, graph, load_errors, fragmentize)
+    def add_profile(self, gprof_call_graph):
+        """Fold a call graph loaded from a gprof profile into the call graph.
+
+        The call graph is updated in place, as if it had been merged with
+        gprof_call_graph (see merge), except that the frequency of a node that
+        has already been tested is incremented by its frequency in
+        gprof_call_graph, like when loading several profiles using
+        MultigprofLoader. The entry points, exit points, degree and fan that
+        have been computed are updated to account for the new nodes, edges
+        and attributes, whereas all other cached metrics are invalidated.
+        They are discarded only if a node without a function signature had to
+        be reconciled with a node in gprof_call_graph.
+
+        Parameters
+        ----------
+        gprof_call_graph : CallGraph
+            An instance of CallGraph representing a call graph generated using
+            GNU gprof and loaded using GprofLoader. It is not modified.
+
+        Returns
+        -------
+        None
+        """
+        profile = gprof_call_graph
+        if profile.implicit_returns != self.implicit_returns:
+            raise Exception(
+                'Call graphs with implicit and explicit return edges cannot '
+                'be merged.'
+            )
+        if profile.granularity != self.granularity:
+            raise Exception(
+                'Call graphs at different granularities cannot be merged.'
+            )
+
+        graph = self.call_graph
+
+        index = utilities.get_name_index(
+            n for g in (graph, profile.call_graph) for n in g
+            if n.function_signature
+        )
+        mapping = dict()
+        for g in (graph, profile.call_graph):
+            for n in g:
+                if not n.function_signature:
+                    reference = index.get(n.function_name)
+                    if reference is not None:
+                        mapping[n] = reference
+
+        metrics = [
+            'entry_points', 'exit_points', 'degree', 'fan', 'attribute_index'
+        ]
+        (_entry_points, _exit_points, degree, fan, index) = [
+            self.cache.pop((name, (), self.version)) for name in metrics
+        ]
+
+        _mapping = {n: m for (n, m) in mapping.items() if n in graph}
+        if _mapping:
+            if index is not None:
+                for node in _mapping:
+                    for attribute in graph.node[node]:
+                        del index[attribute][node]
+            utilities.relabel(graph, _mapping)
+            if index is not None:
+                for node in set(_mapping.values()):
+                    for attribute in graph.node[node]:
+                        index.setdefault(attribute, dict())[node] = None
+            (_entry_points, _exit_points, degree, fan) = (None, ) * 4
+
+        self.invalidate()
+
+        entry_points = exit_points = None
+        if _entry_points is not None:
+            entry_points = set(_entry_points)
+        if _exit_points is not None:
+            exit_points = set(_exit_points)
+
+        for (node, attrs) in profile.call_graph.nodes_iter(data=True):
+            node = mapping.get(node, node)
+            if node in graph.node:
+                _attrs = graph.node[node]
+                frequency = None
+                if 'tested' in _attrs and 'frequency' in _attrs:
+                    frequency = _attrs['frequency'] + attrs.get('frequency', 0)
+                _attrs.update(attrs)
+                if frequency is not None:
+                    _attrs['frequency'] = frequency
+            else:
+                graph.add_node(node, dict(attrs))
+                if degree is not None:
+                    degree[node] = (0, 0)
+                if fan is not None:
+                    fan[node] = (0, 0)
+
+            if index is not None:
+                for attribute in attrs:
+                    index.setdefault(attribute, dict())[node] = None
+            if entry_points is not None and 'entry' in attrs:
+                if node not in entry_points:
+                    entry_points.add(node)
+                    _entry_points.append(node)
+            if exit_points is not None and 'exit' in attrs:
+                if node not in exit_points:
+                    exit_points.add(node)
+                    _exit_points.append(node)
+
+        for (caller, callee, attrs) in profile.call_graph.edges_iter(
+            data=True
+        ):
+            caller = mapping.get(caller, caller)
+            callee = mapping.get(callee, callee)
+
+            _attrs = attributes.get_attrs(graph, caller, callee)
+            is_new = _attrs is None
+            was_call = (
+                not is_new and attributes.get_flags(_attrs) & Flags.CALL
+            )
+            is_reciprocated = graph.has_edge(callee, caller)
+
+            attributes.add_edge(graph, caller, callee, attrs)
+
+            if degree is not None and is_new:
+                self._add_degree(degree, caller, callee, is_reciprocated)
+            flags = attributes.get_flags(
+                attributes.get_attrs(graph, caller, callee)
+            )
+            if fan is not None and not was_call and flags & Flags.CALL:
+                (fan_in, fan_out) = fan[caller]
+                fan[caller] = (fan_in, fan_out + 1)
+                (fan_in, fan_out) = fan[callee]
+                fan[callee] = (fan_in + 1, fan_out)
+
+        for (name, value) in zip(
+            metrics, [_entry_points, _exit_points, degree, fan, index]
+        ):
+            if value is not None:
+                self.cache.put((name, (), self.version), value)
+
+        self.source = '{0} - gprof: {1}'.format(self.source, profile.source)
+        self.load_errors = (
+            (self.load_errors or list()) + (profile.load_errors or list())
+        )
+
+    def _add_degree(self, degree, caller, callee, is_reciprocated):
+        """Update the degree computed to account for a new edge.
+
+        Parameters
+        ----------
+        degree : dict
+            A dictionary keyed by call with (indegree, outdegree) as the
+            value. See get_degree.
+        caller : Call
+            An instance of Call representing the source of the new edge.
+        callee : Call
+            An instance of Call representing the destination of the new edge.
+        is_reciprocated : bool
+            True if the edge callee -- caller existed before the new edge was
+            added, False otherwise.
+
+        Returns
+        -------
+        None
+        """
+        if not self.implicit_returns:
+            (in_degree, out_degree) = degree[caller]
+            degree[caller] = (in_degree, out_degree + 1)
+            (in_degree, out_degree) = degree[callee]
+            degree[callee] = (in_degree + 1, out_degree)
+        elif not is_reciprocated:
+            for node in set([caller, callee]):
+                _degree = degree[node][0] + 1
+                degree[node] = (_degree, _degree)
+
+    def project(self, granularity):
+        """Return the call graph at a coarser granularity.
+
+        The call graph is collapsed into its quotient graph by grouping nodes
+        by their identity at the given granularity, e.g. functions by the file
+        they are defined in. Node and edge attributes are combined and the
+        number of edges that were collapsed into each edge is recorded in the
+        edge attribute 'multiplicity'. The call graph is neither reloaded nor
+        modified.
+
+        Parameters
+        ----------
+        granularity : str
+            The granularity of the projection. See
+            attacksurfacemeter.granularity.Granularity for available choices.
+
+        Returns
+        -------
+        call_graph : CallGraph
+            An instance of CallGraph representing the call graph at the given
+            granularity.
+        """
+        if (self.granularity != Granularity.FUNC and
+                granularity != self.granularity):
+            raise Exception(
+                'Projection from {0} to {1} granularity is undefined.'.format(
+                    self.granularity, granularity
+                )
+            )
+
+        graph = utilities.project(
+            self.call_graph, granularity, multiplicity='multiplicity'
+        )
+
+        return self.__class__(
+            self.source, graph, self.load_errors, granularity=granularity
+        )
+
+    def diff(self, other):
+        """Return the changes to the attack surface from the call graph.
+
+        Typically, the call graph is that of a release of a software system
+        and other is that of the subsequent release. Nodes and edges are
+        matched by the identity of the calls (see Call.identity) using hash
+        joins, so that the comparison takes time linear in the size of the
+        call graphs. Return edges are compared regardless of whether they
+        are explicit or implicit in either call graph.
+
+        Parameters
+        ----------
+        other : CallGraph
+            An instance of CallGraph loaded at the same granularity as the
+            call graph.
+
+        Returns
+        -------
+        diff : dict
+            A dictionary with the keys 'nodes', 'edges', 'entry_points',
+            'exit_points', and 'dangerous', each mapped to a dictionary with
+            the keys 'added' and 'removed', and the keys 'fan' and 'counts'.
+            Added nodes are those of other and removed nodes are those of
+            the call graph. Edges are represented as two-tuples, (caller,
+            callee). All lists are sorted by identity. 'fan' maps each node
+            of other that is also in the call graph, and the fan metrics of
+            which changed, to a two-tuple, (fan_in, fan_out), of differences.
+            'counts' maps 'nodes', 'edges', 'entry_points', 'exit_points',
+            and 'dangerous' to the difference in the number of each.
+        """
+        if self.granularity != other.granularity:
+            raise Exception(
+                'Call graphs at different granularities cannot be compared.'
+            )
+
+        nodes = (CallGraph._get_node_index(self.call_graph),
+                 CallGraph._get_node_index(other.call_graph))
+        edges = (
+            {(u.identity, v.identity): (u, v) for (u, v, _) in self.edges},
+            {(u.identity, v.identity): (u, v) for (u, v, _) in other.edges}
+        )
+
+        diff = dict()
+        diff['nodes'] = CallGraph._get_changes(*nodes)
+        diff['edges'] = CallGraph._get_changes(*edges)
+        for (key, attribute) in [('entry_points', 'entry'),
+                                 ('exit_points', 'exit'),
+                                 ('dangerous', 'dangerous')]:
+            diff[key] = CallGraph._get_changes(
+                CallGraph._get_node_index(self.get_nodes(attribute)),
+                CallGraph._get_node_index(other.get_nodes(attribute))
+            )
+
+        fan = dict()
+        if nodes[0] and nodes[1]:
+            (before, after) = (self.get_fan(), other.get_fan())
+            for (identity, call) in nodes[1].items():
+                if identity in nodes[0]:
+                    (fan_in, fan_out) = before[nodes[0][identity]]
+                    delta = (after[call][0] - fan_in, after[call][1] - fan_out)
+                    if delta != (0, 0):
+                        fan[call] = delta
+        diff['fan'] = fan
+
+        diff['counts'] = {
+            'nodes': len(nodes[1]) - len(nodes[0]),
+            'edges': len(edges[1]) - len(edges[0])
+        }
+        for key in ['entry_points', 'exit_points', 'dangerous']:
+            diff['counts'][key] = (
+                len(diff[key]['added']) - len(diff[key]['removed'])
+            )
+
+        return diff
+
+    @staticmethod
+    def _get_node_index(calls):
+        """Return a dictionary of calls keyed by their identity.
+
+        Parameters
+        ----------
+        calls : iterable
+            An iterable of Call objects.
+
+        Returns
+        -------
+        index : dict
+            A dictionary keyed by the identity of each call with the call as
+            the value.
+        """
+        return {call.identity: call for call in calls}
+
+    @staticmethod
+    def _get_changes(before, after):
+        """Return the items added to and removed from an index.
+
+        Parameters
+        ----------
+        before : dict
+            A dictionary keyed by identity, e.g. as returned by
+            _get_node_index.
+        after : dict
+            A dictionary keyed by identity.
+
+        Returns
+        -------
+        changes : dict
+            A dictionary with the keys 'added' and 'removed' mapped to the
+            values in after whose keys are not in before and the values in
+            before whose keys are not in after, respectively, each sorted by
+            key.
+        """
+        return {
+            'added': [after[k] for k in sorted(after.keys() - before.keys())],
+            'removed': [
+                before[k] for k in sorted(before.keys() - after.keys())
+            ]
+        }
 
     @property
     def entry_points(self):
@@ -167,9 +689,9 @@ class CallGraph():
         entry_points : list
             A list of Call objects, each representing an entry point.
         """
-        if self._entry_points is None:
-            self._entry_points = self.get_nodes('entry')
-        return self._entry_points
+        return self._get_metric(
+            'entry_points', (), lambda: self.get_nodes('entry')
+        )
 
     @property
     def exit_points(self):
@@ -184,9 +706,9 @@ class CallGraph():
         exit_points : list
             A list of Call objects, each representing an exit point.
         """
-        if self._exit_points is None:
-            self._exit_points = self.get_nodes('exit')
-        return self._exit_points
+        return self._get_metric(
+            'exit_points', (), lambda: self.get_nodes('exit')
+        )
 
     @property
     def nodes(self):
@@ -220,8 +742,175 @@ class CallGraph():
             source and destination are instances of Call representing the
             vertices of a directed edge from source to destination and
             attributes is a dictionary of attributes associated with the node.
+            Implicit return edges are included.
         """
-        return self.call_graph.edges(data=True)
+        if not self.implicit_returns:
+            return self.call_graph.edges(data=True)
+
+        edges = list()
+        for (caller, callee) in self.call_graph.edges_iter():
+            edges.append((caller, callee, self._get_edge_data(caller, callee)))
+            if not self.call_graph.has_edge(callee, caller):
+                edges.append(
+                    (callee, caller, self._get_edge_data(callee, caller))
+                )
+        return edges
+
+    def _get_edge_data(self, source, destination):
+        """Return the attributes of an edge that may be an implicit return.
+
+        Parameters
+        ----------
+        source : Call
+            An instance of Call representing the source of the edge.
+        destination : Call
+            An instance of Call representing the destination of the edge.
+
+        Returns
+        -------
+        attributes : dict
+            The attributes that the edge would have had, had the return edges
+            been explicit.
+        """
+        attrs = dict()
+        if self.call_graph.has_edge(destination, source):
+            _attrs = attributes.get_attrs(
+                self.call_graph, destination, source
+            )
+            attrs.update(
+                (k, v) for (k, v) in _attrs.items()
+                if k not in ('call', 'weight', 'return_weight')
+            )
+            attrs['return'] = None
+            if 'return_weight' in _attrs:
+                attrs['weight'] = _attrs['return_weight']
+        if self.call_graph.has_edge(source, destination):
+            attrs.update(
+                attributes.get_attrs(self.call_graph, source, destination)
+            )
+            attrs.pop('return_weight', None)
+        return attrs
+
+    def _get_neighbors(self, call, reverse=False):
+        """Return the calls at the other end of the edges of a specific call.
+
+        Parameters
+        ----------
+        call : Call
+            An instance of Call the neighbors of which should be returned.
+        reverse : bool, optional
+            If true, the calls at the source of the edges incident on call are
+            returned, else the calls at the destination of the edges incident
+            from call are returned.
+
+        Returns
+        -------
+        neighbors : iterator
+            An iterator over Call objects. A call may be repeated.
+        """
+        if self.implicit_returns:
+            # Every call edge is mirrored by an (implicit) return edge, so
+            #   the edges of a call can be traversed in either direction.
+            return itertools.chain(
+                self.call_graph.successors_iter(call),
+                self.call_graph.predecessors_iter(call)
+            )
+        if reverse:
+            return self.call_graph.predecessors_iter(call)
+        return self.call_graph.successors_iter(call)
+
+    def _compute_path_lengths(self, call, reverse=False):
+        """Compute the length of the shortest path from call to other calls.
+
+        See get_path_lengths. The lengths are not cached, as there is a
+        dictionary per call, as large as the call graph.
+        """
+        if call not in self.call_graph:
+            return {call: 0}
+
+        lengths = {call: 0}
+        level = [call]
+        length = 0
+        while level:
+            length += 1
+            _level = list()
+            for node in level:
+                for neighbor in self._get_neighbors(node, reverse):
+                    if neighbor not in lengths:
+                        lengths[neighbor] = length
+                        _level.append(neighbor)
+            level = _level
+        return lengths
+
+    def get_path_lengths(self, call, reverse=False, max_depth=None,
+                         max_nodes=None):
+        """Return the length of the shortest path from call to other calls.
+
+        The traversal of the call graph stops as soon as one of the bounds,
+        if any, is reached, so that a bounded query visits only the
+        neighborhood of call.
+
+        Parameters
+        ----------
+        call : Call
+            An instance of Call from which the paths originate.
+        reverse : bool, optional
+            If true, the length of the shortest path from other calls to call
+            is returned instead.
+        max_depth : int, optional
+            The maximum length of the paths.
+        max_nodes : int, optional
+            The maximum number of calls returned, including call itself.
+
+        Returns
+        -------
+        lengths : tuple
+            A two-tuple, (lengths, truncated), where lengths is a dictionary
+            keyed by the calls reachable from (or, when reverse is true, the
+            calls that can reach) call, including call itself, with the
+            length of the shortest path as the value, and truncated is True
+            if some reachable calls were left out because a bound was
+            reached.
+        """
+        if max_depth is None and max_nodes is None:
+            return (self._compute_path_lengths(call, reverse), False)
+        return self._compute_bounded_path_lengths(
+            call, reverse, max_depth, max_nodes
+        )
+
+    def _compute_bounded_path_lengths(self, call, reverse, max_depth,
+                                      max_nodes):
+        """Compute the bounded length of the shortest paths from call.
+
+        See get_path_lengths.
+        """
+        lengths = {call: 0}
+        if call not in self.call_graph:
+            return (lengths, False)
+
+        level = [call]
+        length = 0
+        while level:
+            if max_depth is not None and length >= max_depth:
+                # The bound was hit only if the paths could go on
+                for node in level:
+                    for neighbor in self._get_neighbors(node, reverse):
+                        if neighbor not in lengths:
+                            return (lengths, True)
+                return (lengths, False)
+
+            length += 1
+            _level = list()
+            for node in level:
+                for neighbor in self._get_neighbors(node, reverse):
+                    if neighbor not in lengths:
+                        if max_nodes is not None and \
+                           len(lengths) >= max_nodes:
+                            return (lengths, True)
+                        lengths[neighbor] = length
+                        _level.append(neighbor)
+            level = _level
+        return (lengths, False)
 
     @utilities.deprecation
     def get_degree(self, call=None):
@@ -238,19 +927,33 @@ class CallGraph():
             A 2-tuple, (indegree, outdegree), of call (if provided) or a
             dictionary keyed by call with (indegree, outdegree) as the value.
         """
-        if self._degree is None:
+        degree = self._get_metric('degree', (), self._compute_degree)
+
+        if call:
+            return degree[call]
+        return degree
+
+    def _compute_degree(self):
+        """Compute the degree of every call. See get_degree."""
+        degree = None
+        if self.implicit_returns:
+            _degree = dict()
+            for i in self.call_graph:
+                count = len(set(self._get_neighbors(i)))
+                _degree[i] = (count, count)
+
+            if _degree:
+                degree = _degree
+        else:
             _in_degree = self.call_graph.in_degree()
             _out_degree = self.call_graph.out_degree()
 
             if _in_degree or _out_degree:
                 keys = set(list(_in_degree.keys()) + list(_out_degree.keys()))
-                self._degree = {
+                degree = {
                     k: (_in_degree[k], _out_degree[k]) for k in keys
                 }
-
-        if call:
-            return self._degree[call]
-        return self._degree
+        return degree
 
     def get_fan(self, call=None):
         """Return the fan metrics of a specific call.
@@ -266,32 +969,38 @@ class CallGraph():
             A 2-tuple, (fan_in, dan_out), of call (if provided) or a
             dictionary keyed by call with (fan_in, fan_out) as the value.
         """
-        if self._fan is None:
-            self._fan = dict()
-            for (i, _) in self.nodes:
-                _fan_in = _fan_out = 0
-
-                # # callers
-                _in_edges = self.call_graph.in_edges_iter(i, data=True)
-                _callers = [
-                    u for (u, _, attrs) in _in_edges if 'call' in attrs
-                ]
-                _fan_in = len(_callers)
-
-                # # callee
-                _out_edges = self.call_graph.out_edges_iter(i, data=True)
-                _callees = [
-                    u for (u, _, attrs) in _out_edges if 'call' in attrs
-                ]
-                _fan_out = len(_callees)
-
-                self._fan[i] = (_fan_in, _fan_out)
+        fan = self._get_metric('fan', (), self._compute_fan)
 
         if call:
-            return self._fan[call]
-        return self._fan
-
-    def get_ancestors(self, call):
+            return fan[call]
+        return fan
+
+    def _compute_fan(self):
+        """Compute the fan metrics of every call. See get_fan."""
+        fan = dict()
+        for (i, _) in self.nodes:
+            _fan_in = _fan_out = 0
+
+            # # callers
+            _in_edges = self.call_graph.in_edges_iter(i, data=True)
+            _callers = [
+                u for (u, _, attrs) in _in_edges
+                if attributes.get_flags(attrs) & Flags.CALL
+            ]
+            _fan_in = len(_callers)
+
+            # # callee
+            _out_edges = self.call_graph.out_edges_iter(i, data=True)
+            _callees = [
+                u for (u, _, attrs) in _out_edges
+                if attributes.get_flags(attrs) & Flags.CALL
+            ]
+            _fan_out = len(_callees)
+
+            fan[i] = (_fan_in, _fan_out)
+        return fan
+
+    def get_ancestors(self, call, max_depth=None, max_nodes=None):
         """Return the list of ancestors of a specific call.
 
         The list of ancestors represent all functions/methods that invoke the
@@ -301,6 +1010,11 @@ class CallGraph():
         ----------
         call : Call
             An instance of Call the ancestors of which should be returned.
+        max_depth : int, optional
+            The maximum length of the path from an ancestor to call.
+        max_nodes : int, optional
+            The maximum number of ancestors, plus one. See get_path_lengths
+            to find out whether a bound was reached.
 
         Returns
         -------
@@ -308,9 +1022,18 @@ class CallGraph():
             A list of Call objects, each of which represent the ancestor of the
             given call.
         """
-        return list(nx.ancestors(self.call_graph, call))
+        if call not in self.call_graph:
+            raise nx.NetworkXError(
+                'The node {0} is not in the graph.'.format(call)
+            )
+
+        ancestors = list(self.get_path_lengths(
+            call, True, max_depth, max_nodes
+        )[0])
+        ancestors.remove(call)
+        return ancestors
 
-    def get_descendants(self, call):
+    def get_descendants(self, call, max_depth=None, max_nodes=None):
         """Return the list of descendants of a specific call.
 
         The list of descendants represent all functions/methods that the given
@@ -320,6 +1043,11 @@ class CallGraph():
         ----------
         call : Call
             An instance of Call the descendants of which should be returned.
+        max_depth : int, optional
+            The maximum length of the path from call to a descendant.
+        max_nodes : int, optional
+            The maximum number of descendants, plus one. See get_path_lengths
+            to find out whether a bound was reached.
 
         Returns
         -------
@@ -327,7 +1055,97 @@ class CallGraph():
             A list of Call objects, each of which represent the descendant of
             the given call.
         """
-        return list(nx.descendants(self.call_graph, call))
+        if call not in self.call_graph:
+            raise nx.NetworkXError(
+                'The node {0} is not in the graph.'.format(call)
+            )
+
+        descendants = list(self.get_path_lengths(
+            call, False, max_depth, max_nodes
+        )[0])
+        descendants.remove(call)
+        return descendants
+
+    def get_attack_surface_nodes(self):
+        """Return the calls connected to the attack surface.
+
+        A call is connected to the attack surface if it is reachable from an
+        entry point or can reach an exit point. Rather than traversing the
+        call graph once per point, the descendants of all entry points are
+        found by a single traversal that starts at every entry point at once
+        and the ancestors of all exit points by a single reverse traversal,
+        so that each call is visited at most once per traversal.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        nodes : frozenset
+            The Call objects connected to the attack surface, including the
+            entry and exit points.
+        """
+        return self._get_metric(
+            'attack_surface_nodes', (), self._compute_attack_surface_nodes
+        )
+
+    def _compute_attack_surface_nodes(self):
+        """Compute the calls connected to the attack surface.
+
+        See get_attack_surface_nodes.
+        """
+        return frozenset(
+            self._get_reachable(self.entry_points) |
+            self._get_reachable(self.exit_points, reverse=True)
+        )
+
+    def _get_reachable(self, calls, reverse=False):
+        """Return the calls reachable from any of several calls.
+
+        Parameters
+        ----------
+        calls : iterable
+            The Call objects from which the paths originate.
+        reverse : bool, optional
+            If true, the calls that can reach any of calls are returned
+            instead.
+
+        Returns
+        -------
+        reachable : set
+            The Call objects reachable from (or, when reverse is true, that
+            can reach) calls, including those of calls in the call graph.
+        """
+        reachable = set(c for c in calls if c in self.call_graph)
+        level = list(reachable)
+        while level:
+            _level = list()
+            for node in level:
+                for neighbor in self._get_neighbors(node, reverse):
+                    if neighbor not in reachable:
+                        reachable.add(neighbor)
+                        _level.append(neighbor)
+            level = _level
+        return reachable
+
+    def attack_surface_subgraph(self):
+        """Return the subgraph of the calls connected to the attack surface.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        subgraph : networkx.DiGraph
+            The subgraph of the call graph induced by the calls returned by
+            get_attack_surface_nodes. As for networkx.DiGraph.subgraph, the
+            attributes of the subgraph, its nodes and its edges are those of
+            the call graph, not copies, so changes to them are reflected in
+            the call graph.
+        """
+        return self.call_graph.subgraph(self.get_attack_surface_nodes())
 
     def get_nodes(self, attribute):
         """Return a list of nodes that have a specific attribute set.
@@ -344,8 +1162,63 @@ class CallGraph():
             associated with them. An empty list is returned when there are no
             nodes that have the specified attribute associated with them.
         """
-        nodes = list(nx.get_node_attributes(self.call_graph, attribute).keys())
-        return nodes
+        return list(self._get_points(attribute))
+
+    def _get_points(self, attribute):
+        """Return the nodes that have a specific attribute set.
+
+        Subclasses that find the entry and exit points otherwise than by
+        their attributes override this method, so that every metric uses
+        the same points.
+
+        Parameters
+        ----------
+        attribute : str
+            The name of the attribute.
+
+        Returns
+        -------
+        nodes : collection
+            The Call objects that have the specified attribute set, in a
+            collection that supports fast membership tests. The collection
+            is cached and must not be modified.
+        """
+        return self._get_attribute_index().get(attribute, ())
+
+    def _get_attribute_index(self):
+        """Return the index of the nodes that have each attribute set.
+
+        The index is built in a single pass over the nodes and is kept up to
+        date as nodes are added, updated or relabeled by add_profile. Any
+        other modification of the call graph invalidates it.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        index : dict
+            A dictionary keyed by the name of an attribute with the nodes
+            that have the attribute set as the value. The nodes are stored as
+            the keys of a dictionary (with None as the value) to preserve
+            their order. The index is cached and must not be modified.
+        """
+        return self._get_metric(
+            'attribute_index', (), self._compute_attribute_index,
+            persistent=False
+        )
+
+    def _compute_attribute_index(self):
+        """Compute the index of the nodes that have each attribute set.
+
+        See _get_attribute_index.
+        """
+        index = dict()
+        for (node, attrs) in self.call_graph.nodes_iter(data=True):
+            for attribute in attrs:
+                index.setdefault(attribute, dict())[node] = None
+        return index
 
     def get_entry_point_reachability(self, call):
         """Return the percentage of system accessible from an entry point.
@@ -383,7 +1256,8 @@ class CallGraph():
 
         return len(self.get_ancestors(call)) / len(self.nodes)
 
-    def get_shortest_path_length(self, call, attribute):
+    def get_shortest_path_length(self, call, attribute, max_depth=None,
+                                 max_nodes=None):
         """Return shortest path from call to all nodes identified by attribute.
 
         Parameters
@@ -392,6 +1266,11 @@ class CallGraph():
             An object representing a function call in the call graph.
         attribute : str
             The name of the attribute that identifies the nodes.
+        max_depth : int, optional
+            The maximum length of the paths. Nodes farther from call are
+            ignored.
+        max_nodes : int, optional
+            The maximum number of calls visited. See get_path_lengths.
 
         Returns
         -------
@@ -406,16 +1285,17 @@ class CallGraph():
         """
         lengths = None
 
-        nodes = self.get_nodes(attribute)
+        nodes = self._get_points(attribute)
         if call in nodes:
             lengths = dict()
         else:
             _lengths = dict()
-            for node in self.get_nodes(attribute):
-                if nx.has_path(self.call_graph, source=call, target=node):
-                    _lengths[node] = nx.shortest_path_length(
-                        self.call_graph, source=call, target=node
-                    )
+            (path_lengths, _) = self.get_path_lengths(
+                call, False, max_depth, max_nodes
+            )
+            for node in nodes:
+                if node in path_lengths:
+                    _lengths[node] = path_lengths[node]
 
             if _lengths:
                 lengths = _lengths
@@ -423,7 +1303,8 @@ class CallGraph():
         return lengths
 
     @utilities.deprecation
-    def get_entry_surface_metrics(self, call):
+    def get_entry_surface_metrics(self, call, max_depth=None,
+                                   max_nodes=None):
         """Return entry surface metrics collected for a particular function.
 
         In addition to the metrics, a list of Call objects representing the
@@ -433,35 +1314,28 @@ class CallGraph():
         ----------
         call : Call
             An object representing a function call in the call graph.
+        max_depth : int, optional
+            The maximum length of the paths between call and the points.
+            Points farther from call are ignored.
+        max_nodes : int, optional
+            The maximum number of calls visited. See get_path_lengths.
 
         Returns
         -------
         metrics : dictionary
-            A dictionary with keys: points, proximity, and surface_coupling.
+            A dictionary with keys: points, proximity, surface_coupling, and
+            truncated, which is True if a bound was reached.
         """
-        metrics = dict()
-        points = list()
-        proximity = list()
-        surface_coupling = None
-
-        if call in self.entry_points:
-            proximity.append(0)
-        else:
-            for en in self.entry_points:
-                if nx.has_path(self.call_graph, source=en, target=call):
-                    points.append(en)
-                    proximity.append(nx.shortest_path_length(
-                        self.call_graph, source=en, target=call
-                    ))
-
-        metrics['points'] = points if points else None
-        metrics['proximity'] = stat.mean(proximity) if proximity else None
-        metrics['surface_coupling'] = len(points) if points else None
-
+        (lengths, truncated) = self.get_path_lengths(
+            call, True, max_depth, max_nodes
+        )
+        metrics = self._get_surface_metrics(call, 'entry', lengths)
+        metrics['truncated'] = truncated
         return metrics
 
     @utilities.deprecation
-    def get_exit_surface_metrics(self, call):
+    def get_exit_surface_metrics(self, call, max_depth=None,
+                                  max_nodes=None):
         """Return exit surface metrics collected for a particular function.
 
         In addition to the metrics, a list of Call objects representing the
@@ -471,6 +1345,38 @@ class CallGraph():
         ----------
         call : Call
             An object representing a function call in the call graph.
+        max_depth : int, optional
+            The maximum length of the paths between call and the points.
+            Points farther from call are ignored.
+        max_nodes : int, optional
+            The maximum number of calls visited. See get_path_lengths.
+
+        Returns
+        -------
+        metrics : dictionary
+            A dictionary with keys: points, proximity, surface_coupling, and
+            truncated, which is True if a bound was reached.
+        """
+        (lengths, truncated) = self.get_path_lengths(
+            call, False, max_depth, max_nodes
+        )
+        metrics = self._get_surface_metrics(call, 'exit', lengths)
+        metrics['truncated'] = truncated
+        return metrics
+
+    def _get_surface_metrics(self, call, attribute, lengths):
+        """Return the surface metrics of a call.
+
+        Parameters
+        ----------
+        call : Call
+            An object representing a function call in the call graph.
+        attribute : str
+            The name of the attribute that identifies the points of the
+            surface, i.e. 'entry' or 'exit'.
+        lengths : dict
+            The length of the shortest path between call and other calls, in
+            the direction appropriate to the surface. See get_path_lengths.
 
         Returns
         -------
@@ -480,17 +1386,15 @@ class CallGraph():
         metrics = dict()
         points = list()
         proximity = list()
-        surface_coupling = None
 
-        if call in self.exit_points:
+        nodes = self._get_points(attribute)
+        if call in nodes:
             proximity.append(0)
         else:
-            for ex in self.exit_points:
-                if nx.has_path(self.call_graph, source=call, target=ex):
-                    points.append(ex)
-                    proximity.append(nx.shortest_path_length(
-                        self.call_graph, source=call, target=ex
-                    ))
+            for point in nodes:
+                if point in lengths:
+                    points.append(point)
+                    proximity.append(lengths[point])
 
         metrics['points'] = points if points else None
         metrics['proximity'] = stat.mean(proximity) if proximity else None
@@ -498,6 +1402,324 @@ class CallGraph():
 
         return metrics
 
+    def estimate_surface_metrics(self, call, attribute, landmarks=16,
+                                 seed=0):
+        """Estimate the surface metrics of a call from a sample of points.
+
+        Computing the exact surface metrics of every call traverses the call
+        graph once per call. Instead, the paths from (or, for the exit
+        surface, to) a few points of the surface, the landmarks, are
+        traversed once and shared by all calls. The proximity of a call is
+        estimated as the mean length of the paths between the call and the
+        landmarks that it is connected to, and the surface coupling as the
+        fraction of landmarks that it is connected to, scaled to the number
+        of points. The error of each estimate is its standard error, with a
+        finite population correction, so that it is 0 when every point is a
+        landmark, in which case the estimates are the exact metrics.
+
+        Parameters
+        ----------
+        call : Call
+            An object representing a function call in the call graph.
+        attribute : str
+            The name of the attribute that identifies the points of the
+            surface, i.e. 'entry' or 'exit'.
+        landmarks : int or iterable, optional
+            The number of landmarks, sampled from the points of the surface
+            at random, or the points of the surface to use as landmarks.
+        seed : int, optional
+            The seed of the random number generator used to sample the
+            landmarks.
+
+        Returns
+        -------
+        metrics : dictionary
+            A dictionary with keys: proximity, proximity_error,
+            surface_coupling, and surface_coupling_error. Undefined values
+            are None. See get_entry_surface_metrics.
+        """
+        if not isinstance(landmarks, int):
+            landmarks = tuple(sorted(landmarks, key=lambda c: c.identity))
+        (count, _landmarks) = self._get_metric(
+            'landmark_lengths', (attribute, landmarks, seed),
+            lambda: self._compute_landmark_lengths(
+                attribute, landmarks, seed
+            ),
+            persistent=False
+        )
+
+        metrics = dict.fromkeys(
+            ['proximity', 'proximity_error', 'surface_coupling',
+             'surface_coupling_error']
+        )
+        if call in self._get_points(attribute):
+            metrics['proximity'] = 0
+            metrics['proximity_error'] = 0
+            return metrics
+
+        lengths = [
+            _lengths[call] for (_, _lengths) in _landmarks if call in _lengths
+        ]
+        if not lengths:
+            return metrics
+
+        # The landmarks are sampled without replacement
+        sampled = len(_landmarks)
+        correction = 0
+        if count > 1:
+            correction = ((count - sampled) / (count - 1)) ** 0.5
+
+        metrics['proximity'] = stat.mean(lengths)
+        if len(lengths) > 1:
+            metrics['proximity_error'] = (
+                stat.stdev(lengths) / len(lengths) ** 0.5 * correction
+            )
+        elif correction == 0:
+            metrics['proximity_error'] = 0
+
+        fraction = len(lengths) / sampled
+        metrics['surface_coupling'] = fraction * count
+        metrics['surface_coupling_error'] = (
+            count * (fraction * (1 - fraction) / sampled) ** 0.5 * correction
+        )
+
+        return metrics
+
+    def _compute_landmark_lengths(self, attribute, landmarks, seed):
+        """Compute the length of the paths between landmarks and other calls.
+
+        See estimate_surface_metrics.
+
+        Returns
+        -------
+        lengths : tuple
+            A two-tuple, (count, lengths), where count is the number of
+            points of the surface and lengths is a list of two-tuples,
+            (landmark, lengths), one per landmark, where lengths is as
+            returned by _compute_path_lengths.
+        """
+        points = self._get_points(attribute)
+        if isinstance(landmarks, int):
+            _landmarks = sorted(points, key=lambda c: c.identity)
+            if landmarks < len(_landmarks):
+                _landmarks = random.Random(seed).sample(_landmarks, landmarks)
+        else:
+            _landmarks = [c for c in landmarks if c in points]
+
+        reverse = attribute == 'exit'
+        return (
+            len(points),
+            [(c, self._compute_path_lengths(c, reverse)) for c in _landmarks]
+        )
+
+    def compute_metrics(self, nodes=None, workers=1, max_depth=None,
+                        max_nodes=None):
+        """Compute the per-call attack surface metrics of many calls at once.
+
+        The metrics of a call are independent of those of other calls, so
+        the calls are split into shards that are processed by a pool of
+        worker processes. The call graph is handed to each worker once, when
+        the worker starts, which, where processes are forked, amounts to
+        sharing it copy-on-write; only the bounds of each shard and the
+        values of the metrics are exchanged afterwards. The paths from and to
+        each call are traversed once for all metrics and are not cached.
+
+        Parameters
+        ----------
+        nodes : iterable, optional
+            The Call objects the metrics of which must be computed. When not
+            specified, the metrics of every call in the call graph are
+            computed.
+        workers : int, optional
+            The number of worker processes. When 1, the metrics are computed
+            in the calling process.
+        max_depth : int, optional
+            The maximum length of the paths traversed from and to each call.
+            See get_path_lengths.
+        max_nodes : int, optional
+            The maximum number of calls visited by each traversal.
+
+        Returns
+        -------
+        metrics : dict
+            A dictionary with the list of calls under the key 'node' and a
+            list of values, one per call, under each of the keys
+            'entry_proximity', 'entry_surface_coupling', 'exit_proximity',
+            'exit_surface_coupling' (see get_entry_surface_metrics and
+            get_exit_surface_metrics), 'entry_reachability',
+            'exit_reachability' (see get_entry_point_reachability and
+            get_exit_point_reachability) and 'dangerous_proximity', the mean
+            of the lengths returned by get_shortest_path_length(call,
+            'dangerous'), which is 0 when call is itself dangerous. Undefined
+            values are None. When bounded, the metrics only account for the
+            paths within the bounds and the key 'truncated' lists whether
+            a bound was reached by the traversals from or to each call.
+        """
+        nodes = self.call_graph.nodes() if nodes is None else list(nodes)
+
+        # Building the index before the workers start, so that they need not
+        #   build it
+        self._get_attribute_index()
+
+        if workers > 1 and len(nodes) > 1:
+            size = -(-len(nodes) // (workers * 4))
+            shards = [
+                (start, min(start + size, len(nodes)))
+                for start in range(0, len(nodes), size)
+            ]
+            with multiprocessing.Pool(
+                workers, initializer=_init_worker,
+                initargs=(self, nodes, max_depth, max_nodes)
+            ) as pool:
+                results = pool.starmap(_compute_metrics, shards, chunksize=1)
+        else:
+            results = [self._compute_metrics(nodes, max_depth, max_nodes)]
+
+        metrics = {'node': nodes}
+        for name in results[0] if results else list():
+            metrics[name] = list(
+                itertools.chain.from_iterable(r[name] for r in results)
+            )
+        return metrics
+
+    def _compute_metrics(self, nodes, max_depth=None, max_nodes=None):
+        """Compute the per-call metrics of a shard of calls.
+
+        See compute_metrics.
+        """
+        metrics = {
+            name: list()
+            for name in ['entry_proximity', 'entry_surface_coupling',
+                         'exit_proximity', 'exit_surface_coupling',
+                         'entry_reachability', 'exit_reachability',
+                         'dangerous_proximity']
+        }
+        bounded = max_depth is not None or max_nodes is not None
+        if bounded:
+            metrics['truncated'] = list()
+
+        entry_points = self._get_points('entry')
+        exit_points = self._get_points('exit')
+        dangerous = self._get_points('dangerous')
+        count = len(self.call_graph)
+        for call in nodes:
+            if bounded:
+                (lengths, truncated) = self._compute_bounded_path_lengths(
+                    call, True, max_depth, max_nodes
+                )
+            else:
+                lengths = self._compute_path_lengths(call, reverse=True)
+            _metrics = self._get_surface_metrics(call, 'entry', lengths)
+            metrics['entry_proximity'].append(_metrics['proximity'])
+            metrics['entry_surface_coupling'].append(
+                _metrics['surface_coupling']
+            )
+            metrics['exit_reachability'].append(
+                (len(lengths) - 1) / count
+                if call in exit_points else None
+            )
+
+            if bounded:
+                (lengths, _truncated) = self._compute_bounded_path_lengths(
+                    call, False, max_depth, max_nodes
+                )
+                metrics['truncated'].append(truncated or _truncated)
+            else:
+                lengths = self._compute_path_lengths(call)
+            metrics['entry_reachability'].append(
+                (len(lengths) - 1) / count
+                if call in entry_points else None
+            )
+            _metrics = self._get_surface_metrics(call, 'exit', lengths)
+            metrics['exit_proximity'].append(_metrics['proximity'])
+            metrics['exit_surface_coupling'].append(
+                _metrics['surface_coupling']
+            )
+
+            proximity = None
+            if call in dangerous:
+                proximity = 0
+            else:
+                _lengths = [lengths[n] for n in dangerous if n in lengths]
+                if _lengths:
+                    proximity = stat.mean(_lengths)
+            metrics['dangerous_proximity'].append(proximity)
+        return metrics
+
+    def metrics_table(self, nodes=None, workers=1, max_depth=None,
+                      max_nodes=None):
+        """Return the attack surface metrics of many calls as a table.
+
+        The table has one row per call and one column per metric. The
+        per-call metrics are computed using compute_metrics, the others are
+        computed once for the whole call graph. If NumPy is available, each
+        column is an array, the undefined values in which are NaN; otherwise,
+        each column is a list, the undefined values in which are None. See
+        utilities.write_table for how to save the table.
+
+        Parameters
+        ----------
+        nodes : iterable, optional
+            The Call objects, which must be in the call graph, the metrics of
+            which must be tabulated. When not specified, the metrics of every
+            call in the call graph are tabulated.
+        workers : int, optional
+            The number of worker processes. See compute_metrics.
+        max_depth : int, optional
+            The maximum length of the paths traversed by compute_metrics.
+        max_nodes : int, optional
+            The maximum number of calls visited by each traversal of
+            compute_metrics.
+
+        Returns
+        -------
+        table : collections.OrderedDict
+            A dictionary with the name of a column as key and the column as
+            value. The columns are 'function_name', 'function_signature',
+            'identity', one flag per attribute ('entry', 'exit', 'dangerous',
+            'defense', 'vulnerable', 'tested'), 'fan_in', 'fan_out',
+            'degree_in', 'degree_out', 'page_rank' and the per-call metrics
+            (see compute_metrics), including 'truncated' when bounded.
+        """
+        metrics = self.compute_metrics(nodes, workers, max_depth, max_nodes)
+        nodes = metrics.pop('node')
+
+        table = collections.OrderedDict()
+        table['function_name'] = [n.function_name for n in nodes]
+        table['function_signature'] = [n.function_signature for n in nodes]
+        table['identity'] = [n.identity for n in nodes]
+
+        for attribute in ['entry', 'exit', 'dangerous', 'defense',
+                          'vulnerable', 'tested']:
+            _nodes = self._get_points(attribute)
+            table[attribute] = [n in _nodes for n in nodes]
+
+        fan = self.get_fan() if nodes else dict()
+        table['fan_in'] = [fan[n][0] for n in nodes]
+        table['fan_out'] = [fan[n][1] for n in nodes]
+        degree = self.get_degree() if nodes else dict()
+        table['degree_in'] = [degree[n][0] for n in nodes]
+        table['degree_out'] = [degree[n][1] for n in nodes]
+        page_rank = self.get_page_rank() if nodes else dict()
+        table['page_rank'] = [page_rank[n] for n in nodes]
+
+        for name in sorted(metrics):
+            table[name] = metrics[name]
+
+        if np is not None:
+            for (name, column) in table.items():
+                if name in metrics and name != 'truncated':
+                    table[name] = np.array(
+                        [np.nan if v is None else v for v in column],
+                        dtype=float
+                    )
+                elif name.startswith('function_') or name == 'identity':
+                    table[name] = np.array(column, dtype=str)
+                else:
+                    table[name] = np.array(column)
+
+        return table
+
     def get_page_rank(self, call=None, damping=0.85, entry=10000, exit=10000,
                       other=1):
         """Compute the page rank of nodes in the call graph.
@@ -524,6 +1746,17 @@ class CallGraph():
             the call graph is returned with the node being the key and the
             page rank being the value.
         """
+        page_rank = self._get_metric(
+            'page_rank', (damping, entry, exit, other),
+            lambda: self._compute_page_rank(damping, entry, exit, other)
+        )
+
+        if call is not None:
+            return page_rank[call]
+        return page_rank
+
+    def _compute_page_rank(self, damping, entry, exit, other):
+        """Compute the page rank of every call. See get_page_rank."""
         personalization = dict()
         personalization.update({n: other for (n, _) in self.nodes})
         personalization.update({n: entry for n in self.entry_points})
@@ -535,16 +1768,201 @@ class CallGraph():
             }
         )
 
-        page_rank = nx.pagerank(
-            self.call_graph,
-            alpha=damping,
-            weight='weight',
-            personalization=personalization
+        if self.implicit_returns:
+            page_rank = self._get_implicit_page_rank(damping, personalization)
+        else:
+            page_rank = nx.pagerank(
+                self.call_graph,
+                alpha=damping,
+                weight='weight',
+                personalization=personalization
+            )
+        return page_rank
+
+    def _get_implicit_page_rank(self, damping, personalization, max_iter=100,
+                                tol=1.0e-6):
+        """Compute the page rank of nodes when return edges are implicit.
+
+        The power iteration is that of networkx.pagerank applied to the call
+        graph with the return edges made explicit. The weight of an implicit
+        return edge is the 'return_weight' attribute of the call edge that it
+        mirrors (see assign_weights).
+
+        Parameters
+        ----------
+        damping : float
+            The damping parameter used in the Page Rank algorithm
+        personalization : dict
+            A dictionary keyed by node with the personalization value of the
+            node as the value.
+        max_iter : int, optional
+            The maximum number of iterations of the power iteration.
+        tol : float, optional
+            The error tolerance used to check for convergence.
+
+        Returns
+        -------
+        page_rank : dict
+            A dictionary keyed by node with the page rank as the value.
+        """
+        N = len(self.call_graph)
+        if N == 0:
+            return dict()
+
+        # Row-normalized weights of the edges (including the implicit return
+        #   edges) originating at each node
+        transitions = dict()
+        for n in self.call_graph:
+            weights = dict()
+            for (_, v, attrs) in self.call_graph.out_edges_iter(n, data=True):
+                weights[v] = attrs.get('weight', 1.0)
+            for (u, _, attrs) in self.call_graph.in_edges_iter(n, data=True):
+                if u not in weights:
+                    weights[u] = attrs.get('return_weight', 1.0)
+
+            degree = sum(weights.values())
+            transitions[n] = {
+                v: (float(w) / degree if degree else 0.0)
+                for (v, w) in weights.items()
+            }
+        dangling = [
+            n for n in self.call_graph if sum(transitions[n].values()) == 0.0
+        ]
+
+        s = float(sum(personalization.values()))
+        p = {k: v / s for (k, v) in personalization.items()}
+
+        x = dict.fromkeys(self.call_graph, 1.0 / N)
+        for _ in range(max_iter):
+            xlast = x
+            x = dict.fromkeys(xlast.keys(), 0)
+            danglesum = damping * sum(xlast[n] for n in dangling)
+            for n in x:
+                for (v, w) in transitions[n].items():
+                    x[v] += damping * xlast[n] * w
+                x[n] += danglesum * p[n] + (1.0 - damping) * p[n]
+
+            err = sum(abs(x[n] - xlast[n]) for n in x)
+            if err < N * tol:
+                return x
+
+        raise nx.NetworkXError(
+            'pagerank: power iteration failed to converge in {0} '
+            'iterations.'.format(max_iter)
+        )
+
+    def get_risky_walk(self, call=None, walks=10000, damping=0.85,
+                       max_steps=1000, seed=0, workers=1, exact=False,
+                       weights=None):
+        """Return the risky walk of calls in the call graph.
+
+        The risky walk of a call is the probability that the call is visited
+        by a random walk that starts at the attack surface. See
+        compute_risky_walk.
+
+        Parameters
+        ----------
+        call : Call, optional
+            An instance of Call the risky walk of which will be returned.
+        walks, damping, max_steps, seed, workers, exact, weights
+            See compute_risky_walk.
+
+        Returns
+        -------
+        risky_walk : dict or float
+            If call is specified, the risky walk of call is returned else a
+            dictionary keyed by call with the risky walk as the value.
+        """
+        _risky_walk = self._get_metric(
+            'risky_walk',
+            (walks, damping, max_steps, seed, exact, _get_key(weights)),
+            lambda: self.compute_risky_walk(
+                walks, damping, max_steps, seed, workers, exact, weights
+            )['risky_walk']
         )
 
         if call is not None:
-            return page_rank[call]
-        return page_rank
+            return _risky_walk[call]
+        return _risky_walk
+
+    def compute_risky_walk(self, walks=10000, damping=0.85, max_steps=1000,
+                           seed=0, workers=1, exact=False, weights=None):
+        """Compute the risky walk of every call, with convergence diagnostics.
+
+        A walk starts at an entry or exit point drawn uniformly at random. At
+        each step, the walk ends with probability 1 - damping, or where it
+        cannot go on, and otherwise follows an edge drawn with probability
+        proportional to its weight (see assign_weights). The walks are
+        simulated in batches using NumPy (see risky_walk.simulate), which is
+        required.
+
+        Parameters
+        ----------
+        walks : int, optional
+            The number of walks simulated.
+        damping : float, optional
+            The probability that a walk goes on at each step.
+        max_steps : int, optional
+            The maximum number of steps of a walk.
+        seed : int, optional
+            The seed from which the random number generators of the batches
+            of walks are seeded. The result does not depend on workers.
+        workers : int, optional
+            The number of worker processes that simulate the walks.
+        exact : bool, optional
+            If true, the risky walk is solved for exactly instead, which is
+            only feasible for call graphs of at most
+            risky_walk.MAX_SOLVE_NODES calls. See risky_walk.solve.
+        weights : dict or str, optional
+            The weights of the edges, which need not be assigned to them.
+            When not specified, the weights assigned to the edges are used.
+            See get_edge_weights.
+
+        Returns
+        -------
+        risky_walk : dict
+            A dictionary with keys: risky_walk and error, dictionaries keyed
+            by call with the estimate and its standard error as the value;
+            max_error; walks; mean_length, the mean number of steps of a
+            walk; and truncated, the fraction of walks stopped after
+            max_steps. When exact is true, the errors are 0 and walks,
+            mean_length and truncated are None.
+        """
+        if np is None:
+            raise Exception('NumPy is required to simulate random walks.')
+
+        transitions = self._get_metric(
+            'transitions', (_get_key(weights),),
+            lambda: risky_walk.Transitions.from_call_graph(self, weights),
+            persistent=False
+        )
+        index = {n: i for (i, n) in enumerate(transitions.nodes)}
+        starts = np.array(
+            sorted(set(
+                index[n] for n in self.entry_points + self.exit_points
+                if n in index
+            )),
+            dtype=np.int64
+        )
+
+        if exact:
+            result = {
+                'risky_walk': risky_walk.solve(transitions, starts, damping),
+                'error': np.zeros(len(transitions.nodes)), 'max_error': 0.0,
+                'walks': None, 'mean_length': None, 'truncated': None
+            }
+        else:
+            result = risky_walk.simulate(
+                transitions, starts, walks, damping, max_steps, seed,
+                workers=workers
+            )
+
+        for name in ['risky_walk', 'error']:
+            result[name] = {
+                n: float(result[name][i])
+                for (i, n) in enumerate(transitions.nodes)
+            }
+        return result
 
     def assign_page_rank(self, damping=0.85, entry=10000, exit=10000, other=1,
                          name='page_rank'):
@@ -575,44 +1993,210 @@ class CallGraph():
                 damping=damping, entry=entry, exit=exit, other=other
             )
         )
+        self.invalidate()
 
     def assign_weights(self, weights=None):
         """Assign weights to edges.
 
         Parameters
         ----------
-        weights : dict, optional
+        weights : dict or str, optional
             A dictionary of weights that are assigned to edges according to a
-            specfic algorithm. When not specified, a base set of weights (as
-            defined by data/weights.json) is used.
+            specfic algorithm, or the path of a JSON file containing one.
+            When not specified, a base set of weights (as defined by
+            data/weights.json) is used. See get_edge_weights.
 
         Returns
         -------
         None
         """
         if weights is None:
-            fpath = os.path.join(
-                os.path.dirname(__file__), 'data/weights.json'
-            )
-
-            with open(fpath, 'r') as file_:
-                weights = json.load(file_)
-
-        for (caller, callee, attrs) in self.edges:
-            weight = 0
-            if 'call' in attrs:
-                weight = weights['base']['call']
-            elif 'return' in attrs:
-                weight = weights['base']['return']
-
-            callee_attrs = self.call_graph.node[callee]
-            if 'dangerous' in callee_attrs:
-                weight += weights.get('dangerous', 0)
-            if 'defense' in callee_attrs:
-                weight += weights.get('defense', 0)
-            if 'tested' in callee_attrs:
-                weight += weights.get('tested', 0)
-            if 'vulnerable' in callee_attrs:
-                weight += weights.get('vulnerable', 0)
-
-            self.call_graph.edge[caller][callee]['weight'] = weight
+            weights = utilities.load_weights()
+
+        edge_weights = self.get_edge_weights(weights)
+        nodes = edge_weights['nodes']
+        edges = zip(
+            _tolist(edge_weights['sources']),
+            _tolist(edge_weights['targets']),
+            _tolist(edge_weights['weight']),
+            _tolist(edge_weights['return_weight'])
+        )
+
+        self.invalidate()
+
+        if self.implicit_returns:
+            # The weight of the implicit return edge callee -- caller is
+            #   stored alongside that of the call edge caller -- callee.
+            for (caller, callee, weight, return_weight) in edges:
+                attributes.add_edge(
+                    self.call_graph, nodes[caller], nodes[callee],
+                    {'weight': weight, 'return_weight': return_weight}
+                )
+            return
+
+        for (caller, callee, weight, _) in edges:
+            attributes.add_edge(
+                self.call_graph, nodes[caller], nodes[callee],
+                {'weight': weight}
+            )
+
+    def get_edge_weights(self, weights=None):
+        """Return the weight of every edge without assigning it.
+
+        The weight of an edge is the base weight of its kind, call or
+        return, plus the weights of the attributes of the call at its
+        destination (or, for an implicit return edge, at the destination of
+        the return). The weights are computed for all the edges at once from
+        the kind of each edge and a bitmask of the attributes of each call,
+        and are cached per set of weights, so that several sets of weights
+        can be compared without assigning them to the edges in turn.
+
+        Parameters
+        ----------
+        weights : dict or str, optional
+            A dictionary of weights (see assign_weights) or the path of a
+            JSON file containing one (see utilities.load_weights). When not
+            specified, the weights currently assigned to the edges, which
+            default to 1, are returned instead.
+
+        Returns
+        -------
+        edge_weights : dict
+            A dictionary with keys: nodes, the list of calls; sources and
+            targets, the positions in nodes of the caller and callee of each
+            edge; weight, the weight of each edge; and return_weight, the
+            weight of the implicit return edge that mirrors each edge. The
+            values are NumPy arrays, if NumPy is available, or lists, and
+            must not be modified.
+        """
+        table = self._get_metric(
+            'edge_table', (), self._compute_edge_table, persistent=False
+        )
+        if weights is None:
+            return table
+
+        if not isinstance(weights, dict):
+            weights = utilities.load_weights(weights)
+        return self._get_metric(
+            'edge_weights', (_get_key(weights),),
+            lambda: self._compute_edge_weights(table, weights),
+            persistent=False
+        )
+
+    def _compute_edge_table(self):
+        """Compute the calls and edges of the call graph as arrays.
+
+        See get_edge_weights. In addition, the key flags maps to the kind of
+        each edge (see attributes.Flags) and masks to the bitmask of the
+        attributes of each call (see _WEIGHTED_ATTRIBUTES).
+        """
+        nodes = self.call_graph.nodes()
+        index = {n: i for (i, n) in enumerate(nodes)}
+
+        masks = list()
+        for n in nodes:
+            attrs = self.call_graph.node[n]
+            mask = 0
+            for (i, attribute) in enumerate(_WEIGHTED_ATTRIBUTES):
+                if attribute in attrs:
+                    mask |= 1 << i
+            masks.append(mask)
+
+        table = {
+            'masks': masks, 'sources': list(), 'targets': list(),
+            'flags': list(), 'weight': list(), 'return_weight': list()
+        }
+        for (caller, callee, attrs) in self.call_graph.edges_iter(data=True):
+            table['sources'].append(index[caller])
+            table['targets'].append(index[callee])
+            table['flags'].append(attributes.get_flags(attrs))
+            table['weight'].append(attrs.get('weight', 1))
+            table['return_weight'].append(attrs.get('return_weight', 1))
+
+        if np is not None:
+            for name in ['masks', 'sources', 'targets', 'flags']:
+                table[name] = np.array(table[name], dtype=np.int64)
+            for name in ['weight', 'return_weight']:
+                table[name] = np.array(table[name])
+        table['nodes'] = nodes
+        return table
+
+    def _compute_edge_weights(self, table, weights):
+        """Compute the weight of every edge. See get_edge_weights."""
+        # The weight contributed by the attributes of a call, by bitmask
+        _weights = [weights.get(a, 0) for a in _WEIGHTED_ATTRIBUTES]
+        by_mask = {
+            mask: sum(
+                w for (i, w) in enumerate(_weights) if mask & (1 << i)
+            )
+            for mask in set(_tolist(table['masks']))
+        }
+        (call, return_) = (weights['base']['call'], weights['base']['return'])
+
+        if np is not None:
+            node_weights = np.array(
+                [by_mask[m] for m in _tolist(table['masks'])]
+            )
+            if not len(node_weights):
+                node_weights = np.zeros(0, dtype=np.int64)
+            if self.implicit_returns:
+                weight = call + node_weights[table['targets']]
+            else:
+                flags = table['flags']
+                weight = np.where(
+                    flags & Flags.CALL, call,
+                    np.where(flags & Flags.RETURN, return_, 0)
+                ) + node_weights[table['targets']]
+            return_weight = return_ + node_weights[table['sources']]
+        else:
+            node_weights = [by_mask[m] for m in table['masks']]
+            if self.implicit_returns:
+                kinds = [call] * len(table['flags'])
+            else:
+                kinds = [
+                    call if f & Flags.CALL else
+                    return_ if f & Flags.RETURN else 0
+                    for f in table['flags']
+                ]
+            weight = [
+                k + node_weights[t] for (k, t) in zip(kinds, table['targets'])
+            ]
+            return_weight = [
+                return_ + node_weights[s] for s in table['sources']
+            ]
+
+        return {
+            'nodes': table['nodes'], 'sources': table['sources'],
+            'targets': table['targets'], 'weight': weight,
+            'return_weight': return_weight
+        }
+
+
+def _get_key(weights):
+    """Return a hashable key that identifies a set of weights."""
+    if isinstance(weights, dict):
+        return json.dumps(weights, sort_keys=True)
+    return weights
+
+
+def _tolist(values):
+    """Return a list of the values in a list or NumPy array."""
+    return values.tolist() if np is not None and \
+        isinstance(values, np.ndarray) else values
+
+
+_worker_state = dict()
+
+
+def _init_worker(call_graph, nodes, max_depth, max_nodes):
+    """Initialize a worker process of CallGraph.compute_metrics."""
+    _worker_state['call_graph'] = call_graph
+    _worker_state['nodes'] = nodes
+    _worker_state['bounds'] = (max_depth, max_nodes)
+
+
+def _compute_metrics(start, end):
+    """Compute the metrics of a shard of calls in a worker process."""
+    return _worker_state['call_graph']._compute_metrics(
+        _worker_state['nodes'][start:end], *_worker_state['bounds']
+    )
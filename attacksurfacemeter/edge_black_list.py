@@ -0,0 +1,187 @@
+import array
+import bisect
+import hashlib
+import mmap
+import os
+import sys
+import tempfile
+
+
+class EdgeBlackList():
+    """Set of edges, stored as sorted 64-bit fingerprints.
+
+    The fingerprint of an edge is derived from the identities of the calls at
+    its ends (see Call.identity), so that it is the same in every process.
+    A black list is compiled once from its edges and saved to a binary file,
+    which holds the sorted fingerprints after a short header. Loading the
+    file maps it into memory without parsing it and checking whether an
+    edge is in the black list is a binary search over the fingerprints.
+    """
+
+    # Header of a compiled black list. Its length keeps the fingerprints
+    #   that follow it aligned.
+    _MAGIC = b'ASMEBL1\x00'
+
+    def __init__(self, fingerprints=None):
+        """EdgeBlackList constructor.
+
+        Instances should be obtained using EdgeBlackList.from_edges or
+        EdgeBlackList.load.
+
+        Parameters
+        ----------
+        fingerprints : sequence, optional
+            The sorted, distinct fingerprints of the edges.
+
+        Returns
+        -------
+        black_list : EdgeBlackList
+            An instance of EdgeBlackList.
+        """
+        self._fingerprints = (
+            fingerprints if fingerprints is not None else array.array('Q')
+        )
+        self._mmap = None
+
+    def __len__(self):
+        """Return the number of edges in the black list.
+
+        Returns
+        -------
+        length : int
+            The number of distinct edges in the black list.
+        """
+        return len(self._fingerprints)
+
+    def __contains__(self, edge):
+        """Return True if an edge is in the black list.
+
+        Parameters
+        ----------
+        edge : tuple
+            A two-tuple, (caller, callee), of Call objects.
+
+        Returns
+        -------
+        contains : bool
+            True if the edge is in the black list, False otherwise.
+        """
+        fingerprint = EdgeBlackList.get_fingerprint(*edge)
+        i = bisect.bisect_left(self._fingerprints, fingerprint)
+        return (
+            i < len(self._fingerprints) and
+            self._fingerprints[i] == fingerprint
+        )
+
+    @staticmethod
+    def get_fingerprint(caller, callee):
+        """Return the fingerprint of an edge.
+
+        Parameters
+        ----------
+        caller : Call
+            An instance of Call representing the source of the edge.
+        callee : Call
+            An instance of Call representing the destination of the edge.
+
+        Returns
+        -------
+        fingerprint : int
+            An unsigned 64-bit integer.
+        """
+        digest = hashlib.sha1(
+            '{0}\n{1}'.format(caller.identity, callee.identity).encode()
+        ).digest()
+        return int.from_bytes(digest[:8], 'little')
+
+    @classmethod
+    def from_edges(cls, edges):
+        """Compile a black list from its edges.
+
+        Parameters
+        ----------
+        edges : iterable
+            An iterable of two-tuples, (caller, callee), of Call objects.
+
+        Returns
+        -------
+        black_list : EdgeBlackList
+            An instance of EdgeBlackList.
+        """
+        return cls(array.array('Q', sorted(set(
+            EdgeBlackList.get_fingerprint(caller, callee)
+            for (caller, callee) in edges
+        ))))
+
+    @classmethod
+    def load(cls, path):
+        """Load a black list compiled using EdgeBlackList.save.
+
+        Parameters
+        ----------
+        path : str
+            The absolute path to the compiled black list.
+
+        Returns
+        -------
+        black_list : EdgeBlackList
+            An instance of EdgeBlackList.
+        """
+        with open(path, 'rb') as file_:
+            if file_.read(len(cls._MAGIC)) != cls._MAGIC:
+                raise Exception(
+                    '{0} is not a compiled edge black list.'.format(path)
+                )
+
+            if sys.byteorder != 'little':
+                fingerprints = array.array('Q', file_.read())
+                fingerprints.byteswap()
+                return cls(fingerprints)
+
+            _mmap = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+
+        black_list = cls(memoryview(_mmap)[len(cls._MAGIC):].cast('Q'))
+        black_list._mmap = _mmap
+        return black_list
+
+    def save(self, path):
+        """Save the black list to a binary file. See EdgeBlackList.load.
+
+        The black list is written to a temporary file in the same directory,
+        which then replaces path, so that a concurrent EdgeBlackList.load
+        never maps a partially written file.
+
+        Parameters
+        ----------
+        path : str
+            The absolute path to the file.
+
+        Returns
+        -------
+        None
+        """
+        fingerprints = array.array('Q', self._fingerprints)
+        if sys.byteorder != 'little':
+            fingerprints.byteswap()
+
+        (fd, temporary) = tempfile.mkstemp(
+            suffix='.tmp', dir=os.path.dirname(os.path.abspath(path))
+        )
+        try:
+            with os.fdopen(fd, 'wb') as file_:
+                file_.write(EdgeBlackList._MAGIC)
+                fingerprints.tofile(file_)
+            # mkstemp creates the file readable by its owner only
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def close(self):
+        """Release the memory map of a loaded black list, if any."""
+        if self._mmap is not None:
+            self._fingerprints.release()
+            self._fingerprints = array.array('Q')
+            self._mmap.close()
+            self._mmap = None
@@ -1,8 +1,6 @@
 import os
 from statistics import StatisticsError
 
-import networkx as nx
-
 from django.template import Template, Context
 from django.conf import settings
 
@@ -59,9 +57,7 @@ class BaseFormatter(object):
             'entry_points_count': len(self.call_graph.entry_points),
             'exit_points_count': len(self.call_graph.exit_points),
             'dangerous_functions_count':
-                len(nx.get_node_attributes(
-                    self.call_graph.call_graph, 'dangerous'
-                )),
+                len(self.call_graph.get_nodes('dangerous')),
         })
 
         return template.render(context)
@@ -69,6 +65,7 @@ class BaseFormatter(object):
     def write_output(self):
         template = BaseFormatter._get_template(self.template_file)
 
+        dangerous_functions = self.call_graph.get_nodes('dangerous')
         context = Context({
             'directory': self.call_graph.source,
             'nodes_count': len(self.call_graph.nodes),
@@ -92,18 +89,57 @@ class BaseFormatter(object):
             'exit_points': BaseFormatter._transform_calls(
                 self.call_graph.exit_points
             ),
-            'dangerous_functions_count':
-                len(nx.get_node_attributes(
-                    self.call_graph.call_graph, 'dangerous'
-                )),
-            'dangerous_functions':
-                nx.get_node_attributes(
-                    self.call_graph.call_graph, 'dangerous'
-                ).keys(),
+            'dangerous_functions_count': len(dangerous_functions),
+            'dangerous_functions': dangerous_functions,
         })
 
         return template.render(context)
 
+    def write_diff(self, baseline):
+        """Return a report of the changes to the attack surface from baseline.
+
+        Parameters
+        ----------
+        baseline : CallGraph
+            An instance of CallGraph representing the call graph that
+            call_graph is compared against, e.g. that of a previous release.
+
+        Returns
+        -------
+        report : str
+            The rendered report. See CallGraph.diff.
+        """
+        template = BaseFormatter._get_template(self.diff_template_file)
+
+        diff = baseline.diff(self.call_graph)
+        context = {
+            'baseline': baseline.source,
+            'directory': self.call_graph.source,
+            'counts': diff['counts'],
+            'fan': [
+                {
+                    'function_name': c.function_name,
+                    'function_signature': BaseFormatter._get_signature(c),
+                    'fan_in': fan_in,
+                    'fan_out': fan_out
+                } for (c, (fan_in, fan_out)) in sorted(
+                    diff['fan'].items(), key=lambda item: item[0].identity
+                )
+            ],
+        }
+        for key in ['nodes', 'entry_points', 'exit_points', 'dangerous']:
+            for change in ['added', 'removed']:
+                context['{0}_{1}'.format(key, change)] = (
+                    BaseFormatter._transform_calls(diff[key][change])
+                )
+        for change in ['added', 'removed']:
+            context['edges_{0}'.format(change)] = [
+                {'from': f.function_name, 'to': t.function_name}
+                for (f, t) in diff['edges'][change]
+            ]
+
+        return template.render(Context(context))
+
     @property
     def template_file(self):
         pass
@@ -111,3 +147,8 @@ class BaseFormatter(object):
     @property
     def summary_template_file(self):
         pass
+
+    @property
+    def diff_template_file(self):
+        # The report of changes is only available in plain text.
+        return "diff_template.txt"
@@ -1,9 +1,15 @@
+import asyncio
+import subprocess
+
+import networkx as nx
+
+from attacksurfacemeter import utilities
 from attacksurfacemeter.granularity import Granularity
 
 
 class BaseLoader(object):
     def __init__(self, source, is_reverse=False, defenses=None,
-                 vulnerabilities=None):
+                 vulnerabilities=None, implicit_returns=False):
         """Constructor for BaseLoader.
 
         BaseLoader is an abstract base class for to be derived and implemented
@@ -21,22 +27,214 @@ class BaseLoader(object):
             False otherwise.
         defenses : list, optional
             A list of Call objects, each representing a designed defense in the
-            system.
+            system. The identities of the calls are stored as a frozenset (see
+            utilities.get_identities), so that checking whether a function is
+            a defense takes constant time. See also utilities.load_calls.
         vulnerabilities : list, optional
             A list of Call objects, each representing a vulnerable function in
-            the system.
+            the system. Stored as a frozenset of identities, like defenses.
+        implicit_returns : bool, optional
+            If true, only the call edges are added to the call graph and the
+            return edge that mirrors each call edge is left implicit. See
+            CallGraph for how such a call graph is traversed.
         """
         self.source = source
         self.is_reverse = is_reverse
-        self.defenses = defenses if defenses is not None else list()
-        self.vulnerabilities = (
+        self.defenses = utilities.get_identities(
+            defenses if defenses is not None else list()
+        )
+        self.vulnerabilities = utilities.get_identities(
             vulnerabilities if vulnerabilities is not None else list()
         )
+        self.implicit_returns = implicit_returns
         self._errors = list()
 
     def load_call_graph(self, granularity=Granularity.FILE):
         raise NotImplementedError()
 
+    async def load_call_graph_async(self, granularity=Granularity.FUNC,
+                                    timeout=None):
+        """Load a call graph, generating it in a subprocess if necessary.
+
+        When the call graph must be generated by an external utility (see
+        _get_command), the utility is run using asyncio and its output is fed
+        to the parser line by line as it arrives. Otherwise, the call graph
+        is loaded using load_call_graph in the default executor of the event
+        loop, so that reading the file does not block the loop.
+
+        Parameters
+        ----------
+        granularity : str
+            The granularity at which the call graph must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
+        timeout : float, optional
+            The number of seconds after which the subprocess is killed and
+            asyncio.TimeoutError is raised. When not specified, the subprocess
+            is allowed to run to completion.
+
+        Returns
+        -------
+        call_graph : networkx.DiGraph
+            An object representing the call graph. An exception is raised if
+            the utility cannot be executed or exits with a non-zero status.
+        """
+        command = self._get_command()
+        if command is None:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, self.load_call_graph, granularity
+            )
+
+        call_graph = self._create_call_graph()
+        parser = self._get_parser(call_graph, granularity)
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE
+            )
+        except OSError as error:
+            parser.close()
+            raise Exception(
+                '{0} could not be executed: {1}'.format(command[0], error)
+            )
+        try:
+            await asyncio.wait_for(
+                BaseLoader._feed(process.stdout, parser), timeout
+            )
+            await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        finally:
+            parser.close()
+
+        BaseLoader._check_returncode(command, process.returncode)
+        return call_graph
+
+    @staticmethod
+    async def _feed(stream, parser):
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            parser.send(line.decode())
+
+    def _get_command(self):
+        """Return the command that generates the call graph, if any.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        command : list or None
+            A list of arguments that, when executed, writes the call graph to
+            its standard output, or None when source already is a call graph.
+        """
+        return None
+
+    def _exec(self):
+        """Execute the command that generates the call graph.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        lines : generator
+            A generator of the lines written by the command to its standard
+            output. An exception is raised if the command cannot be executed
+            or, once its output is exhausted, if it exited with a non-zero
+            status. Closing the generator early kills the command.
+        """
+        command = self._get_command()
+        try:
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, universal_newlines=True
+            )
+        except OSError as error:
+            raise Exception(
+                '{0} could not be executed: {1}'.format(command[0], error)
+            )
+
+        with process.stdout:
+            try:
+                for line in process.stdout:
+                    yield line
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+
+        BaseLoader._check_returncode(command, process.wait())
+
+    @staticmethod
+    def _check_returncode(command, returncode):
+        """Raise an exception if a command exited with a non-zero status.
+
+        Parameters
+        ----------
+        command : list
+            The arguments of the command.
+        returncode : int
+            The exit status of the command.
+
+        Returns
+        -------
+        None
+        """
+        if returncode != 0:
+            raise Exception(
+                '{0} exited with status {1}.'.format(
+                    ' '.join(command), returncode
+                )
+            )
+
+    def _create_call_graph(self):
+        """Return an empty graph to load the call graph into.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        call_graph : networkx.DiGraph
+            An empty graph, marked as having implicit return edges if the
+            loader was asked to leave them implicit.
+        """
+        call_graph = nx.DiGraph()
+        if self.implicit_returns:
+            call_graph.graph['implicit_returns'] = True
+        return call_graph
+
+    def _get_parser(self, call_graph, granularity):
+        """Return a primed parser that loads lines sent to it into call_graph.
+
+        Parameters
+        ----------
+        call_graph : networkx.DiGraph
+            The graph into which the parsed calls are loaded.
+        granularity : str
+            The granularity at which the call graph must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
+
+        Returns
+        -------
+        parser : generator
+            A generator to which lines of the raw call graph are sent one at
+            a time using parser.send(line).
+        """
+        parser = self._parse(call_graph, granularity)
+        next(parser)
+        return parser
+
+    def _parse(self, call_graph, granularity):
+        raise NotImplementedError()
+
     @property
     def errors(self):
         return self._errors
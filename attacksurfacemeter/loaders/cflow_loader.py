@@ -1,9 +1,9 @@
 import os
-import subprocess
 
 import networkx as nx
 
-from attacksurfacemeter import utilities
+from attacksurfacemeter import attributes, utilities
+from attacksurfacemeter.attributes import Flags, SharedAttributes
 from attacksurfacemeter.call import Call
 from attacksurfacemeter.granularity import Granularity
 from attacksurfacemeter.loaders.base_loader import BaseLoader
@@ -13,7 +13,7 @@ from attacksurfacemeter.loaders.stack import Stack
 class CflowLoader(BaseLoader):
     """"""
     def __init__(self, source, reverse=False, defenses=None,
-                 vulnerabilities=None):
+                 vulnerabilities=None, implicit_returns=False):
         """Constructor for CflowParser.
 
         Parameters
@@ -32,9 +32,11 @@ class CflowLoader(BaseLoader):
         vulnerabilities : list, optional
             A list of Call objects, each representing a vulnerable function in
             the system.
+        implicit_returns : bool, optional
+            If true, return edges are left implicit. See BaseLoader.
         """
         super(CflowLoader, self).__init__(
-            source, reverse, defenses, vulnerabilities
+            source, reverse, defenses, vulnerabilities, implicit_returns
         )
 
     def load_call_graph(self, granularity=Granularity.FUNC):
@@ -54,8 +56,8 @@ class CflowLoader(BaseLoader):
         call_graph : networkx.DiGraph
             An object representing the call graph.
         """
-        call_graph = nx.DiGraph()
-        parent = Stack()
+        call_graph = self._create_call_graph()
+        parser = self._get_parser(call_graph, granularity)
 
         raw_call_graph = None
         if os.path.isfile(self.source):
@@ -64,54 +66,174 @@ class CflowLoader(BaseLoader):
             raw_call_graph = self._exec_cflow()
 
         try:
-            previous = Call.from_cflow(raw_call_graph.readline(), granularity)
             for line in raw_call_graph:
-                current = Call.from_cflow(line, granularity)
-
-                if current.level > previous.level:
-                    parent.push(previous)
-                elif current.level < previous.level:
-                    for t in range(previous.level - current.level):
-                        parent.pop()
-
-                if parent.top:
-                    caller = callee = None
-                    entry = exit = dangerous = defense = False
-                    if self.is_reverse:
-                        caller = current
-                        callee = parent.top
-                    else:
-                        caller = parent.top
-                        callee = current
-
-                    (caller_attrs, callee_attrs) = utilities.get_node_attrs(
-                        'cflow', caller, callee, self.defenses,
-                        self.vulnerabilities
-                    )
+                parser.send(line)
+        finally:
+            parser.close()
+            if raw_call_graph:
+                raw_call_graph.close()
 
-                    call_graph.add_node(caller, caller_attrs)
+        return call_graph
 
-                    if callee_attrs is not None:
-                        call_graph.add_node(callee, callee_attrs)
+    def load_call_graphs(self, granularity=Granularity.FUNC):
+        """Load both the forward and the reverse call graph in one pass.
 
-                        # Adding the edge caller --  callee
-                        attrs = {'cflow': None, 'call': None}
-                        call_graph.add_edge(caller, callee, attrs)
+        cflow and cflow -r describe the same caller -- callee relationships,
+        so the call graphs loaded from their outputs differ only in coverage:
+        cflow -r includes every function whereas cflow includes only the
+        functions reachable from main. Hence, a single run of cflow (and a
+        single parse of its output) is sufficient to obtain both call graphs.
 
-                        # Adding the edge callee -- caller with the assumption
-                        #   that every call must return
-                        attrs = {'cflow': None, 'return': None}
-                        call_graph.add_edge(callee, caller, attrs)
+        The call graphs must be loaded from the output of cflow -r (reverse
+        is True), otherwise ValueError is raised. The forward call graph is
+        derived from the reverse call graph and is identical to the call
+        graph loaded from the output of cflow. The converse is not possible
+        since the output of cflow lacks the functions unreachable from main.
 
-                previous = current
-        finally:
-            if raw_call_graph:
-                raw_call_graph.close()
+        Parameters
+        ----------
+        granularity : str
+            The granularity at which the call graphs must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
 
-        return call_graph
+        Returns
+        -------
+        call_graphs : tuple
+            A two-tuple, (call_graph, reverse_call_graph), each an instance of
+            networkx.DiGraph.
+        """
+        if not self.is_reverse:
+            raise ValueError(
+                'Both call graphs can only be loaded from the output of '
+                'cflow -r.'
+            )
 
-    def _exec_cflow(self):
-        """Execute cflow as a subprocess and return its output.
+        reverse_call_graph = self.load_call_graph(Granularity.FUNC)
+        call_graph = CflowLoader._get_forward_call_graph(reverse_call_graph)
+
+        if granularity != Granularity.FUNC:
+            call_graph = utilities.project(call_graph, granularity)
+            reverse_call_graph = utilities.project(
+                reverse_call_graph, granularity
+            )
+
+        return (call_graph, reverse_call_graph)
+
+    @staticmethod
+    def _get_forward_call_graph(call_graph):
+        """Return the subgraph of call_graph that cflow would output.
+
+        Parameters
+        ----------
+        call_graph : networkx.DiGraph
+            A call graph loaded at function granularity from the output of
+            cflow -r.
+
+        Returns
+        -------
+        call_graph : networkx.DiGraph
+            The subgraph induced by main and the functions it (transitively)
+            calls or, if there is no main, a copy of call_graph.
+        """
+        nodes = set(n for n in call_graph if n.function_name == 'main')
+        if not nodes:
+            return call_graph.copy()
+
+        # Following only the call edges since, owing to the return edges,
+        #   every function that calls main is also reachable from main.
+        queue = list(nodes)
+        while queue:
+            caller = queue.pop()
+            for (_, callee, attrs) in call_graph.out_edges_iter(
+                caller, data=True
+            ):
+                if (attributes.get_flags(attrs) & Flags.CALL and
+                        callee not in nodes):
+                    nodes.add(callee)
+                    queue.append(callee)
+
+        forward_call_graph = nx.DiGraph()
+        forward_call_graph.graph.update(call_graph.graph)
+        forward_call_graph.add_nodes_from(
+            (n, dict(attrs)) for (n, attrs) in call_graph.nodes_iter(data=True)
+            if n in nodes
+        )
+        attributes.add_edges_from(
+            forward_call_graph,
+            (
+                (caller, callee, attrs)
+                for (caller, callee, attrs) in call_graph.edges_iter(
+                    nodes, data=True
+                )
+                if callee in nodes
+            )
+        )
+
+        return forward_call_graph
+
+    def _parse(self, call_graph, granularity):
+        """Load lines of a cflow call graph sent to the generator.
+
+        Parameters
+        ----------
+        call_graph : networkx.DiGraph
+            The graph into which the parsed calls are loaded.
+        granularity : str
+            The granularity at which the call graph must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
+        """
+        parent = Stack()
+        call_attrs = SharedAttributes.intern({'cflow': None, 'call': None})
+        return_attrs = SharedAttributes.intern({'cflow': None, 'return': None})
+
+        previous = Call.from_cflow((yield), granularity)
+        while True:
+            current = Call.from_cflow((yield), granularity)
+
+            if current.level > previous.level:
+                parent.push(previous)
+            elif current.level < previous.level:
+                for t in range(previous.level - current.level):
+                    parent.pop()
+
+            if parent.top:
+                caller = callee = None
+                entry = exit = dangerous = defense = False
+                if self.is_reverse:
+                    caller = current
+                    callee = parent.top
+                else:
+                    caller = parent.top
+                    callee = current
+
+                (caller_attrs, callee_attrs) = utilities.get_node_attrs(
+                    'cflow', caller, callee, self.defenses,
+                    self.vulnerabilities
+                )
+
+                if caller_attrs is not None:
+                    call_graph.add_node(caller, caller_attrs)
+
+                if callee_attrs is not None:
+                    call_graph.add_node(callee, callee_attrs)
+
+                if caller_attrs is not None and callee_attrs is not None:
+                    # Adding the edge caller --  callee
+                    attributes.add_edge(
+                        call_graph, caller, callee, call_attrs
+                    )
+
+                    # Adding the edge callee -- caller with the assumption
+                    #   that every call must return
+                    if not self.implicit_returns:
+                        attributes.add_edge(
+                            call_graph, callee, caller, return_attrs
+                        )
+
+            previous = current
+
+    def _get_command(self):
+        """Return the command that runs cflow on source, if a directory.
 
         Parameters
         ----------
@@ -119,19 +241,31 @@ class CflowLoader(BaseLoader):
 
         Returns
         -------
-        stdout : file
-            An instance of a file object representing the output from cflow.
+        command : list or None
+            The arguments to run cflow on the source files in source or None
+            if source is not a directory.
         """
+        if not os.path.isdir(self.source):
+            return None
+
         cflow_exe = 'run_cflow.sh'
         if self.is_reverse:
             cflow_exe = 'run_cflow_r.sh'
 
         dirname = os.path.dirname(os.path.realpath(__file__))
-        proc = subprocess.Popen(
-            '{0} {1}'.format(os.path.join(dirname, cflow_exe), self.source),
-            stdout=subprocess.PIPE,
-            shell=True,
-            universal_newlines=True
-        )
+        return [os.path.join(dirname, cflow_exe), self.source]
 
-        return proc.stdout
+    def _exec_cflow(self):
+        """Execute cflow as a subprocess and return its output.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        lines : generator
+            A generator of the lines of the output from cflow. See
+            BaseLoader._exec.
+        """
+        return self._exec()
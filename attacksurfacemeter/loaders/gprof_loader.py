@@ -1,8 +1,7 @@
 import os
 
-import networkx as nx
-
-from attacksurfacemeter import utilities
+from attacksurfacemeter import attributes, utilities
+from attacksurfacemeter.attributes import SharedAttributes
 from attacksurfacemeter.call import Call
 from attacksurfacemeter.granularity import Granularity
 from attacksurfacemeter.loaders.base_loader import BaseLoader
@@ -16,14 +15,17 @@ class GprofLoader(BaseLoader):
     """"""
 
     def __init__(self, source, reverse=False, defenses=None,
-                 vulnerabilities=None):
+                 vulnerabilities=None, implicit_returns=False,
+                 executable=None):
         """Constructor for GprofParser.
 
         Parameters
         ----------
         source : str
             The absolute path to a text file containing the call graph
-            generated using gprof.
+            generated using gprof or, when executable is specified, the
+            absolute path to the profile data (gmon.out) collected from
+            running the executable.
         reverse : bool, optional
             Parameter irrelevant.
         defenses : list, optional
@@ -32,14 +34,24 @@ class GprofLoader(BaseLoader):
         vulnerabilities : list, optional
             A list of Call objects, each representing a vulnerable function in
             the system.
+        implicit_returns : bool, optional
+            If true, return edges are left implicit. See BaseLoader.
+        executable : str, optional
+            The absolute path to the executable that produced the profile
+            data in source. When specified, gprof is invoked to generate the
+            call graph before attempting to load it.
         """
         super(GprofLoader, self).__init__(
-            source, reverse, defenses, vulnerabilities
+            source, reverse, defenses, vulnerabilities, implicit_returns
         )
+        self.executable = executable
 
     def load_call_graph(self, granularity=Granularity.FUNC):
         """Load a call graph generated by gprof.
 
+        If necessary, gprof is invoked to generate the call graph before
+        attempting to load it.
+
         Parameters
         ----------
         granularity : str
@@ -51,15 +63,42 @@ class GprofLoader(BaseLoader):
         call_graph : networkx.DiGraph
             An object representing the call graph.
         """
-        call_graph = nx.DiGraph()
+        call_graph = self._create_call_graph()
+        parser = self._get_parser(call_graph, granularity)
+
+        raw_call_graph = None
+        if self.executable is None:
+            raw_call_graph = open(self.source)
+        else:
+            raw_call_graph = self._exec_gprof()
+
+        try:
+            for line in raw_call_graph:
+                parser.send(line)
+        finally:
+            parser.close()
+            raw_call_graph.close()
+
+        return call_graph
 
-        header_passed = False
+    def _parse(self, call_graph, granularity):
+        """Load lines of a gprof call graph sent to the generator.
 
+        Parameters
+        ----------
+        call_graph : networkx.DiGraph
+            The graph into which the parsed calls are loaded.
+        granularity : str
+            The granularity at which the call graph must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
+        """
         function = None
 
         is_caller = True
         callers = list()
         callees = list()
+        call_attrs = SharedAttributes.intern({'gprof': None, 'call': None})
+        return_attrs = SharedAttributes.intern({'gprof': None, 'return': None})
 
         # A typical gprof call graph follows the pattern shown below:
         #
@@ -70,84 +109,132 @@ class GprofLoader(BaseLoader):
         #   SEPARATOR
         #   ...
         #   EOF
-        with open(self.source) as raw_call_graph:
-            # Fast-forwarding the file pointer to the line after the header
-            for line in raw_call_graph:
-                if line == HEADER:
-                    break
 
-            for line in raw_call_graph:
-                if line.startswith('['):
-                    # gprof function line
-                    function = Call.from_gprof(line, granularity)
-                    is_caller = False
-                elif line == SEPARATOR:
-                    for caller in callers:
-                        (caller_attrs, callee_attrs) = (
-                            utilities.get_node_attrs(
-                                'gprof', caller, function, self.defenses,
-                                self.vulnerabilities
-                            )
+        # Fast-forwarding to the line after the header
+        while (yield) != HEADER:
+            pass
+
+        while True:
+            line = yield
+            if line.startswith('['):
+                # gprof function line
+                function = Call.from_gprof(line, granularity)
+                is_caller = False
+            elif line == SEPARATOR:
+                for caller in callers:
+                    (caller_attrs, callee_attrs) = (
+                        utilities.get_node_attrs(
+                            'gprof', caller, function, self.defenses,
+                            self.vulnerabilities
                         )
+                    )
 
+                    if caller_attrs is not None:
                         call_graph.add_node(caller, caller_attrs)
 
-                        if callee_attrs is not None:
-                            call_graph.add_node(function, callee_attrs)
+                    if callee_attrs is not None:
+                        call_graph.add_node(function, callee_attrs)
 
-                            # Adding the edge caller --  callee
-                            attrs = {'gprof': None, 'call': None}
-                            call_graph.add_edge(caller, function, attrs)
+                    if (caller_attrs is not None and
+                            callee_attrs is not None):
+                        # Adding the edge caller --  callee
+                        attributes.add_edge(
+                            call_graph, caller, function, call_attrs
+                        )
 
-                            # Adding the edge callee -- caller with the
-                            #   assumption that every call must return
-                            attrs = {'gprof': None, 'return': None}
-                            call_graph.add_edge(function, caller, attrs)
+                        # Adding the edge callee -- caller with the
+                        #   assumption that every call must return
+                        if not self.implicit_returns:
+                            attributes.add_edge(
+                                call_graph, function, caller, return_attrs
+                            )
 
-                    (function_attrs, _) = utilities.get_node_attrs(
-                        'gprof', function, None, self.defenses,
-                        self.vulnerabilities
-                    )
+                (function_attrs, _) = utilities.get_node_attrs(
+                    'gprof', function, None, self.defenses,
+                    self.vulnerabilities
+                )
+                if function_attrs is not None:
                     call_graph.add_node(function, function_attrs)
 
-                    for callee in callees:
-                        (caller_attrs, callee_attrs) = (
-                            utilities.get_node_attrs(
-                                'gprof', function, callee, self.defenses,
-                                self.vulnerabilities
-                            )
+                for callee in callees:
+                    (caller_attrs, callee_attrs) = (
+                        utilities.get_node_attrs(
+                            'gprof', function, callee, self.defenses,
+                            self.vulnerabilities
                         )
+                    )
 
+                    if caller_attrs is not None:
                         call_graph.add_node(function, caller_attrs)
 
-                        if callee_attrs is not None:
-                            call_graph.add_node(callee, callee_attrs)
-
-                            # Adding the edge caller --  callee
-                            attrs = {'gprof': None, 'call': None}
-                            call_graph.add_edge(function, callee, attrs)
-
-                            # Adding the edge callee -- caller with the
-                            #   assumption that every call must return
-                            attrs = {'gprof': None, 'return': None}
-                            call_graph.add_edge(callee, function, attrs)
-
-                    is_caller = True
-                    callers.clear()
-                    callees.clear()
-                elif line == EOF:
-                    break
-                else:
-                    try:
-                        if is_caller:
-                            # gprof caller line
-                            callers.append(Call.from_gprof(line, granularity))
-                        else:
-                            # gprof callee line
-                            callees.append(Call.from_gprof(line, granularity))
-                    except ValueError as e:
-                        self._errors.append(
-                            "Error: " + str(e) + " Input line: " + line
+                    if callee_attrs is not None:
+                        call_graph.add_node(callee, callee_attrs)
+
+                    if (caller_attrs is not None and
+                            callee_attrs is not None):
+                        # Adding the edge caller --  callee
+                        attributes.add_edge(
+                            call_graph, function, callee, call_attrs
                         )
 
-        return call_graph
+                        # Adding the edge callee -- caller with the
+                        #   assumption that every call must return
+                        if not self.implicit_returns:
+                            attributes.add_edge(
+                                call_graph, callee, function, return_attrs
+                            )
+
+                is_caller = True
+                callers.clear()
+                callees.clear()
+            elif line == EOF:
+                break
+            else:
+                try:
+                    if is_caller:
+                        # gprof caller line
+                        callers.append(Call.from_gprof(line, granularity))
+                    else:
+                        # gprof callee line
+                        callees.append(Call.from_gprof(line, granularity))
+                except ValueError as e:
+                    self._errors.append(
+                        "Error: " + str(e) + " Input line: " + line
+                    )
+
+        # Ignoring everything after the call graph
+        while True:
+            yield
+
+    def _get_command(self):
+        """Return the command that runs gprof on source, if necessary.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        command : list or None
+            The arguments to run gprof on the profile data in source or None
+            if source already is a call graph.
+        """
+        if self.executable is None:
+            return None
+
+        return ['gprof', '-q', '-b', self.executable, self.source]
+
+    def _exec_gprof(self):
+        """Execute gprof as a subprocess and return its output.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        lines : generator
+            A generator of the lines of the output from gprof. See
+            BaseLoader._exec.
+        """
+        return self._exec()
@@ -1,50 +1,179 @@
+import multiprocessing
+import os
+
 import networkx as nx
 
+from attacksurfacemeter import attributes
 from attacksurfacemeter.call import Call
 from attacksurfacemeter.granularity import Granularity
 from attacksurfacemeter.loaders.base_loader import BaseLoader
+from attacksurfacemeter.loaders.package_trie import PackageTrie
 
 
 class JavaCGLoader(BaseLoader):
     """"""
-    def __init__(self, source, app_packages=[]):
-        """Constructor for JavaCGLoader"""
+    def __init__(self, source, app_packages=[], processes=1):
+        """Constructor for JavaCGLoader.
+
+        Parameters
+        ----------
+        source : str
+            The absolute path to a text file containing the call graph
+            generated using java-callgraph.
+        app_packages : list, optional
+            A list of fully qualified package names. When specified, only
+            edges with at least one end in one of the packages are loaded.
+        processes : int, optional
+            Number of processes to spawn when loading the call graph. The
+            file is split into as many newline-aligned chunks, each of which
+            is loaded by a separate process.
+        """
         super(JavaCGLoader, self).__init__(source)
         self.app_packages = app_packages
+        self._app_package_trie = PackageTrie(app_packages)
+        self._processes = processes
 
     def load_call_graph(self, granularity=Granularity.FUNC):
-        """
-            Description.
+        """Load a call graph generated by java-callgraph.
 
-            Comments.
+        Parameters
+        ----------
+        granularity : str
+            The granularity at which the call graph must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
 
-            Returns:
-                A call graph.
+        Returns
+        -------
+        call_graph : networkx.DiGraph
+            An object representing the call graph.
         """
         call_graph = nx.DiGraph()
 
-        if self.app_packages:
-            def condition_to_add(line):
-                return (
-                    line.startswith("M:") and
-                    self._contains_call_in_package(line)
+        chunks = self._get_chunks()
+        if self._processes > 1 and len(chunks) > 1:
+            with multiprocessing.Pool(self._processes) as pool:
+                results = pool.starmap(
+                    func=self._load_chunk,
+                    iterable=[
+                        (start, end, granularity) for (start, end) in chunks
+                    ],
+                    chunksize=1
                 )
+            for edges in results:
+                attributes.add_edges_from(call_graph, edges)
         else:
-            def condition_to_add(line): return line.startswith("M:")
-
-        with open(self.source) as raw_call_graph:
-            # line is like this:
-            # M:com.example.kevin.helloandroid.Greeter:sayHelloInSpanish (M)jav
-            # a.lang.StringBuilder:toString.
-            for line in raw_call_graph:
-                if condition_to_add(line):
-                    caller, callee = line.split(" ")
-                    call_graph.add_edge(
-                        Call.from_javacg(caller, granularity),
-                        Call.from_javacg(callee, granularity)
-                    )
+            for (start, end) in chunks:
+                attributes.add_edges_from(
+                    call_graph, self._load_chunk(start, end, granularity)
+                )
 
         return call_graph
 
-    def _contains_call_in_package(self, line):
-            return any([(p in line) for p in self.app_packages])
+    def _get_chunks(self):
+        """Split the source into newline-aligned chunks, one per process.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        chunks : list
+            A list of two-tuples, (start, end), each representing the byte
+            offsets of a chunk in the source. Every chunk begins at the start
+            of a line and ends immediately after a newline or at the end of
+            the file.
+        """
+        size = os.path.getsize(self.source)
+
+        offsets = [0]
+        with open(self.source, 'rb') as raw_call_graph:
+            for index in range(1, self._processes):
+                raw_call_graph.seek(size * index // self._processes)
+                raw_call_graph.readline()
+                offset = raw_call_graph.tell()
+                if offsets[-1] < offset < size:
+                    offsets.append(offset)
+        offsets.append(size)
+
+        return list(zip(offsets[:-1], offsets[1:]))
+
+    def _load_chunk(self, start, end, granularity):
+        """Load the edges from a chunk of the source.
+
+        Repeated edges (java-callgraph emits one per call site) are
+        eliminated on the raw line before any parsing takes place.
+
+        Parameters
+        ----------
+        start : int
+            The byte offset at which the chunk begins.
+        end : int
+            The byte offset at which the chunk ends.
+        granularity : str
+            The granularity at which the call graph must be loaded. See
+            attacksurfacemeter.granularity.Granularity for available choices.
+
+        Returns
+        -------
+        edges : list
+            A list of two-tuples, (caller, callee), each an instance of Call.
+        """
+        edges = list()
+        seen = set()
+
+        # Caches keyed by the raw caller/callee token so that a method that
+        #   appears in several edges is classified and parsed only once.
+        calls = dict()
+        in_app_package = dict()
+
+        # line is like this:
+        # M:com.example.kevin.helloandroid.Greeter:sayHelloInSpanish (M)jav
+        # a.lang.StringBuilder:toString.
+        with open(self.source, 'rb') as raw_call_graph:
+            raw_call_graph.seek(start)
+            position = start
+            while position < end:
+                line = raw_call_graph.readline()
+                if not line:
+                    break
+                position += len(line)
+
+                if not line.startswith(b"M:"):
+                    continue
+                line = line.rstrip(b"\r\n")
+                if line in seen:
+                    continue
+                seen.add(line)
+
+                (caller, callee) = line.decode('utf-8').split(" ")
+
+                if self._app_package_trie:
+                    for token in (caller, callee):
+                        if token not in in_app_package:
+                            in_app_package[token] = (
+                                self._contains_call_in_package(token)
+                            )
+                    if not (in_app_package[caller] or in_app_package[callee]):
+                        continue
+
+                _caller = calls.get(caller)
+                if _caller is None:
+                    _caller = Call.from_javacg(caller, granularity)
+                    calls[caller] = _caller
+
+                _callee = calls.get(callee)
+                if _callee is None:
+                    _callee = Call.from_javacg(callee, granularity)
+                    calls[callee] = _callee
+
+                edges.append((_caller, _callee))
+
+        return edges
+
+    def _contains_call_in_package(self, token):
+        # token is like M:com.example.Greeter:sayHello (caller) or
+        #   (M)java.lang.Object:<init> (callee). Only the class name is
+        #   matched against the app packages.
+        token = token[2:] if token.startswith("M:") else token[3:]
+        return self._app_package_trie.matches(token[:token.find(":")])
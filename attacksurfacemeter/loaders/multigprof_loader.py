@@ -4,6 +4,7 @@ import sys
 
 import networkx as nx
 
+from attacksurfacemeter import attributes
 from attacksurfacemeter.granularity import Granularity
 from attacksurfacemeter.loaders.base_loader import BaseLoader
 from attacksurfacemeter.loaders.gprof_loader import GprofLoader
@@ -13,7 +14,7 @@ class MultigprofLoader(BaseLoader):
     """"""
 
     def __init__(self, sources, reverse=False, defenses=None,
-                 vulnerabilities=None, processes=1):
+                 vulnerabilities=None, implicit_returns=False, processes=1):
         """Constructor for MultigprofLoader.
 
         Parameters
@@ -29,12 +30,14 @@ class MultigprofLoader(BaseLoader):
         vulnerabilities : list, optional
             A list of Call objects, each representing a vulnerable function in
             the system.
+        implicit_returns : bool, optional
+            If true, return edges are left implicit. See BaseLoader.
         processes : int, optional
             Number of processes to spawn when aggregating multiple gprof call
             graphs.
         """
         super(MultigprofLoader, self).__init__(
-            'multiple', reverse, defenses, vulnerabilities
+            'multiple', reverse, defenses, vulnerabilities, implicit_returns
         )
         self.sources = sources
         self._processes = processes
@@ -85,15 +88,15 @@ class MultigprofLoader(BaseLoader):
     def _load_call_graph(self, index, granularity, sync_queue):
         loader = GprofLoader(
             self.sources[index], self.is_reverse, self.defenses,
-            self.vulnerabilities
+            self.vulnerabilities, self.implicit_returns
         )
         call_graph = loader.load_call_graph(granularity)
 
         sync_queue.put((call_graph, loader.errors), block=True)
 
     def _merge_call_graph(self, sync_queue, out_queue):
-        call_graph = nx.DiGraph()
-        attributes = dict()
+        call_graph = self._create_call_graph()
+        frequencies = dict()
         errors = list()
 
         count = len(self.sources)
@@ -104,11 +107,13 @@ class MultigprofLoader(BaseLoader):
             if 'DEBUG' in os.environ:
                 self._print_status(index, count)
             for (node, attrs) in _call_graph.nodes(data=True):
-                if 'frequency' in attrs and node in attributes:
-                    attrs['frequency'] = attributes[node] + 1
+                if 'frequency' in attrs and node in frequencies:
+                    attrs['frequency'] = frequencies[node] + 1
                 call_graph.add_node(node, **attrs)
-            call_graph.add_edges_from(_call_graph.edges(data=True))
-            attributes = nx.get_node_attributes(call_graph, 'frequency')
+            attributes.add_edges_from(
+                call_graph, _call_graph.edges_iter(data=True)
+            )
+            frequencies = nx.get_node_attributes(call_graph, 'frequency')
 
             errors.extend(_errors)
 
@@ -0,0 +1,108 @@
+class PackageTrie():
+    """Prefix trie over dotted package names.
+
+    Each level of the trie corresponds to one component of a dotted name, so
+    that determining whether a fully qualified class or package name falls
+    within any of the packages in the trie costs one dictionary lookup per
+    component of the name, irrespective of the number of packages.
+    """
+
+    # Key used to mark the end of a package in the trie. The key cannot
+    #   collide with a component of a dotted name since components are
+    #   obtained by splitting on '.'.
+    _END = '.'
+
+    def __init__(self, packages=None):
+        """PackageTrie constructor.
+
+        Parameters
+        ----------
+        packages : iterable, optional
+            An iterable of dotted package names to add to the trie.
+
+        Returns
+        -------
+        trie : PackageTrie
+            An instance of PackageTrie.
+        """
+        self._root = dict()
+        self._size = 0
+
+        if packages is not None:
+            for package in packages:
+                self.add(package)
+
+    def __len__(self):
+        """Return the number of packages in the trie.
+
+        Returns
+        -------
+        length : int
+            The number of distinct packages in the trie.
+        """
+        return self._size
+
+    def __contains__(self, name):
+        """Return True if name is exactly one of the packages in the trie.
+
+        Parameters
+        ----------
+        name : str
+            A dotted package name.
+
+        Returns
+        -------
+        contains : bool
+            True if name was added to the trie, False otherwise.
+        """
+        node = self._root
+        for component in name.split('.'):
+            node = node.get(component)
+            if node is None:
+                return False
+        return PackageTrie._END in node
+
+    def add(self, package):
+        """Add a dotted package name to the trie.
+
+        Parameters
+        ----------
+        package : str
+            A dotted package name, e.g. com.example.app.
+
+        Returns
+        -------
+        None
+        """
+        node = self._root
+        for component in package.split('.'):
+            node = node.setdefault(component, dict())
+
+        if PackageTrie._END not in node:
+            node[PackageTrie._END] = None
+            self._size += 1
+
+    def matches(self, name):
+        """Return True if name is in, or is nested in, a package in the trie.
+
+        Parameters
+        ----------
+        name : str
+            A fully qualified, dotted class or package name.
+
+        Returns
+        -------
+        matches : bool
+            True if any package in the trie is equal to name or is a prefix
+            of name on a component boundary, False otherwise. For instance,
+            a trie containing com.example matches com.example.app.Main but
+            not com.examples.Main.
+        """
+        node = self._root
+        for component in name.split('.'):
+            node = node.get(component)
+            if node is None:
+                return False
+            if PackageTrie._END in node:
+                return True
+        return False
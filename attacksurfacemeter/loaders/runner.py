@@ -0,0 +1,59 @@
+import asyncio
+
+from attacksurfacemeter.granularity import Granularity
+
+
+def load_call_graphs(loaders, granularity=Granularity.FUNC, concurrency=4,
+                     timeout=None):
+    """Load the call graphs of several loaders concurrently.
+
+    Loaders that must generate their call graph using an external utility
+    (e.g. CflowLoader given a directory or GprofLoader given an executable)
+    run the utility as an asyncio subprocess, with the output parsed as it
+    arrives. At most concurrency subprocesses run at any given time.
+
+    Parameters
+    ----------
+    loaders : list
+        A list of BaseLoader derivatives.
+    granularity : str, optional
+        The granularity at which the call graphs must be loaded. See
+        attacksurfacemeter.granularity.Granularity for available choices.
+    concurrency : int, optional
+        The maximum number of call graphs loaded at any given time.
+    timeout : float, optional
+        The number of seconds after which the subprocess of an individual
+        loader is killed.
+
+    Returns
+    -------
+    call_graphs : list
+        A list with one element per loader, in the order of loaders. Each
+        element is either an instance of networkx.DiGraph representing the
+        call graph loaded by the corresponding loader or the exception raised
+        when loading it, so that one failing loader does not discard the
+        call graphs loaded by others.
+    """
+    # Subprocess support in asyncio (before Python 3.8) requires the event
+    #   loop to be set as the current loop in the main thread.
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(
+            _load_call_graphs(loaders, granularity, concurrency, timeout)
+        )
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
+async def _load_call_graphs(loaders, granularity, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load(loader):
+        async with semaphore:
+            return await loader.load_call_graph_async(granularity, timeout)
+
+    return await asyncio.gather(
+        *[load(loader) for loader in loaders], return_exceptions=True
+    )
@@ -0,0 +1,157 @@
+import collections
+import hashlib
+import shelve
+
+
+class MetricCache(object):
+
+    """A bounded cache of the metrics computed from a call graph.
+
+    Metrics are kept in memory, in least recently used order, under keys of
+    the form (name, parameters, version), where version is incremented by
+    the call graph whenever it is modified (see CallGraph.invalidate).
+    Optionally, metrics are also written to a store on disk, where they
+    persist across runs. Since the version of a call graph is meaningful
+    only for the lifetime of the call graph, metrics are written to the
+    store under a key that identifies the contents of the call graph
+    instead (see CallGraph.fingerprint).
+
+    An instance of MetricCache must not be shared by several call graphs.
+    """
+
+    def __init__(self, maxsize=128, path=None):
+        """MetricCache constructor.
+
+        Parameters
+        ----------
+        maxsize : int or None, optional
+            The maximum number of metrics kept in memory. When None, the
+            number of metrics kept in memory is not bounded.
+        path : str, optional
+            The path of the file in which metrics are stored (see shelve).
+            When not specified, metrics are only kept in memory.
+
+        Returns
+        -------
+        metric_cache : MetricCache
+            An instance of MetricCache.
+        """
+        self.maxsize = maxsize
+        self.path = path
+
+        self._entries = collections.OrderedDict()
+        self._store = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self):
+        # The store is reopened when needed
+        state = self.__dict__.copy()
+        state['_store'] = None
+        return state
+
+    def get(self, key, default=None, persistent_key=None):
+        """Return the metric cached under a key.
+
+        Parameters
+        ----------
+        key : tuple
+            A three-tuple, (name, parameters, version).
+        default : object, optional
+            The value returned if no metric is cached under key.
+        persistent_key : callable, optional
+            A callable that returns the key under which the metric is
+            written to the store. It is only called if there is a store and
+            the metric is not in memory.
+
+        Returns
+        -------
+        metric : object
+            The metric cached under key or default.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        if self.path is not None and persistent_key is not None:
+            _key = MetricCache._get_store_key(persistent_key())
+            store = self._get_store()
+            if _key in store:
+                value = store[_key]
+                self._add(key, value)
+                return value
+
+        return default
+
+    def put(self, key, value, persistent_key=None):
+        """Cache a metric under a key.
+
+        Parameters
+        ----------
+        key : tuple
+            A three-tuple, (name, parameters, version).
+        value : object
+            The metric. Must be picklable if there is a store.
+        persistent_key : callable, optional
+            A callable that returns the key under which the metric is
+            written to the store. See get.
+
+        Returns
+        -------
+        None
+        """
+        self._add(key, value)
+
+        if self.path is not None and persistent_key is not None:
+            _key = MetricCache._get_store_key(persistent_key())
+            self._get_store()[_key] = value
+
+    def pop(self, key, default=None):
+        """Remove a metric from memory and return it.
+
+        Parameters
+        ----------
+        key : tuple
+            A three-tuple, (name, parameters, version).
+        default : object, optional
+            The value returned if no metric is cached under key.
+
+        Returns
+        -------
+        metric : object
+            The metric cached under key or default.
+        """
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        """Remove all metrics from memory. The store is left untouched."""
+        self._entries.clear()
+
+    def close(self):
+        """Write any pending metrics to the store and close it."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _add(self, key, value):
+        if self.maxsize is not None and self.maxsize <= 0:
+            return
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _get_store(self):
+        if self._store is None:
+            self._store = shelve.open(self.path)
+        return self._store
+
+    @staticmethod
+    def _get_store_key(persistent_key):
+        return hashlib.sha1(repr(persistent_key).encode()).hexdigest()
@@ -0,0 +1,319 @@
+import multiprocessing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The largest number of calls for which solve is attempted
+MAX_SOLVE_NODES = 500
+
+
+class Transitions(object):
+
+    """The transition probabilities of a call graph, in compressed sparse row
+    (CSR) form.
+
+    The calls of the call graph are numbered in the order of nodes. The
+    successors of the call numbered i are indices[indptr[i]:indptr[i + 1]],
+    and the probabilities of moving to them, which are proportional to the
+    weights of the edges (see CallGraph.assign_weights), are the same slice
+    of probabilities. When return edges are implicit, the return edge that
+    mirrors each call edge is included, weighted by its 'return_weight'.
+    """
+
+    def __init__(self, nodes, sources, targets, weights):
+        """Transitions constructor.
+
+        Parameters
+        ----------
+        nodes : list
+            The Call objects, in the order in which they are numbered.
+        sources : numpy.ndarray
+            The number of the call at the origin of each edge.
+        targets : numpy.ndarray
+            The number of the call at the destination of each edge.
+        weights : numpy.ndarray
+            The weight of each edge. The weights of the edges originating at
+            a call are normalized into probabilities.
+
+        Returns
+        -------
+        transitions : Transitions
+            An instance of Transitions.
+        """
+        self.nodes = nodes
+
+        order = np.argsort(sources, kind='stable')
+        counts = np.bincount(sources, minlength=len(nodes))
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+        self.indices = targets[order]
+        self.rows = sources[order]
+        weights = np.asarray(weights, dtype=float)[order]
+
+        totals = np.bincount(self.rows, weights=weights, minlength=len(nodes))
+        # A call without successors, or with edges that all weigh 0, ends
+        #   the walks that reach it.
+        self.is_dead_end = totals <= 0
+
+        self.probabilities = np.zeros(len(self.indices))
+        _totals = totals[self.rows]
+        mask = _totals > 0
+        self.probabilities[mask] = weights[mask] / _totals[mask]
+
+        # The cumulative probabilities of the edges originating at call i,
+        #   offset by i, so that a single sorted search over all the edges
+        #   draws the successors of many calls at once.
+        cumulative = np.cumsum(self.probabilities)
+        offsets = np.concatenate(([0.0], cumulative))[self.indptr[:-1]]
+        self.cdf = self.rows + cumulative - offsets[self.rows]
+        last = self.indptr[1:][counts > 0] - 1
+        self.cdf[last] = self.rows[last] + 1
+
+    @classmethod
+    def from_call_graph(cls, call_graph, weights=None):
+        """Return the transition probabilities of a call graph.
+
+        Parameters
+        ----------
+        call_graph : CallGraph
+            The call graph.
+        weights : dict or str, optional
+            The weights of the edges. When not specified, the weights
+            assigned to the edges are used. See CallGraph.get_edge_weights.
+
+        Returns
+        -------
+        transitions : Transitions
+            An instance of Transitions.
+        """
+        if np is None:
+            raise Exception('NumPy is required to simulate random walks.')
+
+        edge_weights = call_graph.get_edge_weights(weights)
+        nodes = edge_weights['nodes']
+        sources = edge_weights['sources']
+        targets = edge_weights['targets']
+        _weights = edge_weights['weight']
+
+        if call_graph.implicit_returns:
+            # The implicit return edges, except those that mirror a call
+            #   edge for which there is an explicit edge in return.
+            n = len(nodes)
+            mask = ~np.isin(targets * n + sources, sources * n + targets)
+            (sources, targets) = (
+                np.concatenate((sources, targets[mask])),
+                np.concatenate((targets, sources[mask]))
+            )
+            _weights = np.concatenate(
+                (_weights, edge_weights['return_weight'][mask])
+            )
+
+        return cls(nodes, sources, targets, _weights)
+
+    def get_matrix(self):
+        """Return the transition probabilities as a dense matrix.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        matrix : numpy.ndarray
+            A square matrix, the element (i, j) of which is the probability of
+            moving from the call numbered i to the call numbered j.
+        """
+        matrix = np.zeros((len(self.nodes), len(self.nodes)))
+        np.add.at(matrix, (self.rows, self.indices), self.probabilities)
+        return matrix
+
+
+def simulate(transitions, starts, walks, damping=0.85, max_steps=1000,
+             seed=0, batch_size=1000, workers=1):
+    """Estimate the risky walk of every call by simulating random walks.
+
+    A walk starts at a call drawn uniformly from starts. At each step, the
+    walk ends with probability 1 - damping, or at a dead end, and otherwise
+    moves to a successor drawn according to the transition probabilities.
+    The risky walk of a call is the fraction of the walks that visit it.
+
+    The walks are simulated in batches, all the walks of a batch moving at
+    once. Each batch draws from its own random number generator, seeded from
+    seed, so that the estimates do not depend on the number of workers.
+
+    Parameters
+    ----------
+    transitions : Transitions
+        The transition probabilities of the call graph.
+    starts : numpy.ndarray
+        The numbers of the calls at which walks start.
+    walks : int
+        The number of walks.
+    damping : float, optional
+        The probability that a walk goes on at each step.
+    max_steps : int, optional
+        The maximum number of steps of a walk.
+    seed : int, optional
+        The seed of the random number generators.
+    batch_size : int, optional
+        The number of walks in a batch.
+    workers : int, optional
+        The number of worker processes that simulate the batches. When 1,
+        the batches are simulated in the calling process.
+
+    Returns
+    -------
+    result : dict
+        A dictionary with keys: risky_walk, an array with the estimate for
+        each call; error, an array with the standard error of each estimate
+        across batches (NaN if there is a single batch); max_error; walks;
+        mean_length, the mean number of steps of a walk; and truncated, the
+        fraction of the walks that were stopped after max_steps.
+    """
+    if walks < 1:
+        raise Exception('The number of walks must be positive.')
+
+    sizes = [batch_size] * (walks // batch_size)
+    if walks % batch_size:
+        sizes.append(walks % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers > 1 and len(sizes) > 1:
+        with multiprocessing.Pool(
+            workers, initializer=_init_worker,
+            initargs=(transitions, starts, damping, max_steps)
+        ) as pool:
+            results = pool.starmap(
+                _simulate_batch, zip(seeds, sizes), chunksize=1
+            )
+    else:
+        results = [
+            _simulate(transitions, starts, damping, max_steps, _seed, size)
+            for (_seed, size) in zip(seeds, sizes)
+        ]
+
+    hits = np.array([r[0] for r in results], dtype=float)
+    estimates = hits / np.array(sizes, dtype=float)[:, np.newaxis]
+    error = np.full(len(transitions.nodes), np.nan)
+    if len(sizes) > 1:
+        error = estimates.std(axis=0, ddof=1) / np.sqrt(len(sizes))
+
+    return {
+        'risky_walk': hits.sum(axis=0) / walks,
+        'error': error,
+        'max_error': float(error.max()) if len(error) else np.nan,
+        'walks': walks,
+        'mean_length': sum(r[1] for r in results) / walks,
+        'truncated': sum(r[2] for r in results) / walks
+    }
+
+
+def solve(transitions, starts, damping=0.85):
+    """Compute the risky walk of every call exactly.
+
+    The probability that a walk (see simulate) started at call v visits call
+    f satisfies h(f) = 1 and h(v) = damping * sum(P(v, w) * h(w)), one linear
+    system per call f. Solving them takes time cubic in the number of calls
+    for each call, i.e. quartic in all, and memory quadratic in the number
+    of calls, so this is only meant to validate simulate on small call
+    graphs and call graphs of more than MAX_SOLVE_NODES calls are rejected.
+    The number of steps of a walk is not bounded.
+
+    Parameters
+    ----------
+    transitions : Transitions
+        The transition probabilities of the call graph.
+    starts : numpy.ndarray
+        The numbers of the calls at which walks start.
+    damping : float, optional
+        The probability that a walk goes on at each step.
+
+    Returns
+    -------
+    risky_walk : numpy.ndarray
+        The risky walk of each call.
+    """
+    n = len(transitions.nodes)
+    if n > MAX_SOLVE_NODES:
+        raise Exception(
+            'The risky walk can only be solved for exactly with at most {0} '
+            'calls, not {1}.'.format(MAX_SOLVE_NODES, n)
+        )
+
+    matrix = damping * transitions.get_matrix()
+    start = np.bincount(starts, minlength=n) / len(starts) if len(starts) \
+        else np.zeros(n)
+
+    risky_walk = np.zeros(n)
+    for f in range(n):
+        a = np.eye(n) - matrix
+        b = matrix[:, f].copy()
+        a[:, f] = 0
+        a[f, :] = 0
+        a[f, f] = 1
+        b[f] = 1
+        try:
+            h = np.linalg.solve(a, b)
+        except np.linalg.LinAlgError:
+            raise Exception(
+                'The risky walk cannot be solved for with a damping of '
+                '{0}.'.format(damping)
+            )
+        risky_walk[f] = start.dot(h)
+    return risky_walk
+
+
+def _simulate(transitions, starts, damping, max_steps, seed, size):
+    """Simulate a batch of walks. See simulate.
+
+    Returns
+    -------
+    result : tuple
+        A three-tuple, (hits, steps, truncated), where hits is the number of
+        walks that visited each call, steps is the total number of steps
+        and truncated is the number of walks stopped after max_steps.
+    """
+    n = len(transitions.nodes)
+    if not len(starts):
+        return (np.zeros(n, dtype=np.int64), 0, 0)
+    rng = np.random.default_rng(seed)
+
+    position = starts[rng.integers(len(starts), size=size)]
+    walk = np.arange(size, dtype=np.int64)
+    visits = [walk * n + position]
+    steps = 0
+    for _ in range(max_steps):
+        alive = (rng.random(len(position)) < damping) & \
+            ~transitions.is_dead_end[position]
+        position = position[alive]
+        walk = walk[alive]
+        if not len(position):
+            break
+
+        j = np.searchsorted(
+            transitions.cdf, position + rng.random(len(position)),
+            side='right'
+        )
+        position = transitions.indices[j]
+        steps += len(position)
+        visits.append(walk * n + position)
+
+    # A walk that visits a call several times counts once
+    visited = np.unique(np.concatenate(visits)) % n
+    hits = np.bincount(visited, minlength=n)
+    # The walks that are left went on at every one of the max_steps steps
+    return (hits, steps, len(position))
+
+
+_worker_state = dict()
+
+
+def _init_worker(transitions, starts, damping, max_steps):
+    """Initialize a worker process of simulate."""
+    _worker_state['args'] = (transitions, starts, damping, max_steps)
+
+
+def _simulate_batch(seed, size):
+    """Simulate a batch of walks in a worker process."""
+    return _simulate(*_worker_state['args'], seed=seed, size=size)
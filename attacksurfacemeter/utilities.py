@@ -1,8 +1,13 @@
 import copy
+import csv
+import json
 import networkx as nx
+import os
 import warnings
 
+from attacksurfacemeter import attributes
 from attacksurfacemeter.call import Call
+from attacksurfacemeter.environments import Environments
 
 
 def fix(call_graph, using):
@@ -40,52 +45,179 @@ def fix(call_graph, using):
 
     More details at http://networkx.lanl.gov/tutorial/tutorial.html
     """
-    nodes_to_replace = []
-
-    for node in [n for (n, _) in call_graph.nodes if not n.function_signature]:
-        reference_nodes = [
-            n for (n, _) in using.nodes
-            if n.function_name == node.function_name
-        ]
-
-        if len(reference_nodes) == 1:
-            new_node = Call(
-                node.function_name,
-                reference_nodes[0].function_signature,
-                node.environment
-            )
-            nodes_to_replace.append((node, new_node))
-
-    for (before, after) in nodes_to_replace:
-        call_graph.call_graph.add_node(
-            after,
-            call_graph.call_graph.node[before]
+    index = get_name_index(n for (n, _) in using.nodes)
+
+    mapping = dict()
+    for (node, _) in call_graph.nodes:
+        if not node.function_signature:
+            reference_node = index.get(node.function_name)
+            if reference_node is not None:
+                mapping[node] = Call(
+                    node.function_name,
+                    reference_node.function_signature,
+                    node.environment
+                )
+
+    relabel(call_graph.call_graph, mapping)
+    call_graph.invalidate()
+
+
+def get_name_index(calls):
+    """Return an index of calls by function name.
+
+    Parameters
+    ----------
+    calls : iterable
+        An iterable of Call objects.
+
+    Returns
+    -------
+    index : dict
+        A dictionary keyed by function name with the only call that has the
+        function name as the value. When several distinct calls share a
+        function name, the value is None.
+    """
+    index = dict()
+    for call in calls:
+        name = call.function_name
+        if name not in index:
+            index[name] = call
+        elif index[name] is not None and index[name] != call:
+            index[name] = None
+    return index
+
+
+def relabel(graph, mapping):
+    """Replace nodes of a graph in a single batch.
+
+    Node and edge attributes are carried over to the replacement nodes. A
+    replacement node that already is in the graph is combined with the node
+    that it replaces.
+
+    Parameters
+    ----------
+    graph : networkx.DiGraph
+        The graph in which nodes are to be replaced. The graph is modified.
+    mapping : dict
+        A dictionary keyed by the node to be replaced with its replacement as
+        the value. A replacement node must not itself be replaced.
+
+    Returns
+    -------
+    None
+    """
+    if not mapping:
+        return
+
+    nodes = [
+        (after, graph.node[before]) for (before, after) in mapping.items()
+    ]
+
+    # Edges incident on the nodes to be replaced, collected before removing
+    #   the nodes with the edge between two such nodes collected only once
+    edges = list()
+    for before in mapping:
+        edges.extend(
+            (before, successor, attrs)
+            for (successor, attrs) in graph.succ[before].items()
+        )
+        edges.extend(
+            (predecessor, before, attrs)
+            for (predecessor, attrs) in graph.pred[before].items()
+            if predecessor not in mapping
         )
 
-        # Edges terminating at the node to be replaced
-        for predecessor in call_graph.call_graph.predecessors(before):
-            call_graph.call_graph.add_edge(
-                predecessor, after,
-                call_graph.call_graph.get_edge_data(
-                    predecessor, before
-                )
-            )
-
-        # Edges originating at the node to be replaced
-        for successor in call_graph.call_graph.successors(before):
-            call_graph.call_graph.add_edge(
-                after, successor,
-                call_graph.call_graph.get_edge_data(
-                    before, successor
-                )
-            )
+    graph.remove_nodes_from(mapping)
+
+    for (after, attrs) in nodes:
+        if after in graph.node:
+            graph.node[after].update(attrs)
+        else:
+            graph.add_node(after, attrs)
 
-        call_graph.call_graph.remove_node(before)
+    attributes.add_edges_from(
+        graph,
+        (
+            (mapping.get(caller, caller), mapping.get(callee, callee), attrs)
+            for (caller, callee, attrs) in edges
+        )
+    )
+
+
+def project(graph, granularity, multiplicity=None):
+    """Return the quotient of a function-level graph at another granularity.
+
+    Every node of the graph is mapped to the node that represents it at the
+    given granularity (e.g. the file that the function is defined in) and
+    the attributes of nodes and edges that map to the same node or edge are
+    combined. The result is equivalent to loading the call graph at the given
+    granularity, but without having to parse the call graph again.
+
+    Parameters
+    ----------
+    graph : networkx.DiGraph
+        A call graph loaded at function granularity.
+    granularity : str
+        The granularity of the projection. See
+        attacksurfacemeter.granularity.Granularity for available choices.
+    multiplicity : str, optional
+        The name of the edge attribute in which the number of edges of graph
+        that map to an edge of the projection must be recorded. When not
+        specified, the multiplicity of edges is not recorded.
+
+    Returns
+    -------
+    projection : networkx.DiGraph
+        The call graph at the given granularity. Nodes that have an empty
+        identity at the given granularity (e.g. functions for which the file
+        is unknown) are excluded.
+    """
+    projection = nx.DiGraph()
+    projection.graph.update(graph.graph)
+    calls = dict()
+
+    for (node, attrs) in graph.nodes_iter(data=True):
+        call = Call(
+            node.function_name, node.function_signature, node.environment,
+            granularity
+        )
+        if not call.identity:
+            continue
+        if hasattr(node, 'package_name'):
+            call.class_name = node.class_name
+            call.package_name = node.package_name
+
+        calls[node] = call
+        if call in projection.node:
+            projection.node[call].update(attrs)
+        else:
+            projection.add_node(call, dict(attrs))
+
+    for (caller, callee, attrs) in graph.edges_iter(data=True):
+        if caller in calls and callee in calls:
+            (caller, callee) = (calls[caller], calls[callee])
+            count = attrs.get(multiplicity, 1) if multiplicity else None
+            if projection.has_edge(caller, callee):
+                _attrs = projection.edge[caller][callee]
+                if multiplicity:
+                    count += _attrs[multiplicity]
+                _attrs.update(attrs)
+            else:
+                projection.add_edge(caller, callee, attrs)
+                _attrs = projection.edge[caller][callee]
+            if multiplicity:
+                _attrs[multiplicity] = count
+
+    return projection
 
 
 def get_fragments(graph):
     """Return a list of strongly connected components of a graph.
 
+    When the return edges of graph are implicit (see BaseLoader), every call
+    edge is traversable in both directions, so the strongly connected
+    components are its weakly connected components.
+
     Parameters
     ----------
     graph : NetworkX DiGraph
@@ -97,12 +229,155 @@ def get_fragments(graph):
         A list of strongly connected instances of NetworkX DiGraph each of
         which represents a component in the graph.
     """
+    (components, sizes) = get_components(graph)
+
+    nodes = [list() for _ in sizes]
+    for (node, component) in components.items():
+        nodes[component].append(node)
+    return [graph.subgraph(n).copy() for n in nodes]
+
+
+def get_components(graph):
+    """Label the nodes of a graph with its strongly connected components.
+
+    Unlike get_fragments, no subgraph is created. The strongly connected
+    components are found in a single pass using an iterative implementation
+    of Tarjan's algorithm, so the depth of graph is not limited by the
+    recursion limit. When the return edges of graph are implicit, the weakly
+    connected components are found instead (see get_fragments).
+
+    Parameters
+    ----------
+    graph : NetworkX DiGraph
+        An instance of NetworkX DiGraph object.
+
+    Returns
+    -------
+    components : tuple
+        A two-tuple, (labels, sizes), where labels is a dictionary keyed by
+        node with the index of the component that the node belongs to as the
+        value and sizes is a list of the number of nodes in each component.
+    """
     if not isinstance(graph, nx.DiGraph):
         raise Exception(
             'get_fragments operation not defined for undirected graphs.'
         )
 
-    return list(nx.strongly_connected_component_subgraphs(graph))
+    if graph.graph.get('implicit_returns', False):
+        return _get_weak_components(graph)
+
+    labels = dict()
+    sizes = list()
+
+    index = dict()
+    lowlink = dict()
+    stack = list()
+    for source in graph:
+        if source in index:
+            continue
+
+        index[source] = lowlink[source] = len(index)
+        stack.append(source)
+        queue = [(source, iter(graph.succ[source]))]
+        while queue:
+            (node, neighbors) = queue[-1]
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = len(index)
+                    stack.append(neighbor)
+                    queue.append((neighbor, iter(graph.succ[neighbor])))
+                    break
+                # A neighbor that is not yet labeled is still on the stack
+                elif neighbor not in labels:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            else:
+                queue.pop()
+                if queue:
+                    parent = queue[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = len(sizes)
+                    size = 0
+                    while True:
+                        member = stack.pop()
+                        labels[member] = component
+                        size += 1
+                        if member is node:
+                            break
+                    sizes.append(size)
+
+    return (labels, sizes)
+
+
+def _get_weak_components(graph):
+    """Label the nodes of a graph with its weakly connected components.
+
+    Parameters
+    ----------
+    graph : NetworkX DiGraph
+        An instance of NetworkX DiGraph object.
+
+    Returns
+    -------
+    components : tuple
+        A two-tuple, (labels, sizes). See get_components.
+    """
+    labels = dict()
+    sizes = list()
+    for source in graph:
+        if source in labels:
+            continue
+
+        component = len(sizes)
+        labels[source] = component
+        size = 1
+        queue = [source]
+        while queue:
+            node = queue.pop()
+            for neighbors in (graph.succ[node], graph.pred[node]):
+                for neighbor in neighbors:
+                    if neighbor not in labels:
+                        labels[neighbor] = component
+                        size += 1
+                        queue.append(neighbor)
+        sizes.append(size)
+
+    return (labels, sizes)
+
+
+def get_largest_component(graph):
+    """Return the largest strongly connected component of a graph.
+
+    Only the largest component is extracted from graph. The component shares
+    the (immutable, see attributes.SharedAttributes) edge attributes with
+    graph whereas the node attributes are copied.
+
+    Parameters
+    ----------
+    graph : NetworkX DiGraph
+        A non-empty instance of NetworkX DiGraph object.
+
+    Returns
+    -------
+    component : tuple
+        A two-tuple, (fragment, count), where fragment is a strongly
+        connected instance of NetworkX DiGraph that represents the largest
+        component in graph and count is the number of components in graph.
+    """
+    (labels, sizes) = get_components(graph)
+    if not sizes:
+        raise Exception('The graph has no components.')
+
+    largest = max(range(len(sizes)), key=sizes.__getitem__)
+    fragment = graph.subgraph(
+        node for (node, component) in labels.items() if component == largest
+    )
+    fragment.graph = dict(graph.graph)
+    for (node, attrs) in fragment.node.items():
+        fragment.node[node] = dict(attrs)
+
+    return (fragment, len(sizes))
 
 
 def get_largest_fragment(fragments):
@@ -124,17 +399,171 @@ def get_largest_fragment(fragments):
     return fragments[0]
 
 
+def get_identities(calls):
+    """Return the set of identities of calls.
+
+    Parameters
+    ----------
+    calls : iterable
+        An iterable of Call objects or of their identities (str).
+
+    Returns
+    -------
+    identities : frozenset
+        A set of str, each the identity of a call. See Call.identity.
+    """
+    return frozenset(
+        call if isinstance(call, str) else call.identity for call in calls
+    )
+
+
+def load_calls(path, environment=Environments.C):
+    """Load a list of functions, e.g. defenses or vulnerabilities, in bulk.
+
+    A file with the extension .json must contain a list, each element of
+    which is either an object with the keys function_name and (optionally)
+    function_signature, a list [function_name, function_signature], or a
+    function name. Any other file is read as CSV, with one function per row
+    as function_name[,function_signature] and an optional header row that
+    starts with function_name.
+
+    Parameters
+    ----------
+    path : str
+        The absolute path to the CSV or JSON file.
+    environment : str, optional
+        The environment of the functions. See
+        attacksurfacemeter.environments.Environments for available choices.
+
+    Returns
+    -------
+    calls : list
+        A list of Call objects, one per function in the file.
+    """
+    rows = list()
+    with open(path, 'r', newline='') as file_:
+        if path.lower().endswith('.json'):
+            for element in json.load(file_):
+                if isinstance(element, dict):
+                    rows.append((
+                        element['function_name'],
+                        element.get('function_signature', '')
+                    ))
+                elif isinstance(element, str):
+                    rows.append((element, ''))
+                else:
+                    rows.append(tuple(element))
+        else:
+            for row in csv.reader(file_):
+                if not row or (not rows and row[0] == 'function_name'):
+                    continue
+                rows.append(tuple(row))
+
+    calls = list()
+    for row in rows:
+        if not row[0]:
+            raise Exception('{0} lists a function without a name.'.format(
+                path
+            ))
+        calls.append(Call(row[0], row[1] if len(row) > 1 else '', environment))
+    return calls
+
+
+_weights = dict()
+
+
+def load_weights(path=None):
+    """Load a set of weights, e.g. to be assigned to the edges of a call graph.
+
+    The weights are read from the file once and cached by path.
+
+    Parameters
+    ----------
+    path : str, optional
+        The absolute path to a JSON file containing the weights. When not
+        specified, the base set of weights, data/weights.json, is loaded.
+
+    Returns
+    -------
+    weights : dict
+        A dictionary of weights. See CallGraph.assign_weights.
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(__file__), 'data/weights.json')
+
+    if path not in _weights:
+        with open(path, 'r') as file_:
+            _weights[path] = json.load(file_)
+    return copy.deepcopy(_weights[path])
+
+
+def write_table(table, path):
+    """Write a table, e.g. the one returned by CallGraph.metrics_table.
+
+    A file with the extension .npz is written using numpy.savez_compressed,
+    with one array per column, which requires NumPy. Any other file is
+    written as CSV, with a header row that lists the names of the columns
+    and with undefined values (None or NaN) left empty.
+
+    Parameters
+    ----------
+    table : dict
+        A dictionary with the name of a column as key and the column, a list
+        or an array of equal length, as value.
+    path : str
+        The absolute path to the NPZ or CSV file.
+
+    Returns
+    -------
+    None
+    """
+    if path.lower().endswith('.npz'):
+        try:
+            import numpy as np
+        except ImportError:
+            raise Exception('NumPy is required to write {0}.'.format(path))
+        np.savez_compressed(
+            path, **{name: np.asarray(c) for (name, c) in table.items()}
+        )
+        return
+
+    names = list(table)
+    with open(path, 'w', newline='') as file_:
+        writer = csv.writer(file_)
+        writer.writerow(names)
+        for row in zip(*[table[name] for name in names]):
+            writer.writerow([
+                '' if value is None or value != value else value
+                for value in row
+            ])
+
+
 def get_node_attrs(source, caller, callee, defenses, vulnerabilities):
     """Return node attributes.
 
     Parameters
     ----------
+    source : str
+        The name of the utility that generated the call graph, e.g. cflow.
+    caller : Call
+        An instance of Call representing the caller.
+    callee : Call or None
+        An instance of Call representing the callee.
+    defenses : frozenset or list
+        The identities of the designed defenses in the system (see
+        get_identities) or a list of Call objects, one per defense.
+    vulnerabilities : frozenset or list
+        The identities of the vulnerable functions in the system (see
+        get_identities) or a list of Call objects, one per vulnerability.
 
     Returns
     -------
     attributes : tuple
         A tuple of two dictionary elements: caller_attrs and callee_attrs. The
         callee_attrs may be None if the callee is a standard library function.
+        Either may be None if the identity of the respective call is empty,
+        e.g. a standard library function at file granularity, in which case
+        the call must not be added to the call graph.
         Each dictionary may contain the following keys:
 
         Common Keys:
@@ -151,32 +580,45 @@ def get_node_attrs(source, caller, callee, defenses, vulnerabilities):
         entry: Set if the callee is an standard input function.
         exit: Set if the callee is a standard output function.
     """
-    caller_attrs = dict()
+    caller_attrs = None
     callee_attrs = None
 
-    if caller in defenses:
-        caller_attrs['defense'] = None
-    if caller in vulnerabilities:
-        caller_attrs['vulnerable'] = None
-    if callee is not None:
-        if 'gprof' in source:
-            caller_attrs['tested'] = None
-        if callee.in_stdlib():
-            if callee.is_dangerous():
-                caller_attrs['dangerous'] = None
-            if callee.is_input():
-                caller_attrs['entry'] = None
-            if callee.is_output():
-                caller_attrs['exit'] = None
-        else:
+    if not isinstance(defenses, frozenset):
+        defenses = get_identities(defenses)
+    if not isinstance(vulnerabilities, frozenset):
+        vulnerabilities = get_identities(vulnerabilities)
+
+    in_stdlib = callee is not None and callee.in_stdlib()
+
+    identity = caller.identity
+    if identity:
+        caller_attrs = dict()
+        if identity in defenses:
+            caller_attrs['defense'] = None
+        if identity in vulnerabilities:
+            caller_attrs['vulnerable'] = None
+        if callee is not None:
+            if 'gprof' in source:
+                caller_attrs['tested'] = None
+            if in_stdlib:
+                if callee.is_dangerous():
+                    caller_attrs['dangerous'] = None
+                if callee.is_input():
+                    caller_attrs['entry'] = None
+                if callee.is_output():
+                    caller_attrs['exit'] = None
+
+    if callee is not None and not in_stdlib:
+        identity = callee.identity
+        if identity:
             callee_attrs = dict()
 
             callee_attrs['frequency'] = 1
             if 'gprof' in source:
                 callee_attrs['tested'] = None
-            if callee in defenses:
+            if identity in defenses:
                 callee_attrs['defense'] = None
-            if callee in vulnerabilities:
+            if identity in vulnerabilities:
                 callee_attrs['vulnerable'] = None
 
     attributes = (caller_attrs, callee_attrs)
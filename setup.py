@@ -34,6 +34,7 @@ setup(
         'attacksurfacemeter.formatters': [
             'database.create.pgsql.sql',
             'database.create.sqlite.sql',
+            'diff_template.txt',
             'summary_template.html',
             'summary_template.txt',
             'template.html',
@@ -41,6 +42,7 @@ setup(
         ],
     },
     install_requires=['networkx==1.9.1', 'django==1.8'],
+    extras_require={'numpy': ['numpy>=1.17']},
     license='The MIT License (MIT) Copyright (c) 2016 Andy Meneely',
     description='Library for collecting metrics of the attack surface.',
     long_description=open('README.md').read(),
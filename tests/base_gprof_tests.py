@@ -684,7 +684,9 @@ class BaseGprofTests(object):
 
         # Act
         self.target.assign_weights()
-        actual = nx.get_edge_attributes(self.target.call_graph, 'weight')
+        actual = {
+            (i, j): attrs['weight'] for (i, j, attrs) in self.target.edges
+        }
 
         # Assert
         self.assertCountEqual(expected, actual)
@@ -0,0 +1,227 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import networkx as nx
+
+from attacksurfacemeter import android_call_graph
+from attacksurfacemeter.android_call_graph import AndroidCallGraph
+from attacksurfacemeter.call import Call
+from attacksurfacemeter.environments import Environments
+from attacksurfacemeter.granularity import Granularity
+from attacksurfacemeter.metric_cache import MetricCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class AndroidCallGraphTestCase(unittest.TestCase):
+    def _get_call(self, name, class_name, package_name):
+        call = Call(name, class_name, Environments.ANDROID)
+        call.package_name = package_name
+        return call
+
+    def test_collapse_android_black_listed_packages(self):
+        # Arrange
+        on_create = self._get_call(
+            'onCreate', 'com.example.MainActivity', 'com.example'
+        )
+        append = self._get_call(
+            'append', 'java.lang.StringBuilder', 'java.lang'
+        )
+        to_string = self._get_call(
+            'toString', 'java.lang.StringBuilder', 'java.lang'
+        )
+        get_text = self._get_call(
+            'getText', 'android.widget.EditText', 'android.widget'
+        )
+        graph = nx.DiGraph()
+        graph.add_edges_from([
+            (on_create, append), (on_create, to_string),
+            (append, to_string), (on_create, get_text)
+        ])
+        target = AndroidCallGraph('/tmp', graph)
+        package = Call('java.lang', 'package_node', Environments.ANDROID)
+
+        # Act
+        target.collapse_android_black_listed_packages()
+        actual = target.call_graph
+
+        # Assert
+        self.assertTrue(get_text.is_input())
+        self.assertCountEqual(
+            [on_create, package, get_text], actual.nodes()
+        )
+        self.assertEqual(2, actual.edge[on_create][package]['weight'])
+        self.assertEqual(1, actual.edge[package][package]['weight'])
+        self.assertNotIn('weight', actual.edge[on_create][get_text])
+        self.assertTrue(AndroidCallGraph._is_black_listed_package('java.io'))
+        self.assertFalse(
+            AndroidCallGraph._is_black_listed_package('com.example')
+        )
+
+    def test_entry_and_exit_points(self):
+        # Arrange
+        (a, b, c, d) = [
+            self._get_call(name, 'com.example.MainActivity', 'com.example')
+            for name in ['a', 'b', 'c', 'd']
+        ]
+        graph = nx.DiGraph()
+        graph.add_edges_from([(a, b), (b, c), (d, a)])
+        target = AndroidCallGraph('/tmp', graph)
+        target._entry_points = {a: a}
+
+        # Act
+        entry_points = target.entry_points
+        exit_points = target.exit_points
+
+        # Assert
+        self.assertEqual([a], entry_points)
+        self.assertEqual([], exit_points)
+
+    def test_calculate_attack_surface_nodes(self):
+        # Arrange
+        (a, b, c, d) = [
+            self._get_call(name, 'com.example.MainActivity', 'com.example')
+            for name in ['a', 'b', 'c', 'd']
+        ]
+        graph = nx.DiGraph()
+        graph.add_edges_from([(a, b), (b, c), (d, a)])
+        target = AndroidCallGraph('/tmp', graph)
+        target._entry_points = {a: a}
+
+        # Act
+        target.calculate_attack_surface_nodes()
+        actual = target.attack_surface_graph
+
+        # Assert
+        self.assertCountEqual([a, b, c], actual.nodes())
+        self.assertCountEqual([(a, b), (b, c)], actual.edges())
+
+    def test_surface_metrics(self):
+        # Arrange
+        (a, b, c, d) = [
+            self._get_call(name, 'com.example.MainActivity', 'com.example')
+            for name in ['a', 'b', 'c', 'd']
+        ]
+        graph = nx.DiGraph()
+        graph.add_edges_from([(a, b), (b, c), (d, a)])
+        target = AndroidCallGraph('/tmp', graph)
+        target._entry_points = {a: a}
+
+        # Act
+        actual = target.get_entry_surface_metrics(c)
+        metrics = target.compute_metrics([a, c])
+
+        # Assert
+        self.assertEqual([a], actual['points'])
+        self.assertEqual(2, actual['proximity'])
+        self.assertEqual(1, actual['surface_coupling'])
+        self.assertEqual([0, 2], metrics['entry_proximity'])
+        self.assertEqual([None, 1], metrics['entry_surface_coupling'])
+        self.assertEqual([0.5, None], metrics['entry_reachability'])
+        self.assertEqual({a: 1}, target.get_shortest_path_length(d, 'entry'))
+        self.assertEqual([a], target.get_nodes('entry'))
+
+    def test_estimate_surface_metrics(self):
+        # Arrange
+        (a, b, c, d) = [
+            self._get_call(name, 'com.example.MainActivity', 'com.example')
+            for name in ['a', 'b', 'c', 'd']
+        ]
+        graph = nx.DiGraph()
+        graph.add_edges_from([(a, b), (b, c), (d, a)])
+        target = AndroidCallGraph('/tmp', graph)
+        target._entry_points = {a: a}
+
+        # Act
+        actual = target.estimate_surface_metrics(c, 'entry')
+
+        # Assert
+        self.assertEqual(2, actual['proximity'])
+        self.assertEqual(0, actual['proximity_error'])
+        self.assertEqual(1, actual['surface_coupling'])
+        self.assertEqual(0, actual['surface_coupling_error'])
+        self.assertEqual(
+            0, target.estimate_surface_metrics(a, 'entry')['proximity']
+        )
+
+    @unittest.skipIf(np is None, 'NumPy is not installed.')
+    def test_risky_walk(self):
+        # Arrange
+        (a, b, c, d) = [
+            self._get_call(name, 'com.example.MainActivity', 'com.example')
+            for name in ['a', 'b', 'c', 'd']
+        ]
+        graph = nx.DiGraph()
+        graph.add_edges_from([(a, b), (b, c), (d, a)])
+        target = AndroidCallGraph('/tmp', graph)
+        target._entry_points = {a: a}
+
+        # Act
+        actual = target.get_risky_walk(damping=0.5, exact=True)
+
+        # Assert
+        self.assertAlmostEqual(1, actual[a])
+        self.assertAlmostEqual(0.5, actual[b])
+        self.assertAlmostEqual(0.25, actual[c])
+        self.assertAlmostEqual(0, actual[d])
+
+    def test_get_android_edge_black_list_missing(self):
+        # Arrange
+        file_name = os.path.join(
+            os.path.dirname(os.path.realpath(android_call_graph.__file__)),
+            'data', 'android_edge_black_list'
+        )
+        if os.path.exists(file_name):
+            self.skipTest('The Android edge black list is installed.')
+        _black_list = AndroidCallGraph._android_black_list_edges
+        AndroidCallGraph._android_black_list_edges = None
+
+        try:
+            # Act
+            actual = AndroidCallGraph._get_android_edge_black_list()
+
+            # Assert
+            self.assertEqual(0, len(actual))
+            self.assertFalse(os.path.exists(file_name + '.bin'))
+        finally:
+            AndroidCallGraph._android_black_list_edges = _black_list
+
+    def test_metric_store(self):
+        # Arrange
+        (a, b, c) = [
+            self._get_call(name, 'com.example.MainActivity', 'com.example')
+            for name in ['a', 'b', 'c']
+        ]
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'metrics')
+        self.addCleanup(shutil.rmtree, directory)
+
+        expected = AndroidCallGraph('/tmp', nx.DiGraph([(a, b), (b, c)]))
+        expected.cache = MetricCache(path=path)
+        expected.get_page_rank()
+        expected.cache.close()
+
+        target = AndroidCallGraph('/tmp', nx.DiGraph([(a, b), (b, c)]))
+        target.cache = MetricCache(path=path)
+
+        def compute(*args):
+            raise AssertionError('The metric should not be computed.')
+        target._compute_page_rank = compute
+
+        # Act
+        page_rank = target.get_page_rank()
+        target.cache.close()
+
+        # Assert
+        self.assertEqual(Granularity.FUNC, target.granularity)
+        self.assertEqual(expected.fingerprint, target.fingerprint)
+        self.assertEqual(expected.get_page_rank(), page_rank)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import copy
+import gc
+import os
+import pickle
+import unittest
+
+import networkx as nx
+
+from attacksurfacemeter import attributes
+from attacksurfacemeter.attributes import Flags, SharedAttributes
+from attacksurfacemeter.loaders.cflow_loader import CflowLoader
+
+
+class AttributesTestCase(unittest.TestCase):
+    def test_intern(self):
+        # Act
+        first = SharedAttributes.intern({'cflow': None, 'call': None})
+        second = SharedAttributes.intern({'call': None, 'cflow': None})
+        third = SharedAttributes.intern({'cflow': None, 'return': None})
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual({'cflow': None, 'call': None}, first)
+        self.assertEqual(Flags.CFLOW | Flags.CALL, first.flags)
+        self.assertEqual(Flags.CFLOW | Flags.RETURN, third.flags)
+
+    def test_intern_unhashable(self):
+        # Arrange
+        attrs = {'call': None, 'callers': ['main']}
+
+        # Act
+        actual = SharedAttributes.intern(attrs)
+
+        # Assert
+        self.assertNotIsInstance(actual, SharedAttributes)
+        self.assertIsNot(attrs, actual)
+        self.assertEqual(attrs, actual)
+
+    def test_intern_types(self):
+        # Act
+        integer = SharedAttributes.intern({'weight': 1})
+        real = SharedAttributes.intern({'weight': 1.0})
+        boolean = SharedAttributes.intern({'weight': True})
+
+        # Assert
+        self.assertIsNot(integer, real)
+        self.assertIsNot(integer, boolean)
+        self.assertIsNot(real, boolean)
+        self.assertIs(float, type(real['weight']))
+        self.assertIs(bool, type(boolean['weight']))
+
+    def test_intern_discarded(self):
+        # Arrange
+        graph = nx.DiGraph()
+        attributes.add_edge(graph, 'a', 'b', {'weight': 1 / 3})
+        key = frozenset([('weight', float, 1 / 3)])
+
+        # Act
+        before = key in SharedAttributes._instances
+        graph.remove_edge('a', 'b')
+        gc.collect()
+
+        # Assert
+        self.assertTrue(before)
+        self.assertNotIn(key, SharedAttributes._instances)
+
+    def test_copy_on_write(self):
+        # Arrange
+        graph = nx.DiGraph()
+        attributes.add_edges_from(
+            graph, [('a', 'b', {'call': None}), ('b', 'c', {'call': None})]
+        )
+
+        # Act
+        graph.edge['a']['b']['weight'] = 2
+        nx.set_edge_attributes(graph, 'name', {('b', 'c'): 'x'})
+        graph.add_edge('c', 'a', weight=3)
+        graph.add_edge('b', 'c', weight=4)
+
+        # Assert
+        self.assertEqual({'call': None, 'weight': 2}, graph['a']['b'])
+        self.assertIs(graph.succ['a']['b'], graph.pred['b']['a'])
+        self.assertEqual(
+            {'call': None, 'name': 'x', 'weight': 4}, graph['b']['c']
+        )
+        self.assertEqual({'weight': 3}, graph['c']['a'])
+        self.assertEqual(
+            {'call': None}, SharedAttributes.intern({'call': None})
+        )
+        self.assertEqual(
+            {('a', 'b'): 2, ('b', 'c'): 4, ('c', 'a'): 3},
+            nx.get_edge_attributes(graph, 'weight')
+        )
+
+    def test_immutable(self):
+        # Arrange
+        target = SharedAttributes.intern({'gprof': None, 'call': None})
+
+        # Assert
+        self.assertRaises(TypeError, target.__setitem__, 'weight', 1)
+        self.assertRaises(TypeError, target.__delitem__, 'call')
+        self.assertRaises(TypeError, target.update, {'weight': 1})
+        self.assertRaises(TypeError, target.pop, 'call')
+        self.assertRaises(TypeError, target.clear)
+        target.update({})
+        self.assertEqual({'gprof': None, 'call': None}, target)
+
+    def test_copy(self):
+        # Arrange
+        target = SharedAttributes.intern({'gprof': None, 'return': None})
+
+        # Assert
+        self.assertIs(target, copy.copy(target))
+        self.assertIs(target, copy.deepcopy(target))
+        self.assertIs(target, pickle.loads(pickle.dumps(target)))
+
+    def test_get_flags(self):
+        # Assert
+        self.assertEqual(
+            Flags.GPROF | Flags.CALL | Flags.RETURN,
+            attributes.get_flags({'gprof': None, 'call': None, 'return': None})
+        )
+        self.assertEqual(0, attributes.get_flags({'weight': 100}))
+
+    def test_add_edge(self):
+        # Arrange
+        graph = nx.DiGraph()
+        (a, b) = ('a', 'b')
+
+        # Act
+        attributes.add_edge(graph, a, b, {'cflow': None, 'call': None})
+        attributes.add_edge(graph, b, a, {'cflow': None, 'return': None})
+        attributes.add_edge(graph, b, a, {'cflow': None, 'call': None})
+        attributes.add_edge(graph, a, b, {'weight': 100})
+
+        # Assert
+        self.assertIs(
+            attributes.get_attrs(graph, a, b), dict.get(graph.pred[b], a)
+        )
+        self.assertEqual(
+            {'cflow': None, 'call': None, 'weight': 100},
+            attributes.get_attrs(graph, a, b)
+        )
+        self.assertEqual(
+            {'cflow': None, 'call': None, 'return': None},
+            attributes.get_attrs(graph, b, a)
+        )
+        self.assertEqual(
+            Flags.CFLOW | Flags.CALL | Flags.RETURN,
+            attributes.get_attrs(graph, b, a).flags
+        )
+
+    def test_add_edges_from(self):
+        # Arrange
+        graph = nx.DiGraph()
+
+        # Act
+        attributes.add_edges_from(graph, [('a', 'b'), ('b', 'c')])
+        attributes.add_edges_from(graph, [('a', 'b', {'call': None})])
+
+        # Assert
+        self.assertIs(
+            attributes.get_attrs(graph, 'b', 'c'), SharedAttributes.intern({})
+        )
+        self.assertEqual({'call': None}, graph.edge['a']['b'])
+
+    def test_loaded_call_graph(self):
+        # Arrange
+        loader = CflowLoader(
+            os.path.join(
+                os.path.dirname(os.path.realpath(__file__)),
+                'helloworld/cflow.callgraph.txt'
+            )
+        )
+
+        # Act
+        graph = loader.load_call_graph()
+        copied = graph.copy()
+        actual = set(id(attrs) for (_, _, attrs) in graph.edges(data=True))
+
+        # Assert
+        # The edges between recursive_a and recursive_b are both call and
+        #   return edges.
+        self.assertEqual(24, len(graph.edges()))
+        self.assertEqual(3, len(actual))
+        self.assertEqual(
+            actual, set(id(attrs) for (_, _, attrs) in copied.edges(data=True))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,9 +14,9 @@ class BaseLoaderTestCase(unittest.TestCase):
         self.assertEqual(source, target.source)
         self.assertFalse(target.is_reverse)
         self.assertIsNotNone(target.defenses)
-        self.assertIsInstance(target.defenses, list)
+        self.assertIsInstance(target.defenses, frozenset)
         self.assertIsNotNone(target.vulnerabilities)
-        self.assertIsInstance(target.vulnerabilities, list)
+        self.assertIsInstance(target.vulnerabilities, frozenset)
         self.assertCountEqual(list(), target.errors)
 
     def test_init(self):
@@ -9,6 +9,7 @@ from attacksurfacemeter.call_graph import CallGraph
 from attacksurfacemeter.environments import Environments as Env
 from attacksurfacemeter.granularity import Granularity as Gran
 from attacksurfacemeter.loaders.cflow_loader import CflowLoader
+from attacksurfacemeter.loaders.gprof_loader import GprofLoader
 
 
 class CallGraphTestCase(unittest.TestCase):
@@ -131,6 +132,29 @@ class CallGraphTestCase(unittest.TestCase):
         self.assertEqual(len(expected_edges), len(edges))
         self.assertTrue(all_edges_found)
 
+    def test_sanitize_loaded(self):
+        # Arrange
+        loader = CflowLoader(
+            os.path.join(
+                os.path.dirname(os.path.realpath(__file__)),
+                'helloworld/cflow.callgraph.r.mod.txt'
+            ),
+            True
+        )
+        graph = nx.DiGraph()
+        empty = Call('printf', '', Env.C, Gran.FILE)
+        main = Call('main', './src/helloworld.c', Env.C, Gran.FILE)
+        graph.add_edges_from([(main, empty), (empty, main)])
+
+        # Act
+        loaded = loader.load_call_graph(Gran.FILE)
+        target = CallGraph('/tmp', graph, granularity=Gran.FILE)
+
+        # Assert
+        self.assertTrue(all(n.identity for n in loaded))
+        self.assertEqual([main], target.call_graph.nodes())
+        self.assertEqual([], target.call_graph.edges())
+
     def test_assign_weights_w_defaults(self):
         # Arrange
         target = CallGraph(
@@ -212,6 +236,579 @@ class CallGraphTestCase(unittest.TestCase):
         for i in expected:
             self.assertEqual(expected[i], actual[i], msg=i)
 
+    def test_get_edge_weights(self):
+        # Arrange
+        target = CallGraph(
+            source='/tmp', graph=self._build_graph(), load_errors=list(),
+        )
+        weights = {
+            "base": {"call": 125, "return": 75},
+            "dangerous": 35,
+            "defense": -30,
+            "tested": -25,
+            "vulnerable": 35
+        }
+
+        # Act
+        default = target.get_edge_weights(weights=None)
+        first = target.get_edge_weights(weights)
+        second = target.get_edge_weights(dict(weights))
+        target.assign_weights(weights)
+        expected = nx.get_edge_attributes(target.call_graph, 'weight')
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(
+            set(expected),
+            set(
+                (first['nodes'][i], first['nodes'][j])
+                for (i, j) in zip(first['sources'], first['targets'])
+            )
+        )
+        for (i, j, weight, _weight) in zip(
+            first['sources'], first['targets'], first['weight'],
+            default['weight']
+        ):
+            (caller, callee) = (first['nodes'][i], first['nodes'][j])
+            self.assertEqual(expected[(caller, callee)], weight)
+            self.assertEqual(1, _weight)
+        self.assertEqual(
+            sorted(expected.values()),
+            sorted(target.get_edge_weights()['weight'])
+        )
+
+    def test_project(self):
+        # Arrange
+        loader = CflowLoader(
+            os.path.join(
+                os.path.dirname(os.path.realpath(__file__)),
+                'helloworld/cflow.callgraph.txt'
+            ),
+            False
+        )
+        expected = CallGraph.from_loader(loader, granularity=Gran.FILE)
+        helloworld = Call('', './src/helloworld.c', Env.C, Gran.FILE)
+        greetings = Call('', './src/greetings.c', Env.C, Gran.FILE)
+        expected_multiplicity = {
+            (helloworld, helloworld): 14,
+            (helloworld, greetings): 4,
+            (greetings, helloworld): 4,
+            (greetings, greetings): 2
+        }
+        target = CallGraph.from_loader(loader)
+
+        # Act
+        actual = target.project(Gran.FILE)
+
+        # Assert
+        self.assertEqual(Gran.FILE, actual.granularity)
+        self.assertEqual(Gran.FUNC, target.granularity)
+        self.assertEqual(11, len(target.nodes))
+        self.assertCountEqual(expected.nodes, actual.nodes)
+        self.assertCountEqual(
+            [(i, j) for (i, j, _) in expected.edges],
+            [(i, j) for (i, j, _) in actual.edges]
+        )
+        for (i, j, attrs) in actual.edges:
+            multiplicity = attrs.pop('multiplicity')
+            self.assertEqual(expected_multiplicity[(i, j)], multiplicity)
+            self.assertEqual(expected.call_graph.edge[i][j], attrs)
+        self.assertCountEqual(expected.entry_points, actual.entry_points)
+        self.assertCountEqual(expected.exit_points, actual.exit_points)
+
+    def test_project_undefined(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.txt'
+                ),
+                False
+            ),
+            granularity=Gran.FILE
+        )
+
+        # Assert
+        self.assertRaises(Exception, target.project, Gran.FUNC)
+
+    def test_merge(self):
+        # Arrange
+        path = os.path.dirname(os.path.realpath(__file__))
+        cflow = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(path, 'helloworld/cflow.callgraph.r.mod.txt'),
+                True
+            )
+        )
+        gprofs = [
+            CallGraph.from_loader(GprofLoader(os.path.join(path, name)))
+            for name in [
+                'helloworld/gprof.callgraph.txt',
+                'multigprof/multigprof.one.callgraph.txt'
+            ]
+        ]
+        graphs = [cflow] + gprofs
+        before = copy.deepcopy([(g.nodes, g.edges) for g in graphs])
+        expected = CallGraph.from_merge(
+            CallGraph.from_merge(copy.deepcopy(cflow), gprofs[0]), gprofs[1]
+        )
+
+        # Act
+        actual = CallGraph.merge(cflow, *gprofs)
+
+        # Assert
+        self.assertEqual(before, [(g.nodes, g.edges) for g in graphs])
+        self.assertIn(
+            Call('GreeterSayHi', './src/helloworld.c', Env.C),
+            [n for (n, _) in actual.nodes]
+        )
+        self.assertNotIn(
+            Call('GreeterSayHi', '', Env.C), [n for (n, _) in actual.nodes]
+        )
+        self.assertCountEqual(expected.nodes, actual.nodes)
+        self.assertCountEqual(expected.edges, actual.edges)
+        self.assertEqual(
+            len(cflow.load_errors) + len(gprofs[0].load_errors) +
+            len(gprofs[1].load_errors),
+            len(actual.load_errors)
+        )
+
+    def test_add_profile(self):
+        for implicit_returns in [False, True]:
+            # Arrange
+            path = os.path.dirname(os.path.realpath(__file__))
+            loaders = [
+                CflowLoader(
+                    os.path.join(
+                        path, 'helloworld/cflow.callgraph.r.mod.txt'
+                    ),
+                    True, implicit_returns=implicit_returns
+                ),
+                GprofLoader(
+                    os.path.join(path, 'helloworld/gprof.callgraph.txt'),
+                    implicit_returns=implicit_returns
+                )
+            ]
+            (cflow, gprof) = [CallGraph.from_loader(l) for l in loaders]
+            expected = CallGraph.merge(cflow, gprof)
+            target = CallGraph.from_loader(loaders[0])
+            target.entry_points
+            target.exit_points
+            target.get_degree()
+            target.get_fan()
+
+            # Act
+            target.add_profile(gprof)
+
+            # Assert
+            self.assertCountEqual(expected.nodes, target.nodes)
+            self.assertCountEqual(expected.edges, target.edges)
+            self.assertCountEqual(
+                expected.entry_points, target.entry_points
+            )
+            self.assertCountEqual(expected.exit_points, target.exit_points)
+            self.assertEqual(expected.get_degree(), target.get_degree())
+            self.assertEqual(expected.get_fan(), target.get_fan())
+
+    def test_add_profile_frequency(self):
+        # Arrange
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            'helloworld/gprof.callgraph.txt'
+        )
+        gprof = CallGraph.from_loader(GprofLoader(path))
+        target = CallGraph.from_loader(GprofLoader(path))
+        target.get_degree()
+        target.get_fan()
+        expected = {
+            'degree': target.get_degree(), 'fan': target.get_fan(),
+            'frequency': {
+                n: 2 for (n, attrs) in target.nodes if 'frequency' in attrs
+            }
+        }
+
+        # Act
+        target.add_profile(gprof)
+
+        # Assert
+        self.assertEqual(expected['degree'], target.get_degree())
+        self.assertEqual(expected['fan'], target.get_fan())
+        self.assertEqual(
+            expected['frequency'],
+            nx.get_node_attributes(target.call_graph, 'frequency')
+        )
+
+    def test_get_nodes(self):
+        # Arrange
+        path = os.path.dirname(os.path.realpath(__file__))
+        cflow = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(path, 'helloworld/cflow.callgraph.r.mod.txt'),
+                True
+            )
+        )
+        gprof = CallGraph.from_loader(
+            GprofLoader(os.path.join(path, 'helloworld/gprof.callgraph.txt'))
+        )
+        attributes = ['entry', 'exit', 'dangerous', 'tested', 'frequency']
+        before = {a: cflow.get_nodes(a) for a in attributes}
+
+        # Act
+        cflow.add_profile(gprof)
+        after = {a: cflow.get_nodes(a) for a in attributes}
+
+        # Assert
+        for attribute in attributes:
+            self.assertCountEqual(
+                nx.get_node_attributes(cflow.call_graph, attribute).keys(),
+                after[attribute]
+            )
+        self.assertEqual([], before['tested'])
+        self.assertNotEqual([], after['tested'])
+        self.assertNotIn(
+            Call('GreeterSayHi', '', Env.C), after['frequency']
+        )
+
+    def test_compute_metrics(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+        nodes = [n for (n, _) in target.nodes]
+        expected = {
+            'node': nodes, 'entry_proximity': [],
+            'entry_surface_coupling': [], 'exit_proximity': [],
+            'exit_surface_coupling': [], 'entry_reachability': [],
+            'exit_reachability': [], 'dangerous_proximity': []
+        }
+        for node in nodes:
+            for (surface, metrics) in [
+                ('entry', target.get_entry_surface_metrics(node)),
+                ('exit', target.get_exit_surface_metrics(node))
+            ]:
+                expected[surface + '_proximity'].append(metrics['proximity'])
+                expected[surface + '_surface_coupling'].append(
+                    metrics['surface_coupling']
+                )
+            expected['entry_reachability'].append(
+                target.get_entry_point_reachability(node)
+                if node in target.entry_points else None
+            )
+            expected['exit_reachability'].append(
+                target.get_exit_point_reachability(node)
+                if node in target.exit_points else None
+            )
+            expected['dangerous_proximity'].append(None)
+
+        # Act
+        actual = target.compute_metrics()
+        parallel = target.compute_metrics(workers=2)
+        subset = target.compute_metrics(nodes[:2])
+
+        # Assert
+        self.assertEqual(expected, actual)
+        self.assertEqual(expected, parallel)
+        self.assertEqual(
+            {k: v[:2] for (k, v) in expected.items()}, subset
+        )
+
+    def test_attack_surface_subgraph(self):
+        # Arrange
+
+        #   a -> b -> c    d -> e    f
+        graph = nx.DiGraph()
+        graph.add_edges_from([('a', 'b'), ('b', 'c'), ('d', 'e')])
+        graph.add_node('f')
+        graph.node['b']['entry'] = None
+        graph.node['d']['exit'] = None
+        target = CallGraph(source='/tmp', graph=graph)
+
+        # Act
+        nodes = target.get_attack_surface_nodes()
+        actual = target.attack_surface_subgraph()
+
+        # Assert
+        self.assertEqual(frozenset(['b', 'c', 'd']), nodes)
+        self.assertCountEqual(['b', 'c', 'd'], actual.nodes())
+        self.assertEqual([('b', 'c')], actual.edges())
+        self.assertIs(graph.node['b'], actual.node['b'])
+
+    def test_get_attack_surface_nodes(self):
+        # Arrange
+        for implicit_returns in [False, True]:
+            target = CallGraph.from_loader(
+                GprofLoader(
+                    os.path.join(
+                        os.path.dirname(os.path.realpath(__file__)),
+                        'helloworld/gprof.callgraph.txt'
+                    ),
+                    implicit_returns=implicit_returns
+                )
+            )
+            expected = set(target.entry_points + target.exit_points)
+            for point in target.entry_points:
+                expected.update(target.get_descendants(point))
+            for point in target.exit_points:
+                expected.update(target.get_ancestors(point))
+
+            # Act
+            actual = target.get_attack_surface_nodes()
+
+            # Assert
+            self.assertEqual(expected, actual)
+
+    def test_get_path_lengths_bounded(self):
+        # Arrange
+
+        #   a -> b -> c -> d
+        #        |
+        #        v
+        #        e
+        graph = nx.DiGraph()
+        graph.add_edges_from(
+            [('a', 'b'), ('b', 'c'), ('c', 'd'), ('b', 'e')]
+        )
+        target = CallGraph(source='/tmp', graph=graph)
+
+        # Act
+        unbounded = target.get_path_lengths('a')
+        depth = target.get_path_lengths('a', max_depth=2)
+        exact = target.get_path_lengths('a', max_depth=3)
+        nodes = target.get_path_lengths('a', max_nodes=3)
+        reverse = target.get_path_lengths('d', reverse=True, max_depth=1)
+
+        # Assert
+        self.assertEqual(
+            ({'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 2}, False), unbounded
+        )
+        self.assertEqual(({'a': 0, 'b': 1, 'c': 2, 'e': 2}, True), depth)
+        self.assertEqual((unbounded[0], False), exact)
+        self.assertEqual(3, len(nodes[0]))
+        self.assertTrue(nodes[1])
+        self.assertEqual(({'d': 0, 'c': 1}, True), reverse)
+        self.assertCountEqual(
+            ['b', 'c', 'e'], target.get_descendants('a', max_depth=2)
+        )
+        self.assertCountEqual(['c'], target.get_ancestors('d', max_depth=1))
+
+    def test_compute_metrics_bounded(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+        greet_a = Call('greet_a', './src/helloworld.c', Env.C)
+        expected = target.compute_metrics()
+
+        # Act
+        actual = target.compute_metrics(max_depth=100)
+        bounded = target.compute_metrics([greet_a], max_depth=1)
+        metrics = target.get_exit_surface_metrics(greet_a, max_depth=1)
+
+        # Assert
+        self.assertEqual([False] * len(expected['node']), actual['truncated'])
+        del actual['truncated']
+        self.assertEqual(expected, actual)
+        self.assertEqual([True], bounded['truncated'])
+        self.assertEqual(metrics['proximity'], bounded['exit_proximity'][0])
+        self.assertTrue(metrics['truncated'])
+        self.assertEqual(1, metrics['proximity'])
+        self.assertFalse(target.get_exit_surface_metrics(greet_a)['truncated'])
+
+    def test_estimate_surface_metrics(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+        nodes = [n for (n, _) in target.nodes]
+        main = Call('main', './src/helloworld.c', Env.C)
+        greet_a = Call('greet_a', './src/helloworld.c', Env.C)
+
+        # Act
+        first = target.estimate_surface_metrics(greet_a, 'exit', 3, seed=1)
+        second = target.estimate_surface_metrics(greet_a, 'exit', 3, seed=1)
+        landmarks = target.estimate_surface_metrics(
+            greet_a, 'exit', [main, greet_a]
+        )
+
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual(2, first['proximity'] // 1)
+        self.assertEqual(6, first['surface_coupling'])
+        self.assertEqual(1, landmarks['proximity'])
+        self.assertIsNone(landmarks['proximity_error'])
+        self.assertEqual(6, landmarks['surface_coupling'])
+        # Using every point as a landmark yields the exact metrics
+        for node in nodes:
+            for (surface, metrics) in [
+                ('entry', target.get_entry_surface_metrics(node)),
+                ('exit', target.get_exit_surface_metrics(node))
+            ]:
+                actual = target.estimate_surface_metrics(node, surface, 100)
+                self.assertEqual(metrics['proximity'], actual['proximity'])
+                self.assertEqual(
+                    metrics['surface_coupling'], actual['surface_coupling']
+                )
+                if metrics['proximity'] is not None:
+                    self.assertEqual(0, actual['proximity_error'])
+
+    def test_metrics_table(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+        nodes = [n for (n, _) in target.nodes]
+        metrics = target.compute_metrics()
+
+        # Act
+        actual = target.metrics_table()
+
+        # Assert
+        self.assertEqual(
+            ['function_name', 'function_signature', 'identity', 'entry',
+             'exit', 'dangerous', 'defense', 'vulnerable', 'tested', 'fan_in',
+             'fan_out', 'degree_in', 'degree_out', 'page_rank',
+             'dangerous_proximity', 'entry_proximity', 'entry_reachability',
+             'entry_surface_coupling', 'exit_proximity', 'exit_reachability',
+             'exit_surface_coupling'],
+            list(actual)
+        )
+        for (i, node) in enumerate(nodes):
+            self.assertEqual(node.identity, actual['identity'][i])
+            self.assertEqual(
+                node in target.entry_points, actual['entry'][i]
+            )
+            self.assertEqual(target.get_fan(node)[0], actual['fan_in'][i])
+            self.assertEqual(
+                target.get_degree(node)[1], actual['degree_out'][i]
+            )
+            self.assertAlmostEqual(
+                target.get_page_rank(node), actual['page_rank'][i]
+            )
+            for name in ['entry_proximity', 'exit_surface_coupling',
+                         'entry_reachability', 'dangerous_proximity']:
+                if metrics[name][i] is None:
+                    self.assertTrue(actual[name][i] != actual[name][i])
+                else:
+                    self.assertAlmostEqual(metrics[name][i], actual[name][i])
+
+    def test_merge_incompatible(self):
+        # Arrange
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            'helloworld/cflow.callgraph.txt'
+        )
+        function = CallGraph.from_loader(CflowLoader(path))
+        file_ = CallGraph.from_loader(CflowLoader(path), granularity=Gran.FILE)
+        implicit = CallGraph.from_loader(
+            CflowLoader(path, implicit_returns=True)
+        )
+
+        # Assert
+        self.assertRaises(Exception, CallGraph.merge)
+        self.assertRaises(Exception, CallGraph.merge, function, file_)
+        self.assertRaises(Exception, CallGraph.merge, function, implicit)
+
+    def test_diff(self):
+        # Arrange
+        path = os.path.dirname(os.path.realpath(__file__))
+        cflow = CallGraph.from_loader(
+            CflowLoader(os.path.join(path, 'helloworld/cflow.callgraph.txt'))
+        )
+        gprof = CallGraph.from_loader(
+            GprofLoader(os.path.join(path, 'helloworld/gprof.callgraph.txt'))
+        )
+        target = CallGraph.merge(cflow, gprof)
+        (main, greeter_sayhi, greeter_sayhito) = [
+            Call(name, './src/helloworld.c', Env.C)
+            for name in ['main', 'GreeterSayHi', 'GreeterSayHiTo']
+        ]
+        expected = {
+            'nodes': {'added': [], 'removed': []},
+            'edges': {
+                'added': [
+                    (greeter_sayhi, main), (greeter_sayhito, main),
+                    (main, greeter_sayhi), (main, greeter_sayhito)
+                ],
+                'removed': []
+            },
+            'entry_points': {'added': [], 'removed': []},
+            'exit_points': {'added': [], 'removed': []},
+            'dangerous': {'added': [], 'removed': []},
+            'fan': {
+                main: (0, 2), greeter_sayhi: (1, 0), greeter_sayhito: (1, 0)
+            },
+            'counts': {
+                'nodes': 0, 'edges': 4, 'entry_points': 0, 'exit_points': 0,
+                'dangerous': 0
+            }
+        }
+
+        # Act
+        actual = cflow.diff(target)
+
+        # Assert
+        self.assertEqual(expected, actual)
+
+    def test_diff_symmetric(self):
+        # Arrange
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            'helloworld/cflow.callgraph.txt'
+        )
+        cflow = CallGraph.from_loader(CflowLoader(path))
+        implicit = CallGraph.from_loader(
+            CflowLoader(path, implicit_returns=True)
+        )
+        main = Call('main', './src/helloworld.c', Env.C)
+        graph = nx.DiGraph()
+        graph.add_node(main)
+        empty = CallGraph('empty', graph)
+
+        # Act
+        unchanged = cflow.diff(implicit)
+        added = empty.diff(cflow)
+        removed = cflow.diff(empty)
+
+        # Assert
+        for key in ['nodes', 'edges', 'entry_points', 'exit_points']:
+            self.assertEqual({'added': [], 'removed': []}, unchanged[key])
+            self.assertEqual(added[key]['added'], removed[key]['removed'])
+            self.assertEqual(added[key]['removed'], removed[key]['added'])
+            self.assertEqual(
+                added['counts'][key], -1 * removed['counts'][key]
+            )
+        self.assertEqual(dict(), unchanged['fan'])
+        self.assertEqual(len(cflow.edges), added['counts']['edges'])
+        self.assertEqual(
+            sorted(n.identity for (n, _) in cflow.nodes if n != main),
+            [n.identity for n in added['nodes']['added']]
+        )
+
     def _build_graph(self):
         #######################################################################
         #
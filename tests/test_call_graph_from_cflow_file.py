@@ -40,5 +40,48 @@ class CallGraphFileGranularityFromCflowFileTestCase(
             granularity=Granularity.FILE
         )
 
+
+class CallGraphWithImplicitReturnsFromCflowFileTestCase(
+            unittest.TestCase, BaseCflowTests
+        ):
+    def setUp(self):
+        self.target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.txt'
+                ),
+                False,
+                implicit_returns=True
+            )
+        )
+
+    def test_implicit_returns(self):
+        # Assert
+        self.assertTrue(self.target.implicit_returns)
+        self.assertEqual(13, len(self.target.call_graph.edges()))
+        self.assertEqual(24, len(self.target.edges))
+        for (_, _, attrs) in self.target.call_graph.edges(data=True):
+            self.assertTrue('call' in attrs)
+            self.assertTrue('return' not in attrs)
+
+
+class CallGraphFileGranularityWithImplicitReturnsFromCflowFileTestCase(
+            unittest.TestCase, BaseCflowFileGranularityTests
+        ):
+    def setUp(self):
+        self.target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.txt'
+                ),
+                False,
+                implicit_returns=True
+            ),
+            granularity=Granularity.FILE
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
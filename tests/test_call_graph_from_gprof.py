@@ -41,5 +41,39 @@ class CallGraphFileGranularityFromGprofTestCase(
             granularity=Granularity.FILE
         )
 
+
+class CallGraphWithImplicitReturnsFromGprofTestCase(
+            unittest.TestCase, BaseGprofTests
+        ):
+    def setUp(self):
+        self.target = CallGraph.from_loader(
+            GprofLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/gprof.callgraph.txt'
+                ),
+                True,
+                implicit_returns=True
+            )
+        )
+
+
+class CallGraphFileGranularityWithImplicitReturnsFromGprofTestCase(
+            unittest.TestCase, BaseGprofFileGranularityTests
+        ):
+    def setUp(self):
+        self.target = CallGraph.from_loader(
+            GprofLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/gprof.callgraph.txt'
+                ),
+                True,
+                implicit_returns=True
+            ),
+            granularity=Granularity.FILE
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
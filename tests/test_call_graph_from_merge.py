@@ -63,5 +63,50 @@ class CallGraphFileGranularityFromMergeTestCase(
             )
         )
 
+
+class CallGraphWithImplicitReturnsFromMergeTestCase(
+            unittest.TestCase, BaseMergeTests
+        ):
+    def setUp(self):
+        self.target = CallGraph.from_merge(
+            CallGraph.from_loader(
+                CflowLoader(
+                    os.path.join(
+                        os.path.dirname(os.path.realpath(__file__)),
+                        'helloworld/cflow.callgraph.r.txt'
+                    ),
+                    True,
+                    implicit_returns=True
+                )
+            ),
+            CallGraph.from_loader(
+                GprofLoader(
+                    os.path.join(
+                        os.path.dirname(os.path.realpath(__file__)),
+                        'helloworld/gprof.callgraph.txt'
+                    ),
+                    implicit_returns=True
+                )
+            )
+        )
+
+    def test_from_merge_mixed_returns(self):
+        # Arrange
+        cflow_call_graph = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+
+        # Assert
+        self.assertRaises(
+            Exception, CallGraph.from_merge, cflow_call_graph, self.target
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
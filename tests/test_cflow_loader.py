@@ -1,4 +1,5 @@
 import os
+import tempfile
 import unittest
 
 import networkx as nx
@@ -327,5 +328,95 @@ class CflowLoaderTestCase(unittest.TestCase):
         for (u, v) in call_edges:
             self.assertTrue('return' in test_graph[v][u])
 
+    def test_load_call_graphs(self):
+        # Arrange
+        target = CflowLoader(self._get_path('cflow.callgraph.r.txt'), True)
+        expected = {
+            'forward': self.test_loader.load_call_graph(),
+            'reverse': target.load_call_graph()
+        }
+
+        # Act
+        (forward, reverse) = target.load_call_graphs()
+
+        # Assert
+        self.assertCountEqual(
+            expected['forward'].nodes(data=True), forward.nodes(data=True)
+        )
+        self.assertCountEqual(
+            expected['forward'].edges(data=True), forward.edges(data=True)
+        )
+        self.assertCountEqual(
+            expected['reverse'].nodes(data=True), reverse.nodes(data=True)
+        )
+        self.assertCountEqual(
+            expected['reverse'].edges(data=True), reverse.edges(data=True)
+        )
+        self.assertIsNot(forward, reverse)
+
+    def test_load_call_graphs_not_reverse(self):
+        # Assert
+        self.assertRaises(ValueError, self.test_loader.load_call_graphs)
+
+    def test_load_call_graphs_from_reverse(self):
+        # Arrange
+        expected = self.test_loader
+
+        # Act
+        for granularity in [Gran.FUNC, Gran.FILE]:
+            (forward, reverse) = CflowLoader(
+                self._get_path('cflow.callgraph.r.txt'), True
+            ).load_call_graphs(granularity)
+
+            # Assert
+            graph = expected.load_call_graph(granularity)
+            self.assertCountEqual(
+                graph.nodes(data=True), forward.nodes(data=True)
+            )
+            self.assertCountEqual(
+                graph.edges(data=True), forward.edges(data=True)
+            )
+            self.assertCountEqual(
+                graph.nodes(data=True), reverse.nodes(data=True)
+            )
+            self.assertCountEqual(
+                graph.edges(data=True), reverse.edges(data=True)
+            )
+
+    def test_load_call_graphs_from_reverse_w_unreachable(self):
+        # Arrange
+        unused = Call('unused', './src/helloworld.c', Env.C)
+        with open(self._get_path('cflow.callgraph.r.txt')) as file_:
+            lines = file_.read().rstrip('\n') + '\n'
+        lines += (
+            'greet() <void greet (int greeting_code) at ./src/greetings.c:14>'
+            ':\n'
+            '    unused() <void unused () at ./src/helloworld.c:100>\n'
+        )
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as file_:
+            file_.write(lines)
+            file_.flush()
+
+            # Act
+            (forward, reverse) = CflowLoader(
+                file_.name, True
+            ).load_call_graphs()
+
+        # Assert
+        expected = self.test_loader.load_call_graph()
+        self.assertCountEqual(expected.nodes(), forward.nodes())
+        self.assertCountEqual(expected.edges(), forward.edges())
+        self.assertTrue(unused in reverse)
+        self.assertEqual(len(expected) + 1, len(reverse))
+        self.assertEqual(
+            len(expected.edges()) + 2, len(reverse.edges())
+        )
+
+    def _get_path(self, name):
+        return os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), 'helloworld', name
+        )
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from attacksurfacemeter.call import Call
+from attacksurfacemeter.edge_black_list import EdgeBlackList
+from attacksurfacemeter.environments import Environments
+
+
+class EdgeBlackListTestCase(unittest.TestCase):
+    def setUp(self):
+        self.on_create = Call(
+            'onCreate', 'com.example.MainActivity', Environments.ANDROID
+        )
+        self.set_text = Call(
+            'setText', 'android.widget.TextView', Environments.ANDROID
+        )
+        self.inflate = Call(
+            'inflate', 'android.view.MenuInflater', Environments.ANDROID
+        )
+
+    def test_from_edges(self):
+        # Act
+        target = EdgeBlackList.from_edges([
+            (self.on_create, self.set_text), (self.set_text, self.inflate),
+            (self.on_create, self.set_text)
+        ])
+
+        # Assert
+        self.assertEqual(2, len(target))
+        self.assertIn((self.on_create, self.set_text), target)
+        self.assertIn((self.set_text, self.inflate), target)
+        self.assertNotIn((self.set_text, self.on_create), target)
+        self.assertNotIn((self.on_create, self.inflate), target)
+        self.assertEqual(0, len(EdgeBlackList()))
+        self.assertNotIn((self.on_create, self.set_text), EdgeBlackList())
+
+    def test_save_load(self):
+        # Arrange
+        edges = [
+            (self.on_create, self.set_text), (self.set_text, self.inflate)
+        ]
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            pass
+
+        try:
+            # Act
+            EdgeBlackList.from_edges(edges).save(f.name)
+            target = EdgeBlackList.load(f.name)
+
+            # Assert
+            self.assertEqual(2, len(target))
+            for edge in edges:
+                self.assertIn(edge, target)
+            self.assertNotIn((self.inflate, self.set_text), target)
+
+            target.close()
+            self.assertEqual(0, len(target))
+        finally:
+            os.remove(f.name)
+
+    def test_save_replace(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'black_list.bin')
+        EdgeBlackList.from_edges([(self.on_create, self.set_text)]).save(path)
+        loaded = EdgeBlackList.load(path)
+
+        try:
+            # Act
+            EdgeBlackList.from_edges([(self.set_text, self.inflate)]).save(
+                path
+            )
+            target = EdgeBlackList.load(path)
+
+            # Assert
+            self.assertEqual(['black_list.bin'], os.listdir(directory))
+            self.assertIn((self.on_create, self.set_text), loaded)
+            self.assertNotIn((self.on_create, self.set_text), target)
+            self.assertIn((self.set_text, self.inflate), target)
+
+            loaded.close()
+            target.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_load_invalid(self):
+        # Arrange
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.bin', delete=False
+        ) as file_:
+            file_.write('onCreate com.example.MainActivity\n')
+
+        # Assert
+        try:
+            self.assertRaises(Exception, EdgeBlackList.load, file_.name)
+        finally:
+            os.remove(file_.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
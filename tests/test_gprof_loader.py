@@ -290,5 +290,16 @@ class GprofLoaderTestCase(unittest.TestCase):
         for (u, v) in nx.get_edge_attributes(graph, 'call'):
             self.assertTrue('return' in graph[v][u])
 
+    def test_get_command(self):
+        # Arrange
+        target = GprofLoader('gmon.out', executable='a.out')
+
+        # Act
+        actual = target._get_command()
+
+        # Assert
+        self.assertEqual(['gprof', '-q', '-b', 'a.out', 'gmon.out'], actual)
+        self.assertIsNone(self.target._get_command())
+
 if __name__ == '__main__':
     unittest.main()
@@ -76,6 +76,41 @@ class JavaCGLoaderTestCase(unittest.TestCase):
         self.assertEqual(38, len(nodes))
         self.assertTrue(all_nodes_found)
 
+    def test_load_call_graph_w_processes(self):
+        # Arrange
+        source = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            'helloworld/javacg.callgraph.txt'
+        )
+        expected = JavaCGLoader(source).load_call_graph()
+        test_loader = JavaCGLoader(source, processes=3)
+
+        # Act
+        test_graph = test_loader.load_call_graph()
+
+        # Assert
+        self.assertEqual(3, len(test_loader._get_chunks()))
+        self.assertCountEqual(expected.nodes(), test_graph.nodes())
+        self.assertCountEqual(expected.edges(), test_graph.edges())
+
+    def test_load_call_graph_w_processes_and_app_packages(self):
+        # Arrange
+        source = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            'helloworld/javacg.callgraph.txt'
+        )
+        app_packages = ['com.example.kevin.helloandroid']
+        expected = JavaCGLoader(source, app_packages).load_call_graph()
+        test_loader = JavaCGLoader(source, app_packages, processes=4)
+
+        # Act
+        test_graph = test_loader.load_call_graph()
+
+        # Assert
+        self.assertEqual(38, len(test_graph.nodes()))
+        self.assertCountEqual(expected.nodes(), test_graph.nodes())
+        self.assertCountEqual(expected.edges(), test_graph.edges())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from attacksurfacemeter.call_graph import CallGraph
+from attacksurfacemeter.loaders.cflow_loader import CflowLoader
+from attacksurfacemeter.metric_cache import MetricCache
+
+
+class MetricCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'metrics')
+        self.loader = CflowLoader(
+            os.path.join(
+                os.path.dirname(os.path.realpath(__file__)),
+                'helloworld/cflow.callgraph.txt'
+            )
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lru(self):
+        # Arrange
+        target = MetricCache(maxsize=2)
+
+        # Act
+        target.put(('a', (), 0), 1)
+        target.put(('b', (), 0), 2)
+        target.get(('a', (), 0))
+        target.put(('c', (), 0), 3)
+
+        # Assert
+        self.assertEqual(2, len(target))
+        self.assertEqual(1, target.get(('a', (), 0)))
+        self.assertIsNone(target.get(('b', (), 0)))
+        self.assertEqual(3, target.get(('c', (), 0)))
+
+    def test_store(self):
+        # Arrange
+        target = MetricCache(path=self.path)
+        target.put(('a', (), 0), {'x': 1}, lambda: ('a', (), 'digest'))
+        target.close()
+
+        # Act
+        target = MetricCache(path=self.path)
+        actual = target.get(('a', (), 5), None, lambda: ('a', (), 'digest'))
+        missing = target.get(('a', (), 6), None, lambda: ('a', (), 'other'))
+        target.close()
+
+        # Assert
+        self.assertEqual({'x': 1}, actual)
+        self.assertIsNone(missing)
+
+    def test_invalidate(self):
+        # Arrange
+        target = CallGraph.from_loader(self.loader)
+        before = target.get_page_rank()
+        version = target.version
+
+        # Act
+        cached = target.get_page_rank()
+        target.assign_weights()
+        after = target.get_page_rank()
+
+        # Assert
+        self.assertIs(before, cached)
+        self.assertGreater(target.version, version)
+        self.assertIsNot(before, after)
+        self.assertNotEqual(before, after)
+
+    def test_path_lengths(self):
+        # Arrange
+        target = CallGraph.from_loader(self.loader)
+        page_rank = target.get_page_rank()
+        size = len(target.cache)
+
+        # Act
+        for (call, _) in target.nodes:
+            target.get_descendants(call)
+            target.get_ancestors(call)
+
+        # Assert
+        self.assertEqual(size, len(target.cache))
+        self.assertIs(page_rank, target.get_page_rank())
+
+    def test_call_graph_store(self):
+        # Arrange
+        expected = CallGraph.from_loader(self.loader)
+        expected.cache = MetricCache(path=self.path)
+        expected.get_page_rank()
+        expected.get_fan()
+        expected.cache.close()
+
+        target = CallGraph.from_loader(self.loader)
+        target.cache = MetricCache(path=self.path)
+
+        def compute(*args):
+            raise AssertionError('The metric should not be computed.')
+        target._compute_page_rank = target._compute_fan = compute
+
+        # Act
+        page_rank = target.get_page_rank()
+        fan = target.get_fan()
+        target.cache.close()
+
+        # Assert
+        self.assertEqual(expected.fingerprint, target.fingerprint)
+        self.assertEqual(expected.get_page_rank(), page_rank)
+        self.assertEqual(expected.get_fan(), fan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from attacksurfacemeter.loaders.package_trie import PackageTrie
+
+
+class PackageTrieTestCase(unittest.TestCase):
+    def test_add(self):
+        # Arrange
+        target = PackageTrie()
+
+        # Act
+        target.add('com.example.app')
+        target.add('com.example.app')
+        target.add('org.example')
+
+        # Assert
+        self.assertEqual(2, len(target))
+        self.assertTrue('com.example.app' in target)
+        self.assertTrue('org.example' in target)
+        self.assertFalse('com.example' in target)
+        self.assertFalse('com.example.app.ui' in target)
+
+    def test_matches(self):
+        # Arrange
+        target = PackageTrie(['com.example.app', 'org.example'])
+
+        # Assert
+        self.assertTrue(target.matches('com.example.app'))
+        self.assertTrue(target.matches('com.example.app.Main'))
+        self.assertTrue(target.matches('com.example.app.ui.Main$Inner'))
+        self.assertTrue(target.matches('org.example.Main'))
+        self.assertFalse(target.matches('com.example'))
+        self.assertFalse(target.matches('com.example.application.Main'))
+        self.assertFalse(target.matches('net.example.app.Main'))
+        self.assertFalse(target.matches(''))
+
+    def test_empty(self):
+        # Arrange
+        target = PackageTrie()
+
+        # Assert
+        self.assertEqual(0, len(target))
+        self.assertFalse(target)
+        self.assertFalse(target.matches('com.example.app.Main'))
+
+
+if __name__ == '__main__':
+    unittest.main()
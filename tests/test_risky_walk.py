@@ -0,0 +1,193 @@
+import os
+import unittest
+
+import networkx as nx
+
+from attacksurfacemeter import call_graph, risky_walk
+from attacksurfacemeter.call_graph import CallGraph
+from attacksurfacemeter.loaders.cflow_loader import CflowLoader
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class RiskyWalkTestCase(unittest.TestCase):
+    def setUp(self):
+        #   a -> b -> c
+        #   |         ^
+        #   +---------+
+        graph = nx.DiGraph()
+        graph.add_edge('a', 'b', weight=3)
+        graph.add_edge('a', 'c', weight=1)
+        graph.add_edge('b', 'c')
+        self.target = risky_walk.Transitions.from_call_graph(
+            CallGraph(source='/tmp', graph=graph)
+        )
+        self.index = {n: i for (i, n) in enumerate(self.target.nodes)}
+        self.starts = np.array([self.index['a']])
+
+    def test_transitions(self):
+        # Arrange
+        (a, b, c) = (self.index['a'], self.index['b'], self.index['c'])
+        expected = np.zeros((3, 3))
+        expected[a, b] = 0.75
+        expected[a, c] = 0.25
+        expected[b, c] = 1
+
+        # Act
+        actual = self.target.get_matrix()
+
+        # Assert
+        self.assertTrue(np.allclose(expected, actual))
+        self.assertEqual([False, False, True], [
+            bool(self.target.is_dead_end[i]) for i in (a, b, c)
+        ])
+
+    def test_solve(self):
+        # Act
+        actual = risky_walk.solve(self.target, self.starts, damping=0.5)
+
+        # Assert
+        self.assertAlmostEqual(1, actual[self.index['a']])
+        self.assertAlmostEqual(0.375, actual[self.index['b']])
+        # a -> c directly, or a -> b -> c
+        self.assertAlmostEqual(
+            0.5 * 0.25 + 0.375 * 0.5, actual[self.index['c']]
+        )
+
+    def test_solve_too_many_nodes(self):
+        # Arrange
+        graph = nx.DiGraph()
+        graph.add_path(range(risky_walk.MAX_SOLVE_NODES + 1))
+        target = risky_walk.Transitions.from_call_graph(
+            CallGraph(source='/tmp', graph=graph)
+        )
+
+        # Assert
+        self.assertRaises(
+            Exception, risky_walk.solve, target, self.starts
+        )
+
+    def test_simulate(self):
+        # Arrange
+        expected = risky_walk.solve(self.target, self.starts, damping=0.5)
+
+        # Act
+        actual = risky_walk.simulate(
+            self.target, self.starts, 20000, damping=0.5, seed=1
+        )
+        parallel = risky_walk.simulate(
+            self.target, self.starts, 20000, damping=0.5, seed=1, workers=2
+        )
+
+        # Assert
+        self.assertTrue(
+            np.all(np.abs(expected - actual['risky_walk']) <
+                   5 * actual['error'] + 1e-9)
+        )
+        self.assertTrue(
+            np.array_equal(actual['risky_walk'], parallel['risky_walk'])
+        )
+        self.assertEqual(20000, actual['walks'])
+        self.assertEqual(0, actual['truncated'])
+        self.assertLess(actual['mean_length'], 1)
+
+    def test_simulate_max_steps(self):
+        # Act
+        actual = risky_walk.simulate(
+            self.target, self.starts, 1000, damping=0.5, max_steps=1
+        )
+
+        # Assert
+        # Only the walks that went on at their first step were stopped
+        self.assertGreater(actual['truncated'], 0.45)
+        self.assertLess(actual['truncated'], 0.55)
+        self.assertEqual(actual['truncated'], actual['mean_length'])
+        self.assertAlmostEqual(
+            actual['truncated'],
+            actual['risky_walk'][self.index['b']] +
+            actual['risky_walk'][self.index['c']]
+        )
+
+    def test_call_graph(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+        target.assign_weights()
+
+        # Act
+        expected = target.get_risky_walk(exact=True)
+        actual = target.compute_risky_walk(walks=20000, seed=2)
+
+        # Assert
+        self.assertCountEqual(expected.keys(), actual['risky_walk'].keys())
+        for (call, value) in expected.items():
+            self.assertLess(
+                abs(value - actual['risky_walk'][call]),
+                5 * actual['error'][call] + 1e-9
+            )
+        self.assertEqual(
+            expected[target.entry_points[0]],
+            target.get_risky_walk(target.entry_points[0], exact=True)
+        )
+
+    def test_call_graph_weights(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True, implicit_returns=True
+            )
+        )
+        weights = {
+            'base': {'call': 100, 'return': 10}, 'dangerous': 50
+        }
+
+        # Act
+        unweighted = target.get_risky_walk(exact=True)
+        actual = target.get_risky_walk(exact=True, weights=weights)
+        target.assign_weights(weights)
+        expected = target.get_risky_walk(exact=True)
+
+        # Assert
+        self.assertNotEqual(unweighted, actual)
+        for (call, value) in expected.items():
+            self.assertAlmostEqual(value, actual[call])
+
+    def test_call_graph_without_numpy(self):
+        # Arrange
+        target = CallGraph.from_loader(
+            CflowLoader(
+                os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    'helloworld/cflow.callgraph.r.txt'
+                ),
+                True
+            )
+        )
+        _np = call_graph.np
+        call_graph.np = None
+
+        # Assert
+        try:
+            with self.assertRaisesRegex(Exception, 'NumPy is required'):
+                target.compute_risky_walk()
+        finally:
+            call_graph.np = _np
+
+
+if __name__ == '__main__':
+    unittest.main()
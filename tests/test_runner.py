@@ -0,0 +1,110 @@
+import asyncio
+import os
+import unittest
+
+from attacksurfacemeter.granularity import Granularity as Gran
+from attacksurfacemeter.loaders.cflow_loader import CflowLoader
+from attacksurfacemeter.loaders.gprof_loader import GprofLoader
+from attacksurfacemeter.loaders.runner import load_call_graphs
+
+
+class _CommandCflowLoader(CflowLoader):
+    def __init__(self, source, command, reverse=False):
+        super(_CommandCflowLoader, self).__init__(source, reverse)
+        self._command = command
+
+    def _get_command(self):
+        return self._command
+
+
+class RunnerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), 'helloworld'
+        )
+
+    def test_load_call_graphs(self):
+        # Arrange
+        cflow = os.path.join(self.path, 'cflow.callgraph.txt')
+        cflow_r = os.path.join(self.path, 'cflow.callgraph.r.txt')
+        gprof = os.path.join(self.path, 'gprof.callgraph.txt')
+        expected = [
+            CflowLoader(cflow).load_call_graph(Gran.FILE),
+            CflowLoader(cflow_r, True).load_call_graph(Gran.FILE),
+            GprofLoader(gprof).load_call_graph(Gran.FILE)
+        ]
+        loaders = [
+            _CommandCflowLoader(self.path, ['cat', cflow]),
+            _CommandCflowLoader(self.path, ['cat', cflow_r], True),
+            GprofLoader(gprof)
+        ]
+
+        # Act
+        actual = load_call_graphs(loaders, Gran.FILE, concurrency=2)
+
+        # Assert
+        self.assertEqual(len(expected), len(actual))
+        for (e, a) in zip(expected, actual):
+            self.assertCountEqual(e.nodes(data=True), a.nodes(data=True))
+            self.assertCountEqual(e.edges(data=True), a.edges(data=True))
+
+    def test_load_call_graphs_timeout(self):
+        # Arrange
+        cflow = os.path.join(self.path, 'cflow.callgraph.txt')
+        loaders = [
+            _CommandCflowLoader(self.path, ['sleep', '10']),
+            _CommandCflowLoader(self.path, ['cat', cflow])
+        ]
+
+        # Act
+        actual = load_call_graphs(loaders, timeout=0.5)
+
+        # Assert
+        self.assertIsInstance(actual[0], asyncio.TimeoutError)
+        self.assertEqual(11, len(actual[1].nodes()))
+
+    def test_load_call_graphs_failure(self):
+        # Arrange
+        cflow = os.path.join(self.path, 'cflow.callgraph.txt')
+        loaders = [
+            _CommandCflowLoader(
+                self.path, ['sh', '-c', 'cat {0}; exit 3'.format(cflow)]
+            ),
+            _CommandCflowLoader(self.path, ['/nonexistent/cflow']),
+            _CommandCflowLoader(self.path, ['cat', cflow])
+        ]
+
+        # Act
+        actual = load_call_graphs(loaders)
+
+        # Assert
+        self.assertIsInstance(actual[0], Exception)
+        self.assertIn('exited with status 3', str(actual[0]))
+        self.assertIsInstance(actual[1], Exception)
+        self.assertIn('could not be executed', str(actual[1]))
+        self.assertEqual(11, len(actual[2].nodes()))
+
+    def test_load_call_graph_failure(self):
+        # Arrange
+        cflow = os.path.join(self.path, 'cflow.callgraph.txt')
+
+        # Assert
+        with self.assertRaisesRegex(Exception, 'exited with status 3'):
+            _CommandCflowLoader(
+                self.path, ['sh', '-c', 'cat {0}; exit 3'.format(cflow)]
+            ).load_call_graph()
+        with self.assertRaisesRegex(Exception, 'could not be executed'):
+            _CommandCflowLoader(
+                self.path, ['/nonexistent/cflow']
+            ).load_call_graph()
+        self.assertEqual(
+            11,
+            len(
+                _CommandCflowLoader(self.path, ['cat', cflow])
+                .load_call_graph().nodes()
+            )
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ import unittest
 
 from attacksurfacemeter.call_graph import CallGraph
 from attacksurfacemeter.loaders.cflow_loader import CflowLoader
+from attacksurfacemeter.loaders.gprof_loader import GprofLoader
 from attacksurfacemeter.formatters.txt_formatter import TxtFormatter
 from tests.base_formatter_tests import BaseFormatterTests
 
@@ -31,5 +32,94 @@ class TxtFormatterTestCase(unittest.TestCase, BaseFormatterTests):
         )
 
 
+class TxtFormatterDiffTestCase(unittest.TestCase):
+    def test_write_diff(self):
+        # Arrange
+        baseline = CallGraph.from_loader(
+            CflowLoader(self._get_path('cflow.callgraph.r.txt'), True)
+        )
+        target = TxtFormatter(
+            CallGraph.from_loader(
+                CflowLoader(self._get_path('cflow.callgraph.r.mod.txt'), True)
+            )
+        )
+
+        # Act
+        actual = target.write_diff(baseline)
+
+        # Assert
+        self.assertIn('Functions Count:            +0\n', actual)
+        self.assertIn('Functions (+1, -1)', actual)
+        self.assertIn(
+            '+ | {0:52s} | {1:46s} |'.format('GreeterSayHi', ''), actual
+        )
+        self.assertIn(
+            '- | {0:52s} | {1:46s} |'.format(
+                'GreeterSayHi', './src/helloworld.c'
+            ),
+            actual
+        )
+        self.assertIn('Calls (+2, -2)', actual)
+        for sign in ['+', '-']:
+            self.assertIn(
+                '{0} {1:>52s} | {2:52s}'.format(
+                    sign, 'GreeterSayHi', 'new_Greeter'
+                ),
+                actual
+            )
+            self.assertIn(
+                '{0} {1:>52s} | {2:52s}'.format(
+                    sign, 'new_Greeter', 'GreeterSayHi'
+                ),
+                actual
+            )
+        self.assertIn('Exit Points (+1, -1)', actual)
+        self.assertIn('No entry points changed.', actual)
+        self.assertIn('No fan changed.', actual)
+
+    def test_write_diff_fan(self):
+        # Arrange
+        baseline = CallGraph.from_loader(
+            CflowLoader(self._get_path('cflow.callgraph.r.txt'), True)
+        )
+        target = TxtFormatter(
+            CallGraph.from_loader(
+                GprofLoader(self._get_path('gprof.callgraph.txt'))
+            )
+        )
+
+        # Act
+        actual = target.write_diff(baseline)
+
+        # Assert
+        self.assertIn('Functions Count:            -1\n', actual)
+        self.assertIn('Calls Count:                -2\n', actual)
+        self.assertIn('Functions (+0, -1)', actual)
+        self.assertIn(
+            '- | {0:52s} | {1:46s} |'.format(
+                'functionPtr', './src/helloworld.c'
+            ),
+            actual
+        )
+        self.assertIn('Calls (+4, -6)', actual)
+        self.assertIn('Fan (2)', actual)
+        self.assertIn(
+            '| {0:52s} | {1:46s} | {2:+6d} | {3:+7d} |'.format(
+                'main', './src/helloworld.c', 0, 1
+            ),
+            actual
+        )
+        self.assertIn(
+            '| {0:52s} | {1:46s} | {2:+6d} | {3:+7d} |'.format(
+                'new_Greeter', './src/helloworld.c', 0, -2
+            ),
+            actual
+        )
+
+    def _get_path(self, name):
+        return os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), 'helloworld', name
+        )
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,7 @@
 import copy
+import json
 import os
+import tempfile
 import unittest
 
 import networkx as nx
@@ -8,9 +10,15 @@ from attacksurfacemeter import utilities
 from attacksurfacemeter.call import Call
 from attacksurfacemeter.call_graph import CallGraph
 from attacksurfacemeter.environments import Environments
+from attacksurfacemeter.granularity import Granularity
 from attacksurfacemeter.loaders.cflow_loader import CflowLoader
 from attacksurfacemeter.loaders.gprof_loader import GprofLoader
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class UtilitiesTestCase(unittest.TestCase):
     def test_fix(self):
@@ -38,6 +46,8 @@ class UtilitiesTestCase(unittest.TestCase):
             'after': Call('GreeterSayHi', './src/helloworld.c', Environments.C)
         }
 
+        degree = target.get_degree()
+
         # Act
         utilities.fix(target, using=reference)
         actual = {
@@ -56,6 +66,10 @@ class UtilitiesTestCase(unittest.TestCase):
         # Assert
         self.assertEqual(expected['before'], actual['before'])
         self.assertEqual(expected['after'], actual['after'])
+        # Asserting if metrics cached before the fix were invalidated
+        self.assertIn(expected['before'], degree)
+        self.assertNotIn(expected['before'], target.get_degree())
+        self.assertIn(expected['after'], target.get_degree())
         # Asserting if node attributes got carried over
         self.assertCountEqual(
             [
@@ -109,6 +123,62 @@ class UtilitiesTestCase(unittest.TestCase):
             ],
         )
 
+    def test_get_name_index(self):
+        # Arrange
+        calls = [
+            Call('greet', './src/greetings.c', Environments.C),
+            Call('main', './src/helloworld.c', Environments.C),
+            Call('main', './src/helloworld.c', Environments.C),
+            Call('new_Greeter', './src/helloworld.c', Environments.C),
+            Call('new_Greeter', './src/greetings.c', Environments.C)
+        ]
+
+        # Act
+        actual = utilities.get_name_index(calls)
+
+        # Assert
+        self.assertEqual(3, len(actual))
+        self.assertEqual(calls[0], actual['greet'])
+        self.assertEqual(calls[1], actual['main'])
+        self.assertIsNone(actual['new_Greeter'])
+
+    def test_relabel(self):
+        # Arrange
+        (a, b, c, d) = [
+            Call(name, '', Environments.C) for name in ['a', 'b', 'c', 'd']
+        ]
+        (_a, _b) = [
+            Call(name, 'main.c', Environments.C) for name in ['a', 'b']
+        ]
+        graph = nx.DiGraph()
+        graph.add_node(a, {'tested': None})
+        graph.add_node(b, {'entry': None})
+        graph.add_node(_b, {'exit': None})
+        graph.add_edge(a, b, {'call': None})
+        graph.add_edge(b, a, {'return': None})
+        graph.add_edge(a, a, {'call': None})
+        graph.add_edge(c, a, {'call': None})
+        graph.add_edge(b, d, {'call': None})
+        graph.add_edge(_b, d, {'weight': 1})
+
+        # Act
+        utilities.relabel(graph, {a: _a, b: _b})
+
+        # Assert
+        self.assertCountEqual([_a, _b, c, d], graph.nodes())
+        self.assertEqual({'tested': None}, graph.node[_a])
+        self.assertEqual({'entry': None, 'exit': None}, graph.node[_b])
+        self.assertCountEqual(
+            [
+                (_a, _b, {'call': None}),
+                (_b, _a, {'return': None}),
+                (_a, _a, {'call': None}),
+                (c, _a, {'call': None}),
+                (_b, d, {'call': None, 'weight': 1})
+            ],
+            graph.edges(data=True)
+        )
+
     def test_get_fragments(self):
         # Arrange
 
@@ -207,6 +277,87 @@ class UtilitiesTestCase(unittest.TestCase):
         self.assertCountEqual(expected.nodes(), actual.nodes())
         self.assertCountEqual(expected.edges(), actual.edges())
 
+    def test_get_components(self):
+        # Arrange
+
+        #   a -> b -> c -> a   d <-> e -> f
+        graph = nx.DiGraph()
+        graph.add_edges_from([
+            ('a', 'b'), ('b', 'c'), ('c', 'a'), ('d', 'e'), ('e', 'd'),
+            ('e', 'f')
+        ])
+        expected = [['a', 'b', 'c'], ['d', 'e'], ['f']]
+
+        # Act
+        (labels, sizes) = utilities.get_components(graph)
+        actual = [
+            sorted(n for n in labels if labels[n] == i)
+            for i in range(len(sizes))
+        ]
+
+        # Assert
+        self.assertCountEqual([3, 2, 1], sizes)
+        self.assertCountEqual(expected, actual)
+
+    def test_get_components_implicit_returns(self):
+        # Arrange
+        graph = nx.DiGraph(implicit_returns=True)
+        graph.add_edges_from([('a', 'b'), ('c', 'b'), ('d', 'e')])
+        graph.add_node('f')
+
+        # Act
+        (labels, sizes) = utilities.get_components(graph)
+
+        # Assert
+        self.assertCountEqual([3, 2, 1], sizes)
+        self.assertEqual(labels['a'], labels['c'])
+        self.assertEqual(labels['d'], labels['e'])
+        self.assertNotEqual(labels['a'], labels['d'])
+
+    def test_get_components_deep(self):
+        # Arrange
+        graph = nx.DiGraph()
+        graph.add_path(range(10000))
+        graph.add_edge(9999, 0)
+
+        # Act
+        (labels, sizes) = utilities.get_components(graph)
+
+        # Assert
+        self.assertEqual([10000], sizes)
+
+    def test_get_largest_component(self):
+        # Arrange
+
+        #   a -- b   e -- f -- g
+        #   |    |
+        #   |    |
+        #   d -- c   h -- i  j
+        graph = nx.DiGraph()
+        graph.add_nodes_from(
+            ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j']
+        )
+        graph.add_edges_from([
+           ('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'b'), ('c', 'd'),
+           ('d', 'c'), ('d', 'a'), ('a', 'd'), ('e', 'f'), ('f', 'e'),
+           ('f', 'g'), ('g', 'f'), ('h', 'i'), ('i', 'h')
+        ])
+        graph.node['a']['entry'] = None
+
+        expected = utilities.get_largest_fragment(
+            utilities.get_fragments(graph)
+        )
+
+        # Act
+        (actual, count) = utilities.get_largest_component(graph)
+        actual.node['a']['exit'] = None
+
+        # Assert
+        self.assertEqual(4, count)
+        self.assertCountEqual(expected.nodes(), actual.nodes())
+        self.assertCountEqual(expected.edges(), actual.edges())
+        self.assertEqual({'entry': None}, graph.node['a'])
+
     def test_get_node_attrs(self):
         # Scenario: main -- printf (cflow)
 
@@ -465,5 +616,160 @@ class UtilitiesTestCase(unittest.TestCase):
         # Callee Attributes
         self.assertIsNone(callee_attrs)
 
+    def test_get_node_attrs_identities(self):
+        # Arrange
+        source = 'gprof'
+        caller = Call('main', 'main.c', Environments.C)
+        callee = Call('validate', 'utils.c', Environments.C)
+        defenses = utilities.get_identities(
+            [Call('validate', 'utils.c', Environments.C)]
+        )
+        vulnerabilities = utilities.get_identities(['main main.c'])
+
+        # Act
+        (caller_attrs, callee_attrs) = utilities.get_node_attrs(
+            source, caller, callee, defenses, vulnerabilities
+        )
+
+        # Assert
+        self.assertEqual(frozenset(['validate utils.c']), defenses)
+        self.assertTrue('defense' not in caller_attrs)
+        self.assertTrue('vulnerable' in caller_attrs)
+        self.assertTrue('defense' in callee_attrs)
+        self.assertTrue('vulnerable' not in callee_attrs)
+
+    def test_get_node_attrs_empty_identity(self):
+        # Arrange
+        source = 'cflow'
+        caller = Call('main', 'main.c', Environments.C, Granularity.FILE)
+        callee = Call('helper', '', Environments.C, Granularity.FILE)
+        printf = Call('printf', '', Environments.C, Granularity.FILE)
+
+        # Act
+        (caller_attrs, callee_attrs) = utilities.get_node_attrs(
+            source, caller, callee, [], []
+        )
+        (printf_attrs, main_attrs) = utilities.get_node_attrs(
+            source, printf, caller, [], []
+        )
+
+        # Assert
+        self.assertEqual(dict(), caller_attrs)
+        self.assertIsNone(callee_attrs)
+        self.assertIsNone(printf_attrs)
+        self.assertEqual({'frequency': 1}, main_attrs)
+
+    def test_load_calls(self):
+        # Arrange
+        expected = [
+            Call('validate', 'utils.c', Environments.C),
+            Call('main', '', Environments.C),
+            Call('greet', 'greetings.c', Environments.C)
+        ]
+        contents = {
+            '.csv': 'function_name,function_signature\n'
+                    'validate,utils.c\nmain\n\ngreet,greetings.c\n',
+            '.json': json.dumps([
+                {'function_name': 'validate', 'function_signature': 'utils.c'},
+                'main',
+                ['greet', 'greetings.c']
+            ])
+        }
+
+        for (suffix, content) in contents.items():
+            with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, delete=False
+            ) as file_:
+                file_.write(content)
+            try:
+                # Act
+                actual = utilities.load_calls(file_.name)
+
+                # Assert
+                self.assertEqual(expected, actual)
+                self.assertEqual(
+                    [c.identity for c in expected],
+                    [c.identity for c in actual]
+                )
+            finally:
+                os.remove(file_.name)
+
+    def test_load_calls_without_name(self):
+        # Arrange
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', delete=False
+        ) as file_:
+            file_.write('validate,utils.c\n,main.c\n')
+
+        # Assert
+        try:
+            self.assertRaises(Exception, utilities.load_calls, file_.name)
+        finally:
+            os.remove(file_.name)
+
+    def test_load_weights(self):
+        # Arrange
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.json', delete=False
+        ) as file_:
+            json.dump({'base': {'call': 1, 'return': 2}}, file_)
+
+        try:
+            # Act
+            default = utilities.load_weights()
+            default['base']['call'] = 0
+            actual = utilities.load_weights(file_.name)
+
+            # Assert
+            self.assertEqual(100, utilities.load_weights()['base']['call'])
+            self.assertEqual({'base': {'call': 1, 'return': 2}}, actual)
+        finally:
+            os.remove(file_.name)
+
+    def test_write_table(self):
+        # Arrange
+        table = {
+            'identity': ['main', 'greet'], 'proximity': [1.5, None]
+        }
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            pass
+
+        try:
+            # Act
+            utilities.write_table(table, f.name)
+            with open(f.name) as file_:
+                actual = file_.read().splitlines()
+
+            # Assert
+            self.assertEqual(
+                ['identity,proximity', 'main,1.5', 'greet,'], actual
+            )
+        finally:
+            os.remove(f.name)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed.')
+    def test_write_table_npz(self):
+        # Arrange
+        table = {
+            'identity': np.array(['main', 'greet']),
+            'proximity': np.array([1.5, np.nan])
+        }
+        with tempfile.NamedTemporaryFile(suffix='.npz', delete=False) as f:
+            pass
+
+        try:
+            # Act
+            utilities.write_table(table, f.name)
+            with np.load(f.name) as actual:
+                # Assert
+                self.assertEqual(['identity', 'proximity'], sorted(actual))
+                self.assertEqual(
+                    ['main', 'greet'], list(actual['identity'])
+                )
+                self.assertEqual(1.5, actual['proximity'][0])
+                self.assertTrue(np.isnan(actual['proximity'][1]))
+        finally:
+            os.remove(f.name)
+
 if __name__ == '__main__':
     unittest.main()